@@ -28,6 +28,10 @@ class VisionCoreCommands(Enum):
     COORDINATE_CALIBRATION = "coordinate_calibration"
     START = "start"
     STOP = "stop"
+    
+    # 运行指标命令
+    GET_METRICS = "get_metrics"
+    DUMP_TRACE = "dump_trace"
 
     def __eq__(self, other):
         if isinstance(other, str):
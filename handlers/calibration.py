@@ -15,7 +15,8 @@ from domain.enums.commands import VisionCoreCommands, MessageType
 from domain.models.mqtt import MQTTResponse
 from .context import CommandContext
 from services.calibration import detect_black_blocks, calibrate_from_points
-from services.shared import ImageUtils, SftpHelper
+from services.shared import JpegEncoder, SftpHelper
+from services.shared.calibration_utils import invalidate_calibration_cache
 from services.detection import CoordinateProcessor, DetectionVisualizer
 
 
@@ -235,7 +236,7 @@ def handle_get_calibrat_image(req: MQTTResponse, ctx: CommandContext) -> MQTTRes
                         cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2, cv2.LINE_AA
                     )
                 
-                jpg = ImageUtils.encode_jpg(vis_img)
+                jpg = JpegEncoder.encode_for(ctx.config, "calibration", vis_img)
                 if not jpg:
                     if logger:
                         logger.error("标注图像编码失败")
@@ -456,6 +457,9 @@ def handle_coordinate_calibration(req: MQTTResponse, ctx: CommandContext) -> MQT
                 output_path=output_path
             )
             
+            # 新矩阵已写入文件：使坐标转换缓存失效，下次调用重新加载
+            invalidate_calibration_cache(ctx.project_root)
+            
             if logger:
                 if z_points_count > 0:
                     logger.info("标定模式: XY平面仿射变换 + Z轴线性映射")
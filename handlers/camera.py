@@ -3,7 +3,7 @@
 from domain.enums.commands import VisionCoreCommands, MessageType
 from domain.models.mqtt import MQTTResponse
 from .context import CommandContext
-from services.shared import ImageUtils, SftpHelper
+from services.shared import JpegEncoder, SftpHelper
 
 
 def handle_get_image(_req: MQTTResponse, ctx: CommandContext) -> MQTTResponse:
@@ -48,7 +48,7 @@ def handle_get_image(_req: MQTTResponse, ctx: CommandContext) -> MQTTResponse:
                 data={},
             )
 
-        jpg = ImageUtils.encode_jpg(img)
+        jpg = JpegEncoder.encode_for(ctx.config, "get_image", img)
         if jpg is None:
             return MQTTResponse(
                 command=VisionCoreCommands.GET_IMAGE.value,
@@ -62,7 +62,7 @@ def handle_get_image(_req: MQTTResponse, ctx: CommandContext) -> MQTTResponse:
         upload_info = None
         if sftp:
             try:
-                upload_info = SftpHelper.upload_image_bytes(sftp, jpg, prefix="camera_image")
+                upload_info = SftpHelper.submit_image_bytes(ctx.uploader, sftp, jpg, prefix="camera_image")
                 if upload_info:
                     # 获取SFTP配置并构建完整路径
                     sftp_cfg = ctx.config.get("sftp") if isinstance(ctx.config, dict) else {}
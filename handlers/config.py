@@ -112,6 +112,15 @@ def handle_save_config(req: MQTTResponse, ctx: CommandContext) -> MQTTResponse:
             ctx.config.clear()
             ctx.config.update(merged)
             
+            # ROI配置变化：使已编译的ROI集合失效，下一帧按新配置重新编译
+            if "roi" in partial_updates:
+                try:
+                    from services.detection.roi_processor import RoiProcessor
+                    RoiProcessor.invalidate_compiled_rois()
+                except Exception as invalidate_err:
+                    if ctx.logger:
+                        ctx.logger.warning(f"ROI缓存失效失败: {invalidate_err}")
+            
             # 触发系统重启以应用新配置
             if ctx.initializer:
                 try:
@@ -15,5 +15,7 @@ class CommandContext:
     project_root: str
     initializer: Optional[Any] = None
     gpio: Optional[Any] = None
+    uploader: Optional[Any] = None  # SFTP异步上传队列（None则同步上传）
+    occlusion_ignore_remaining: int = 0  # catch遮挡忽略剩余次数（handle_catch维护）
 
 
@@ -3,14 +3,22 @@
 import time
 import json
 import os
+import threading
 import numpy as np
 
 from domain.enums.commands import VisionCoreCommands, MessageType
 from domain.models.mqtt import MQTTResponse
 from .context import CommandContext
-from services.shared import ImageUtils, SftpHelper
-from services.detection import DetectionVisualizer, RoiProcessor, TargetSelector, CoordinateProcessor
+from services.shared import JpegEncoder, SftpHelper
+from services.detection import DetectionVisualizer, RoiProcessor, TargetSelector, CoordinateProcessor, DetectionBatch
 from services.shared.calibration_utils import world_to_robot_using_calib
+from services.system.metrics import get_metrics
+from services.system.tracing import get_tracer
+from services.system.pipeline import BackgroundWorker
+
+
+_render_worker = None  # catch可视化后台线程（visualization.deferred 启用时创建）
+_render_worker_lock = threading.Lock()
 
 
 def handle_model_test(_req: MQTTResponse, ctx: CommandContext) -> MQTTResponse:
@@ -55,17 +63,14 @@ def handle_model_test(_req: MQTTResponse, ctx: CommandContext) -> MQTTResponse:
         t0 = time.time()
         results = det.detect(img)
         dt = (time.time() - t0) * 1000.0
+        get_metrics().record("model_test.detection", dt)
         count = len(results) if hasattr(results, "__len__") else (1 if results else 0)
         
-        # 绘制检测结果到图像上
-        vis_img = DetectionVisualizer.draw_detections(
-            img, results, 
-            class_names=["seasoning", "hand"], 
-            show_bbox=False
-        )
+        # 绘制检测结果到图像上（无检测结果时直接编码原图，灰度图按单通道编码）
+        vis_img = DetectionVisualizer.render(img, results, show_bbox=False) if count else img
         
         # 编码为JPG
-        jpg = ImageUtils.encode_jpg(vis_img)
+        jpg = JpegEncoder.encode_for(ctx.config, "model_test", vis_img)
         if jpg is None:
             return MQTTResponse(
                 command=VisionCoreCommands.MODEL_TEST.value,
@@ -79,7 +84,7 @@ def handle_model_test(_req: MQTTResponse, ctx: CommandContext) -> MQTTResponse:
         upload_info = None
         if sftp:
             try:
-                upload_info = SftpHelper.upload_image_bytes(sftp, jpg, prefix="detection_test")
+                upload_info = SftpHelper.submit_image_bytes(ctx.uploader, sftp, jpg, prefix="detection_test")
                 if upload_info:
                     # 获取SFTP配置并构建完整路径
                     sftp_cfg = ctx.config.get("sftp") if isinstance(ctx.config, dict) else {}
@@ -155,11 +160,11 @@ def handle_catch(_req: MQTTResponse, ctx: CommandContext) -> MQTTResponse:
     # ===== 性能监控：记录各步骤耗时 =====
     time_start = time.time()
     time_points = {}
+    tracer = get_tracer()
     
     try:
         det = ctx.detector
         cam = ctx.camera
-        sftp = ctx.sftp
         
         # 验证组件状态
         if not det:
@@ -182,7 +187,8 @@ def handle_catch(_req: MQTTResponse, ctx: CommandContext) -> MQTTResponse:
         
         # 获取相机数据（深度、强度、参数）
         t0_camera = time.time()
-        result = cam.get_frame(depth=True, intensity=True, camera_params=True)
+        with tracer.span("camera.get_frame"):
+            result = cam.get_frame(depth=True, intensity=True, camera_params=True)
         img = result.get('intensity_image') if result else None
         depth_data = result.get('depthmap') if result else None
         camera_params = result.get('cameraParams') if result else None
@@ -199,157 +205,74 @@ def handle_catch(_req: MQTTResponse, ctx: CommandContext) -> MQTTResponse:
         
         # 执行检测
         t0_detect = time.time()
-        detection_results = det.detect(img)
+        with tracer.span("detector.detect") as detect_span:
+            detection_results = det.detect(img)
         time_points['detection'] = (time.time() - t0_detect) * 1000.0
         total_count = len(detection_results) if hasattr(detection_results, "__len__") else (1 if detection_results else 0)
-        
-        # 先绘制检测结果（不包含ROI）
-        t0_visualize = time.time()
-        vis_img = DetectionVisualizer.draw_detections(
-            img, detection_results,
-            class_names=["seasoning", "hand"], 
-            show_bbox=False
-        )
-        time_points['visualize_detections'] = (time.time() - t0_visualize) * 1000.0
+        detect_span.set(count=total_count)
         
         # 直接从config中获取ROI配置
         t0_roi_setup = time.time()
         roi_cfg = ctx.config.get('roi') or {}
-        regions = roi_cfg.get('regions') or []
         min_area = float(roi_cfg.get('minArea', 0))
         
-        # 构建ROI配置列表（转换为统一格式）
+        # 编译后的ROI集合（统一格式，按配置与图像尺寸缓存）
         height, width = img.shape[:2]
-        roi_list = []
-        
-        for region in regions:
-            if not isinstance(region, dict):
-                continue
-            
-            roi_width = int(region.get('width', 120))
-            roi_height = int(region.get('height', 140))
-            x1 = int(region.get('offsetx', 0))
-            y1 = int(region.get('offsety', 0))
-            x2 = x1 + roi_width
-            y2 = y1 + roi_height
-            
-            # 限制在图像范围内
-            x1 = max(0, min(x1, width))
-            y1 = max(0, min(y1, height))
-            x2 = max(0, min(x2, width))
-            y2 = max(0, min(y2, height))
-            
-            roi_config = {
-                'x1': x1,
-                'y1': y1,
-                'x2': x2,
-                'y2': y2,
-                'priority': region.get('priority', 999),
-                'name': region.get('name', f"roi_{len(roi_list)+1}")
-            }
-            roi_list.append(roi_config)
-            
-            # 绘制ROI（不同优先级用不同颜色）
-            priority = region.get('priority', 999)
-            if priority == 1:
-                vis_img = DetectionVisualizer.draw_roi(vis_img, roi_config, color=(0, 255, 255), thickness=2)  # 黄色
-            elif priority == 2:
-                vis_img = DetectionVisualizer.draw_roi(vis_img, roi_config, color=(255, 128, 0), thickness=2)  # 橙色
-            else:
-                vis_img = DetectionVisualizer.draw_roi(vis_img, roi_config, color=(128, 128, 128), thickness=2)  # 灰色
+        roi_set = RoiProcessor.get_compiled_rois(roi_cfg, width, height)
         
         time_points['roi_setup'] = (time.time() - t0_roi_setup) * 1000.0
+        tracer.complete("catch.roi_setup", time_points['roi_setup'])
         
         # 过滤seasoning目标（只针对类别0）
         t0_filter = time.time()
-        seasoning_detections = []
-        for det_box in detection_results:
-            class_id = int(getattr(det_box, 'class_id', getattr(det_box, 'classId', -1)))
-            if class_id == 0:  # seasoning
-                seasoning_detections.append(det_box)
+        seasoning_detections = DetectionBatch.from_detections(detection_results).select_class(0)  # seasoning
         
         # 精简日志：移除详细检测结果输出
         
         # 使用多ROI优先级选择：ROI区域内(仅判断中点) > ROI优先级高 > Mask大于minArea > Mask最大
-        best_target = TargetSelector.select_by_multi_roi_priority(
+        # 所有目标与所有ROI的归属一次算出，选择与计数共用同一结果
+        roi_assignment = RoiProcessor.assign_rois(seasoning_detections.centers(), roi_set)
+        best_target = TargetSelector.select_from_assignment(
             seasoning_detections,
-            roi_list,
+            roi_set,
+            roi_assignment,
             min_area=min_area
         )
         time_points['filter_and_select'] = (time.time() - t0_filter) * 1000.0
+        tracer.complete("catch.filter_and_select", time_points['filter_and_select'])
         
         # 精简日志：移除最佳目标选择的详细输出
         
         # 统计各ROI中的目标数量（通过中点判断 + 深度阈值递增计数）
         # 逻辑：p_count = ROI内物体总数（基数） + 所有物体的深度增量总和
         # 例如：P1 ROI有3个物体，深度增量分别为1,2,0 → p1_count = 3 + 1 + 2 + 0 = 6
-        p1_base_count = 0  # P1 ROI内物体基数
-        p2_base_count = 0  # P2 ROI内物体基数
+        # 基数：每个目标只计入其最高优先级ROI
+        p1_base_count = roi_assignment.assigned_count_by_priority(roi_set, 1)  # P1 ROI内物体基数
+        p2_base_count = roi_assignment.assigned_count_by_priority(roi_set, 2)  # P2 ROI内物体基数
         p1_depth_increment = 0  # P1 ROI深度增量总和
         p2_depth_increment = 0  # P2 ROI深度增量总和
         roi_depth_threshold = float(roi_cfg.get('depthThreshold', 0))
         
-        for det_box in seasoning_detections:
-            xmin = float(getattr(det_box, 'xmin', 0))
-            ymin = float(getattr(det_box, 'ymin', 0))
-            xmax = float(getattr(det_box, 'xmax', 0))
-            ymax = float(getattr(det_box, 'ymax', 0))
-            center_x = 0.5 * (xmin + xmax)
-            center_y = 0.5 * (ymin + ymax)
-            
-            # 遍历roi_list，找到所属ROI（按中点判断）
-            matched_roi = None
-            for roi in roi_list:
-                if RoiProcessor.is_point_in_roi(center_x, center_y, roi):
-                    matched_roi = roi
-                    break
-            
-            if matched_roi is None:
-                continue
-            
-            priority = matched_roi.get('priority', 999)
-            
-            # 累加基数（物体数量）
-            if priority == 1:
-                p1_base_count += 1
-            elif priority == 2:
-                p2_base_count += 1
-            
-            # 若存在深度与相机参数，则计算深度增量
-            if depth_data is None or camera_params is None:
-                continue
-            
-            # 计算物体中心的世界坐标
-            coord_info = None
-            try:
-                coord_info = CoordinateProcessor.calculate_coordinate_for_detection(
-                    det_box,
-                    depth_data,
-                    camera_params,
-                    None  # 只需要世界坐标，不需要机器人坐标
-                )
-            except Exception as e:
+        # 所有已归属ROI的目标中心一次性批量计算世界坐标
+        assigned_mask = roi_assignment.assigned >= 0
+        if depth_data is not None and camera_params is not None and assigned_mask.any():
+            world_batch = CoordinateProcessor.calculate_world_points(
+                seasoning_detections.centers()[assigned_mask],
+                depth_data,
+                camera_params
+            )
+            if world_batch is None:
                 if logger:
-                    logger.warning(f"计算物体坐标失败: {e}")
-                coord_info = None
-            
-            if not coord_info or 'camera_3d' not in coord_info or not coord_info['camera_3d']:
-                continue
-            
-            # 提取世界坐标Z值
-            world_xyz = coord_info['camera_3d']
-            world_z = float(world_xyz[2])
-            
-            # 计算深度差值：depthThreshold - world_z
-            delta = roi_depth_threshold - world_z
-            
-            # 深度增量：每小于阈值10个单位+1
-            increments = int(delta // 10.0) if delta >= 10.0 else 0
-            
-            if priority == 1:
-                p1_depth_increment += increments
-            elif priority == 2:
-                p2_depth_increment += increments
+                    logger.warning("批量计算物体坐标失败")
+            else:
+                # 计算深度差值：depthThreshold - world_z
+                delta = roi_depth_threshold - world_batch['world'][:, 2]
+                
+                # 深度增量：每小于阈值10个单位+1（深度无效的目标不计增量）
+                increments = np.where(world_batch['valid'] & (delta >= 10.0), np.floor_divide(delta, 10.0), 0).astype(np.int64)
+                priorities = roi_set.priorities[roi_assignment.assigned[assigned_mask]]
+                p1_depth_increment = int(increments[priorities == 1].sum())
+                p2_depth_increment = int(increments[priorities == 2].sum())
         
         # 计算最终计数：基数 + 深度增量
         p1_count = p1_base_count + p1_depth_increment
@@ -364,6 +287,7 @@ def handle_catch(_req: MQTTResponse, ctx: CommandContext) -> MQTTResponse:
         tcp_response = "0,0,0,0,0"
         best_target_info = None
         robot_coordinates = None
+        crosshair = None  # 最佳目标中心点（可视化时绘制十字准星）
         
         # ===== 获取TCP间隔信息和遮挡检测配置 =====
         tcp_interval_ms = _req.data.get('tcp_interval_ms', 0.0)
@@ -410,7 +334,8 @@ def handle_catch(_req: MQTTResponse, ctx: CommandContext) -> MQTTResponse:
                     best_target['detection'],
                     depth_data,
                     camera_params,
-                    None  # 不使用外部变换矩阵
+                    None,  # 不使用外部变换矩阵
+                    depth_cfg=ctx.config.get('depth')
                 )
                 
                 if coord_info:
@@ -433,16 +358,9 @@ def handle_catch(_req: MQTTResponse, ctx: CommandContext) -> MQTTResponse:
                         # 构建TCP响应字符串：p1_flag,p2_flag,x,y,z
                         tcp_response = f"{in_p1roi},{in_p2roi},{x:.2f},{y:.2f},{z:.2f}"
                     
-                    # 在图像上绘制最佳目标的中心点
+                    # 记录最佳目标的中心点（可视化时绘制）
                     center_x, center_y = coord_info['center']
-                    vis_img = DetectionVisualizer.draw_crosshair(
-                        vis_img,
-                        int(center_x),
-                        int(center_y),
-                        size=20,
-                        color=(0, 255, 0),
-                        thickness=2
-                    )
+                    crosshair = (int(center_x), int(center_y))
                     
                     best_target_info = {
                         'target_id': best_target['target_id'],
@@ -466,34 +384,37 @@ def handle_catch(_req: MQTTResponse, ctx: CommandContext) -> MQTTResponse:
             tcp_response = "0,0,0,0,0"
         
         time_points['coordinate_calc'] = (time.time() - t0_coordinate) * 1000.0
+        tracer.complete("catch.coordinate_calc", time_points['coordinate_calc'], response=tcp_response)
         
-        # 编码为JPG并上传
-        t0_encode = time.time()
-        jpg = ImageUtils.encode_jpg(vis_img)
-        time_points['jpg_encode'] = (time.time() - t0_encode) * 1000.0
-        if jpg is None:
-            return MQTTResponse(
-                command=VisionCoreCommands.CATCH.value,
-                component="camera",
-                messageType=MessageType.ERROR,
-                message="encode_failed",
-                data={"response": "0,0,0,0,0"},
-            )
-        
-        # 上传到SFTP（非关键操作，失败不影响检测结果）
-        t0_upload = time.time()
+        # 可视化、JPG编码与SFTP上传
+        vis_cfg = ctx.config.get('visualization') or {}
+        image_shape = None  # 后台渲染时尚未生成图像（可能为单通道），实际尺寸由 image_ready 返回
+        image_pending = False
         upload_info = None
-        if sftp:
-            try:
-                upload_info = SftpHelper.upload_image_bytes(sftp, jpg, prefix="catch")
-            except Exception:
-                pass  # 精简日志：SFTP上传错误静默处理
-        time_points['sftp_upload'] = (time.time() - t0_upload) * 1000.0
-        
-        # 获取SFTP配置并构建完整路径（如果有上传信息）
-        if upload_info:
-            sftp_cfg = ctx.config.get("sftp") if isinstance(ctx.config, dict) else {}
-            upload_info = SftpHelper.get_upload_info_with_prefix(upload_info, sftp_cfg)
+        if bool(vis_cfg.get('deferred', False)):
+            # 交给后台线程处理，机器人响应不等待渲染；完成后另发一条 image_ready 消息
+            # 先确定远程文件名，响应中即给出路径（file_size 待编码后由 image_ready 返回），后台按该路径上传
+            upload_plan = SftpHelper.plan_image_upload(None, prefix="catch") if ctx.sftp else None
+            if upload_plan:
+                sftp_cfg = ctx.config.get("sftp") if isinstance(ctx.config, dict) else {}
+                upload_info = SftpHelper.get_upload_info_with_prefix(upload_plan, sftp_cfg)
+            _get_render_worker(vis_cfg, logger).submit(
+                _render_catch_deferred, ctx, img, detection_results, roi_set, crosshair, tcp_response,
+                tracer.capture(), upload_plan
+            )
+            image_pending = True
+        else:
+            vis_img = _render_catch_image(img, detection_results, roi_set, crosshair, time_points)
+            image_shape = list(vis_img.shape) if hasattr(vis_img, "shape") else None
+            jpg, upload_info = _encode_and_upload(ctx, vis_img, time_points)
+            if jpg is None:
+                return MQTTResponse(
+                    command=VisionCoreCommands.CATCH.value,
+                    component="camera",
+                    messageType=MessageType.ERROR,
+                    message="encode_failed",
+                    data={"response": "0,0,0,0,0"},
+                )
         
         # 构建返回数据
         payload = {
@@ -504,17 +425,15 @@ def handle_catch(_req: MQTTResponse, ctx: CommandContext) -> MQTTResponse:
             "infer_time_ms": round(time_points.get('detection', 0), 1),
             "has_target": best_target_info is not None,
             "best_target": best_target_info,
-            "filename": upload_info.get("filename") if upload_info else None,
-            "remote_path": upload_info.get("remote_path") if upload_info else None,
-            "remote_rel_path": upload_info.get("remote_rel_path") if upload_info else None,
-            "remote_file": upload_info.get("remote_file") if upload_info else None,
-            "remote_full_path": upload_info.get("remote_full_path") if upload_info else None,
-            "file_size": upload_info.get("file_size") if upload_info else None,
-            "image_shape": list(vis_img.shape) if hasattr(vis_img, "shape") else None,
+            **_image_fields(upload_info),
+            "image_shape": image_shape,
+            "image_pending": image_pending,  # True：图像由后台生成，稍后通过 image_ready 消息返回
+            "trace_id": tracer.current_trace_id(),  # 链路追踪ID（可用 dump_trace 命令按ID导出各阶段耗时）
         }
         
         # 计算总耗时
         time_points['total'] = (time.time() - time_start) * 1000.0
+        get_metrics().record_many("catch", time_points)
         
         if logger:
             try:
@@ -529,6 +448,10 @@ def handle_catch(_req: MQTTResponse, ctx: CommandContext) -> MQTTResponse:
                     f"JPG编码={time_points.get('jpg_encode', 0):.1f}ms, "
                     f"SFTP上传={time_points.get('sftp_upload', 0):.1f}ms"
                 )
+                if image_pending:
+                    perf_details += "（可视化/编码/上传在后台执行）"
+                if payload["trace_id"]:
+                    perf_details += f" | trace={payload['trace_id']}"
                 
                 if best_target_info:
                     logger.info(
@@ -570,3 +493,126 @@ def handle_catch(_req: MQTTResponse, ctx: CommandContext) -> MQTTResponse:
 
 
  
+
+
+def _get_render_worker(vis_cfg: dict, logger) -> BackgroundWorker:
+    """获取catch可视化后台线程（首次调用时创建）"""
+    global _render_worker
+    with _render_worker_lock:
+        if _render_worker is None:
+            _render_worker = BackgroundWorker(
+                "catch-render",
+                queue_size=int(vis_cfg.get('queue_size', 2)),
+                logger=logger,
+            )
+            get_metrics().register_gauge("catch_render_worker", _render_worker.stats)
+        return _render_worker
+
+
+def _render_catch_image(img, detection_results, roi_set, crosshair, time_points: dict = None):
+    """绘制检测结果、ROI与最佳目标十字准星"""
+    t0_visualize = time.time()
+    if not detection_results and not roi_set.rois and crosshair is None:
+        # 没有任何叠加内容：直接编码原图（灰度图按单通道编码）
+        vis_img = img
+    else:
+        # 单缓冲区一次性绘制检测结果、ROI（预绘制叠加层）与十字准星
+        vis_img = DetectionVisualizer.render(
+            img, detection_results,
+            roi_overlay=roi_set.overlay(),
+            crosshair=crosshair,
+            show_bbox=False
+        )
+    elapsed_ms = (time.time() - t0_visualize) * 1000.0
+    get_tracer().complete("catch.render", elapsed_ms)
+    if time_points is not None:
+        time_points['visualize_detections'] = elapsed_ms
+    return vis_img
+
+
+def _encode_and_upload(ctx: CommandContext, vis_img, time_points: dict = None, upload_plan: dict = None):
+    """
+    JPG编码并上传SFTP（上传为非关键操作，失败不影响结果）
+    upload_plan 不为None时上传到其中预先确定的路径
+
+    Returns:
+        (jpg, upload_info)：编码失败时 jpg 为None
+    """
+    time_points = time_points if time_points is not None else {}
+    
+    tracer = get_tracer()
+    t0_encode = time.time()
+    jpg = JpegEncoder.encode_for(ctx.config, "catch", vis_img)
+    time_points['jpg_encode'] = (time.time() - t0_encode) * 1000.0
+    tracer.complete("catch.jpg_encode", time_points['jpg_encode'], bytes=len(jpg) if jpg is not None else 0)
+    if jpg is None:
+        return None, None
+    
+    t0_upload = time.time()
+    upload_info = None
+    sftp = ctx.sftp
+    if sftp:
+        try:
+            upload_info = SftpHelper.submit_image_bytes(ctx.uploader, sftp, jpg, prefix="catch", plan=upload_plan)
+        except Exception:
+            pass  # 精简日志：SFTP上传错误静默处理
+    time_points['sftp_upload'] = (time.time() - t0_upload) * 1000.0
+    tracer.complete("catch.sftp_upload", time_points['sftp_upload'], queued=ctx.uploader is not None)
+    
+    # 获取SFTP配置并构建完整路径（如果有上传信息）
+    if upload_info:
+        sftp_cfg = ctx.config.get("sftp") if isinstance(ctx.config, dict) else {}
+        upload_info = SftpHelper.get_upload_info_with_prefix(upload_info, sftp_cfg)
+    return jpg, upload_info
+
+
+def _image_fields(upload_info) -> dict:
+    """响应中的图像上传字段"""
+    keys = ("filename", "remote_path", "remote_rel_path", "remote_file", "remote_full_path", "file_size")
+    return {k: upload_info.get(k) if upload_info else None for k in keys}
+
+
+def _render_catch_deferred(ctx: CommandContext, img, detection_results, roi_set, crosshair, tcp_response: str,
+                           trace_parent=None, upload_plan=None) -> None:
+    """
+    后台线程：渲染、编码、上传，完成后发布 image_ready 消息
+    trace_parent：提交时的追踪上下文；upload_plan：响应中已给出的上传路径（plan_image_upload）
+    """
+    tracer = get_tracer()
+    with tracer.attach(trace_parent), tracer.span("catch.deferred_image"):
+        _render_catch_deferred_traced(ctx, img, detection_results, roi_set, crosshair, tcp_response, upload_plan)
+
+
+def _render_catch_deferred_traced(ctx: CommandContext, img, detection_results, roi_set, crosshair, tcp_response: str,
+                                  upload_plan=None) -> None:
+    logger = getattr(ctx, "logger", None)
+    time_points = {}
+    vis_img = _render_catch_image(img, detection_results, roi_set, crosshair, time_points)
+    jpg, upload_info = _encode_and_upload(ctx, vis_img, time_points, upload_plan=upload_plan)
+    get_metrics().record_many("catch", time_points)
+    if jpg is None:
+        if logger:
+            logger.warning("catch可视化图像编码失败（后台）")
+        return
+    
+    comm = getattr(getattr(ctx, "initializer", None), "comm", None)
+    if comm and hasattr(comm, "publish_message"):
+        comm.publish_message(MQTTResponse(
+            command=VisionCoreCommands.CATCH.value,
+            component="detector",
+            messageType=MessageType.SUCCESS,
+            message="image_ready",
+            data={
+                "response": tcp_response,
+                **_image_fields(upload_info),
+                "image_shape": list(vis_img.shape) if hasattr(vis_img, "shape") else None,
+                "trace_id": get_tracer().current_trace_id(),
+            },
+        ))
+    
+    if logger:
+        logger.debug(
+            f"catch后台可视化完成 | 可视化={time_points.get('visualize_detections', 0):.1f}ms, "
+            f"JPG编码={time_points.get('jpg_encode', 0):.1f}ms, "
+            f"SFTP上传={time_points.get('sftp_upload', 0):.1f}ms"
+        )
@@ -4,15 +4,18 @@ import threading
 import time
 import os
 import json
-import numpy as np
 from services.detection import TargetSelector, RoiProcessor, CoordinateProcessor
+from services.detection.batch import DetectionBatch
 from services.shared.calibration_utils import world_to_robot_using_calib
+from services.system.metrics import get_metrics
+from services.system.tracing import get_tracer
 
 
 _runner_thread = None
 _stop_event = threading.Event()
 _gpio_resources = {}
 _target_client_id = None
+_pipeline = None  # 流水线模式下的 StagePipeline（用于统计查询）
 
 # 机器人抓取状态管理
 _robot_state = {
@@ -20,6 +23,7 @@ _robot_state = {
     "picking_roi": None,           # 正在抓取的ROI名称（用于只停止对应的皮带）
     "lock": threading.Lock(),      # 状态锁，保证线程安全
     "last_send_time": 0,           # 上次发送时间
+    "complete_time": 0,            # 上次收到complete的时间（perf_counter），早于它取到的帧不再用于决策
 }
 
 
@@ -43,7 +47,8 @@ def handle_robot_complete(message: str, ctx) -> None:
             completed_roi = _robot_state["picking_roi"]
             _robot_state["is_picking"] = False
             _robot_state["picking_roi"] = None  # 清除ROI记录
-            pick_duration = time.perf_counter() - _robot_state["last_send_time"]
+            _robot_state["complete_time"] = time.perf_counter()
+            pick_duration = _robot_state["complete_time"] - _robot_state["last_send_time"]
         
         if logger and was_picking:
             roi_info = f"（ROI: {completed_roi}）" if completed_roi else ""
@@ -73,6 +78,7 @@ def handle_start(req: MQTTResponse, ctx) -> MQTTResponse:
         _robot_state["is_picking"] = False
         _robot_state["picking_roi"] = None
         _robot_state["last_send_time"] = 0
+        _robot_state["complete_time"] = 0
     
     _gpio_resources = {}
     gpio_map = []
@@ -80,17 +86,13 @@ def handle_start(req: MQTTResponse, ctx) -> MQTTResponse:
     regions = roi_cfg.get("regions") or []
     for r in regions:
         try:
-            gcfg = r.get("gpio") or {}
-            if not bool(gcfg.get("enable", False)):
+            binding = RoiProcessor.parse_gpio(r)
+            if not binding:
                 continue
-            chip = str(gcfg.get("chip", ""))
-            pin = int(gcfg.get("pin"))
             roi_name = str(r.get("name", "roi"))
-            if chip and not chip.startswith("/"):
-                chip = "/" + chip
             from services.servo.gpio import GPIO
             g = GPIO()
-            if g.open(chip, pin, consumer=f"gpio-{roi_name}"):
+            if g.open(binding["chip"], binding["pin"], consumer=f"gpio-{roi_name}"):
                 _gpio_resources[roi_name] = g
                 gpio_map.append(roi_name)
         except Exception:
@@ -119,6 +121,7 @@ def handle_stop(req: MQTTResponse, ctx) -> MQTTResponse:
         _robot_state["is_picking"] = False
         _robot_state["picking_roi"] = None
         _robot_state["last_send_time"] = 0
+        _robot_state["complete_time"] = 0
     
     # 等待运行循环线程结束
     if _runner_thread and _runner_thread.is_alive():
@@ -150,276 +153,149 @@ def handle_stop(req: MQTTResponse, ctx) -> MQTTResponse:
     return MQTTResponse(command=VisionCoreCommands.STOP.value, component=req.component, messageType=MessageType.SUCCESS, message="ok", data={"status": "stopped"})
 
 
-def _run_loop(ctx, gpio_map):
-    cam = getattr(ctx, "camera", None)
-    det = getattr(ctx, "detector", None)
-    logger = getattr(ctx, "logger", None)
-    
-    loop_count = 0
-    
+def get_pipeline_stats() -> dict:
+    """
+    获取连续运行流水线的统计信息（各级耗时、队列深度、瓶颈级）
+
+    Returns:
+        统计字典；未运行或为顺序模式时返回空字典
+    """
+    pipeline = _pipeline
+    if pipeline is None:
+        return {}
+    try:
+        return pipeline.stats()
+    except Exception:
+        return {}
+
+
+def handle_get_metrics(req: MQTTResponse, ctx) -> MQTTResponse:
+    """
+    查询各阶段耗时分位数（p50/p95/p99）与组件状态
+
+    请求参数（data，可选）：
+        format: "json"（默认）或 "prometheus"
+        reset: 是否在查询后清零直方图
+    """
+    data = req.data if isinstance(req.data, dict) else {}
+    metrics = get_metrics()
+    try:
+        if str(data.get("format", "json")).lower() == "prometheus":
+            payload = {"format": "prometheus", "text": metrics.to_prometheus()}
+        else:
+            payload = metrics.snapshot()
+        if bool(data.get("reset", False)):
+            metrics.reset()
+    except Exception as e:
+        return MQTTResponse(
+            command=VisionCoreCommands.GET_METRICS.value,
+            component=req.component,
+            messageType=MessageType.ERROR,
+            message=f"metrics_failed: {e}",
+            data={},
+        )
+    return MQTTResponse(
+        command=VisionCoreCommands.GET_METRICS.value,
+        component=req.component,
+        messageType=MessageType.SUCCESS,
+        message="ok",
+        data=payload,
+    )
+
+
+def handle_dump_trace(req: MQTTResponse, ctx) -> MQTTResponse:
+    """
+    导出链路追踪记录（Chrome trace-event JSON，可用 chrome://tracing 或 Perfetto 打开）
+
+    请求参数（data，可选）：
+        trace_id: 只导出该请求（catch 响应中的 trace_id）
+        min_duration_ms: 只导出总耗时不小于该值的请求（用于查看慢请求）
+        last: 只导出最近的 N 个请求
+        save: 为 true 时写入 logs/traces/ 下的文件，只返回路径
+        clear: 导出后清空缓冲区
+    """
+    data = req.data if isinstance(req.data, dict) else {}
+    tracer = get_tracer()
+    try:
+        filters = {
+            "trace_id": str(data["trace_id"]) if data.get("trace_id") else None,
+            "min_duration_ms": float(data.get("min_duration_ms", 0) or 0),
+            "last": int(data["last"]) if data.get("last") else None,
+        }
+        if bool(data.get("save", False)):
+            project_root = getattr(ctx, "project_root", None) or os.getcwd()
+            filename = f"trace_{time.strftime('%Y%m%d_%H%M%S')}.json"
+            path = os.path.join(project_root, "logs", "traces", filename)
+            count = tracer.dump(path, **filters)
+            payload = {"path": path, "event_count": count, **tracer.stats()}
+        else:
+            payload = tracer.to_chrome(**filters)
+        if bool(data.get("clear", False)):
+            tracer.clear()
+    except Exception as e:
+        return MQTTResponse(
+            command=VisionCoreCommands.DUMP_TRACE.value,
+            component=req.component,
+            messageType=MessageType.ERROR,
+            message=f"trace_failed: {e}",
+            data={},
+        )
+    return MQTTResponse(
+        command=VisionCoreCommands.DUMP_TRACE.value,
+        component=req.component,
+        messageType=MessageType.SUCCESS,
+        message="ok",
+        data=payload,
+    )
+
+
+def _new_stability_state(ctx) -> dict:
     # 从配置中读取稳定等待时间
     roi_cfg = ctx.config.get("roi") or {}
     stability_wait_time = float(roi_cfg.get("stabilityWaitTime", 0.15))  # 默认150ms
     
     # 稳定检测状态（解决传送带停止后物体晃动问题）
-    stability_state = {
+    return {
         "waiting_stable": False,      # 是否正在等待物体稳定
         "stable_start_time": 0,       # 开始等待的时间
         "stable_wait_duration": stability_wait_time,  # 从配置读取
+        "stable_until": 0,            # 传送带停止后物体稳定的时间点，早于它取到的帧不发送坐标
         "last_gpio_state": {},        # 记录上次GPIO状态，用于检测状态变化
     }
+
+
+def _run_loop(ctx, gpio_map):
+    pipe_cfg = ctx.config.get("pipeline") or {}
+    if bool(pipe_cfg.get("enable", False)):
+        _run_pipeline(ctx, pipe_cfg)
+        return
+    
+    cam = getattr(ctx, "camera", None)
+    det = getattr(ctx, "detector", None)
+    logger = getattr(ctx, "logger", None)
+    
+    loop_count = 0
+    stability_state = _new_stability_state(ctx)
     
     while not _stop_event.is_set():
+        frame = None
         try:
             loop_count += 1
-            loop_start = time.perf_counter()
-            current_time = time.perf_counter()
-            
-            # 检查是否正在等待物体稳定（只影响坐标发送，不影响GPIO控制）
-            if stability_state["waiting_stable"]:
-                elapsed = current_time - stability_state["stable_start_time"]
-                if elapsed >= stability_state["stable_wait_duration"]:
-                    # 等待结束，标记为可以发送
-                    stability_state["waiting_stable"] = False
-                    if logger:
-                        logger.info(f"物体已稳定（等待{elapsed*1000:.0f}ms），准备检测和发送")
             
             # 1. 取图
-            capture_start = time.perf_counter()
-            result = cam.get_frame(depth=True, intensity=True, camera_params=True)
-            capture_time = (time.perf_counter() - capture_start) * 1000  # 转换为毫秒
-            
-            # 数据提取
-            extract_start = time.perf_counter()
-            img = result.get("intensity_image") if result else None
-            depth_data = result.get("depthmap") if result else None
-            camera_params = result.get("cameraParams") if result else None
-            extract_time = (time.perf_counter() - extract_start) * 1000
-            
-            if img is None:
-                if logger:
-                    logger.warning(f"[循环#{loop_count}] 取图失败 | get_frame={capture_time:.1f}ms")
+            frame = _grab_stage(cam, logger, loop_count)
+            if frame is None:
                 time.sleep(0.2)
                 continue
             
             # 2. 检测
-            detect_start = time.perf_counter()
-            dets = det.detect(img)
-            detect_time = (time.perf_counter() - detect_start) * 1000  # 转换为毫秒
-            roi_cfg = ctx.config.get("roi") or {}
-            regions = roi_cfg.get("regions") or []
-            min_area = float(roi_cfg.get("minArea", 0))
-            height, width = img.shape[:2]
-            rois = []
-            for region in regions:
-                try:
-                    rw = int(region.get("width", 120))
-                    rh = int(region.get("height", 140))
-                    x1 = int(region.get("offsetx", 0))
-                    y1 = int(region.get("offsety", 0))
-                    x2 = max(0, min(x1 + rw, width))
-                    y2 = max(0, min(y1 + rh, height))
-                    rois.append({"x1": max(0, min(x1, width)), "y1": max(0, min(y1, height)), "x2": x2, "y2": y2, "priority": int(region.get("priority", 999)), "name": str(region.get("name", "roi"))})
-                except Exception:
-                    continue
-            seasoning = []
-            for d in dets:
-                cid = int(getattr(d, "class_id", getattr(d, "classId", -1)))
-                if cid == 0:
-                    # 使用mask面积（检测结果肯定有mask）
-                    mask = getattr(d, 'seg_mask', None)
-                    if mask is not None and isinstance(mask, np.ndarray):
-                        area = float(np.sum(mask > 0))  # mask像素数
-                        if area >= min_area:
-                            seasoning.append(d)
-            # 检查机器人状态（线程安全）- 需要在GPIO控制前获取
-            with _robot_state["lock"]:
-                is_robot_picking = _robot_state["is_picking"]
-                picking_roi_name = _robot_state["picking_roi"]
-            
-            p1 = 0
-            p2 = 0
-            best_target = None
-            best_target_roi = None  # 记录best_target所属的ROI名称
-            
-            for roi in rois:
-                name = roi.get("name")
-                priority = roi.get("priority", 999)
-                count = 0
-                for d in seasoning:
-                    xmin = float(getattr(d, "xmin", 0))
-                    ymin = float(getattr(d, "ymin", 0))
-                    xmax = float(getattr(d, "xmax", 0))
-                    ymax = float(getattr(d, "ymax", 0))
-                    cx = 0.5 * (xmin + xmax)
-                    cy = 0.5 * (ymin + ymax)
-                    if roi["x1"] <= cx <= roi["x2"] and roi["y1"] <= cy <= roi["y2"]:
-                        count += 1
-                if roi.get("priority") == 1:
-                    p1 = count
-                elif roi.get("priority") == 2:
-                    p2 = count
-                
-                gpio_inst = _gpio_resources.get(name)
-                if gpio_inst:
-                    # 关键逻辑：只有当前ROI是正在抓取的ROI时，才强制保持GPIO低电平
-                    if is_robot_picking and name == picking_roi_name:
-                        desired = 0  # 该ROI正在被抓取，强制低电平，皮带不移动
-                    else:
-                        desired = 1 if count == 0 else 0  # 正常逻辑（其他ROI或非抓取状态）
-                    
-                    current = gpio_inst.get()
-                    
-                    # 记录上次状态（用于检测状态变化）
-                    last_state = stability_state["last_gpio_state"].get(name)
-                    
-                    if current is None or current != desired:
-                        if desired == 1:
-                            gpio_inst.high()
-                        else:
-                            # GPIO从高变低（传送带停止），启动稳定等待
-                            gpio_inst.low()
-                            if last_state == 1 and desired == 0:
-                                # 传送带刚停止，启动稳定等待
-                                stability_state["waiting_stable"] = True
-                                stability_state["stable_start_time"] = current_time
-                                if logger:
-                                    logger.info(f"{name}: 传送带停止，等待物体稳定 {stability_state['stable_wait_duration']*1000:.0f}ms")
-                    
-                    # 更新状态记录
-                    stability_state["last_gpio_state"][name] = desired
-                
-                if count > 0 and best_target is None:
-                    sel = TargetSelector.select_by_multi_roi_priority(seasoning, [roi], min_area=min_area)
-                    if sel and sel.get("detection"):
-                        best_target = sel
-                        best_target_roi = name  # 记录该目标来自哪个ROI
-            # 3. 坐标计算和TCP响应
-            tcp_response = None
-            coord_time = 0
-            tcp_time = 0
-            
-            # 只有在非等待稳定状态 AND 机器人非抓取状态时才计算和发送坐标
-            if best_target and depth_data is not None and camera_params is not None:
-                # 条件1：等待物体稳定
-                if stability_state["waiting_stable"]:
-                    if logger and loop_count % 10 == 0:  # 每10帧打印一次，避免刷屏
-                        logger.debug(f"[循环#{loop_count}] 等待物体稳定中，暂不发送坐标")
-                # 条件2：机器人正在抓取
-                elif is_robot_picking:
-                    if logger and loop_count % 10 == 0:  # 每10帧打印一次
-                        logger.debug(f"[循环#{loop_count}] 机器人抓取中，等待complete消息")
-                # 条件3：都满足，可以计算和发送
-                else:
-                    coord_start = time.perf_counter()
-                    coord = CoordinateProcessor.calculate_coordinate_for_detection(best_target["detection"], depth_data, camera_params, None)
-                    coord_time = (time.perf_counter() - coord_start) * 1000
-                    
-                    if coord and coord.get("camera_3d"):
-                        world_xyz = coord["camera_3d"]
-                        robot = world_to_robot_using_calib(world_xyz, ctx.project_root)
-                        if robot and len(robot) >= 3:
-                            x, y, z = robot[0], robot[1], robot[2]
-                        else:
-                            x, y, z = world_xyz[0], world_xyz[1], world_xyz[2]
-                        tcp_response = f"{x:.2f},{y:.2f},{z:.2f}"
-            
-            if tcp_response:
-                tcp_start = time.perf_counter()
-                send_success = False
-                try:
-                    cid = _target_client_id
-                    comm = getattr(getattr(ctx, "initializer", None), "comm", None)
-                    if comm and cid:
-                        comm.push_to_client(cid, tcp_response)
-                        send_success = True
-                    elif comm:
-                        comm.broadcast(tcp_response)
-                        send_success = True
-                except Exception as e:
-                    if logger:
-                        logger.error(f"[循环#{loop_count}] TCP发送失败: {e}")
-                tcp_time = (time.perf_counter() - tcp_start) * 1000
-                
-                # 发送成功后，设置机器人状态为抓取中
-                if send_success:
-                    with _robot_state["lock"]:
-                        _robot_state["is_picking"] = True
-                        _robot_state["picking_roi"] = best_target_roi  # 记录正在抓取的ROI
-                        _robot_state["last_send_time"] = current_time
-                    if logger:
-                        logger.info(f"✓ 坐标已发送 [{tcp_response}]，机器人进入抓取状态（ROI: {best_target_roi}），等待complete消息")
+            _infer_stage(det, frame)
             
-            # 4. 计算总耗时
-            total_time = (time.perf_counter() - loop_start) * 1000
-            
-            # 5. 输出详细日志
-            if logger:
-                # 基础信息（总是显示）
-                log_parts = [
-                    f"[循环#{loop_count}]",
-                    f"取图={capture_time:.1f}ms",
-                    f"检测={detect_time:.1f}ms",
-                    f"检测数={len(dets) if dets else 0}",
-                    f"目标数={len(seasoning)}",
-                    f"ROI1={p1}",
-                    f"ROI2={p2}"
-                ]
-                
-                # TCP响应信息（总是显示）
-                if best_target and tcp_response:
-                    # 情况1：有目标且已发送
-                    log_parts.append(f"坐标={coord_time:.1f}ms")
-                    log_parts.append(f"TCP=[{tcp_response}]")
-                    log_parts.append(f"发送={tcp_time:.1f}ms")
-                elif best_target and not tcp_response:
-                    # 情况2：有目标但未发送，区分原因
-                    if is_robot_picking:
-                        log_parts.append("状态=抓取中")
-                        log_parts.append("TCP=[等待complete]")
-                    elif stability_state["waiting_stable"]:
-                        log_parts.append("状态=等待稳定")
-                        log_parts.append("TCP=[暂不发送]")
-                    else:
-                        log_parts.append(f"坐标={coord_time:.1f}ms")
-                        log_parts.append("TCP=[未发送]")
-                else:
-                    # 情况3：无目标，但要检查机器人是否在抓取中
-                    if is_robot_picking:
-                        # 机器人抓取中，即使无目标（遮挡）也显示抓取中状态
-                        log_parts.append("状态=抓取中(遮挡)")
-                        log_parts.append("TCP=[等待complete]")
-                    else:
-                        # 真正的无目标状态
-                        log_parts.append("状态=无目标")
-                        log_parts.append("TCP=[0,0,0,0,0]")
-                
-                log_parts.append(f"总计={total_time:.1f}ms")
-                
-                # 无目标状态每10条才记录一次，其他情况都记录
-                should_log = True
-                if not best_target and not is_robot_picking:
-                    # 无目标且非抓取中，每10条记录一次
-                    should_log = (loop_count % 10 == 0)
-                
-                if should_log:
-                    logger.info(" | ".join(log_parts))
-                
-                # 详细的性能分析（仅在DEBUG模式下）
-                if logger.level <= 10:  # DEBUG level
-                    perf_details = [
-                        f"  性能分析:",
-                        f"get_frame调用={capture_time:.2f}ms",
-                        f"数据提取={extract_time:.3f}ms",
-                        f"ROI处理={(time.perf_counter() - detect_start - detect_time/1000)*1000:.2f}ms",
-                    ]
-                    logger.debug(" | ".join(perf_details))
+            # 3. ROI统计、GPIO控制、坐标计算和TCP发送
+            _postprocess_stage(ctx, frame, stability_state, logger)
             
             # 显式清理大对象（numpy数组等）以减少内存占用
-            try:
-                del img, depth_data, result, dets, seasoning
-            except Exception:
-                pass
+            frame = None
             
             time.sleep(0.01)  # 从100ms减少到10ms，提高响应速度
             
@@ -430,10 +306,7 @@ def _run_loop(ctx, gpio_map):
                 logger.debug(traceback.format_exc())
             
             # 异常情况下也要清理
-            try:
-                del img, depth_data, result, dets, seasoning
-            except Exception:
-                pass
+            frame = None
             
             time.sleep(0.01)  # 从100ms减少到10ms，提高响应速度
         
@@ -446,4 +319,326 @@ def _run_loop(ctx, gpio_map):
                 pass
 
 
- 
+def _run_pipeline(ctx, pipe_cfg: dict):
+    """
+    流水线模式：取图、推理、后处理分别在独立线程中并发执行
+    - 级间队列有界，满时丢弃最旧帧，保证始终处理最新画面
+    - 后处理（GPIO/机器人状态/TCP）仍只在单一线程中执行，状态逻辑与顺序模式一致
+    """
+    global _pipeline
+    from services.system.pipeline import StagePipeline
+    
+    cam = getattr(ctx, "camera", None)
+    det = getattr(ctx, "detector", None)
+    logger = getattr(ctx, "logger", None)
+    
+    queue_size = int(pipe_cfg.get("queue_size", 2))
+    stats_interval = int(pipe_cfg.get("stats_interval", 100))
+    stability_state = _new_stability_state(ctx)
+    counter = {"grab": 0, "post": 0}
+    
+    def grab():
+        counter["grab"] += 1
+        return _grab_stage(cam, logger, counter["grab"])
+    
+    def infer(frame):
+        return _infer_stage(det, frame)
+    
+    def post(frame):
+        _postprocess_stage(ctx, frame, stability_state, logger)
+        counter["post"] += 1
+        if stats_interval > 0 and counter["post"] % stats_interval == 0:
+            if logger:
+                logger.info(f"流水线统计 | {pipeline.format_stats()}")
+            try:
+                import gc
+                gc.collect()
+            except Exception:
+                pass
+    
+    pipeline = StagePipeline(
+        [("grab", grab), ("infer", infer), ("post", post)],
+        queue_size=queue_size,
+        stop_event=_stop_event,
+        logger=logger,
+        idle_sleep=0.2,
+    )
+    _pipeline = pipeline
+    get_metrics().register_gauge("pipeline", get_pipeline_stats)
+    pipeline.start()
+    try:
+        _stop_event.wait()
+    finally:
+        pipeline.stop(timeout=1.5)
+        if logger:
+            logger.info(f"流水线已停止 | {pipeline.format_stats()}")
+        get_metrics().unregister_gauge("pipeline")
+        _pipeline = None
+
+
+def _grab_stage(cam, logger, seq: int):
+    """取图级：返回帧字典，取图失败返回None"""
+    loop_start = time.perf_counter()
+    result = cam.get_frame(depth=True, intensity=True, camera_params=True)
+    capture_time = (time.perf_counter() - loop_start) * 1000  # 转换为毫秒
+    
+    # 数据提取
+    extract_start = time.perf_counter()
+    img = result.get("intensity_image") if result else None
+    depth_data = result.get("depthmap") if result else None
+    camera_params = result.get("cameraParams") if result else None
+    extract_time = (time.perf_counter() - extract_start) * 1000
+    
+    if img is None:
+        if logger:
+            logger.warning(f"[循环#{seq}] 取图失败 | get_frame={capture_time:.1f}ms")
+        return None
+    
+    return {
+        "seq": seq,
+        "loop_start": loop_start,
+        "img": img,
+        "depth_data": depth_data,
+        "camera_params": camera_params,
+        "capture_time": capture_time,
+        "extract_time": extract_time,
+    }
+
+
+def _infer_stage(det, frame: dict) -> dict:
+    """推理级：在帧字典上附加检测结果与耗时"""
+    detect_start = time.perf_counter()
+    frame["dets"] = det.detect(frame["img"])
+    frame["detect_time"] = (time.perf_counter() - detect_start) * 1000  # 转换为毫秒
+    return frame
+
+
+def _postprocess_stage(ctx, frame: dict, stability_state: dict, logger) -> None:
+    """后处理级：ROI统计、GPIO控制、坐标计算、TCP发送与日志"""
+    loop_count = frame["seq"]
+    loop_start = frame["loop_start"]
+    img = frame["img"]
+    depth_data = frame["depth_data"]
+    camera_params = frame["camera_params"]
+    capture_time = frame["capture_time"]
+    extract_time = frame["extract_time"]
+    dets = frame.get("dets") or []
+    detect_time = frame.get("detect_time", 0.0)
+    
+    post_start = time.perf_counter()
+    current_time = post_start
+    
+    # 检查是否正在等待物体稳定（只影响坐标发送，不影响GPIO控制）
+    if stability_state["waiting_stable"]:
+        elapsed = current_time - stability_state["stable_start_time"]
+        if elapsed >= stability_state["stable_wait_duration"]:
+            # 等待结束，标记为可以发送
+            stability_state["waiting_stable"] = False
+            if logger:
+                logger.info(f"物体已稳定（等待{elapsed*1000:.0f}ms），准备检测和发送")
+    
+    roi_cfg = ctx.config.get("roi") or {}
+    min_area = float(roi_cfg.get("minArea", 0))
+    height, width = img.shape[:2]
+    roi_set = RoiProcessor.get_compiled_rois(roi_cfg, width, height)
+    # 调料目标：类别0且mask面积达标（整批数组运算，面积在解码时已算好）
+    seasoning = DetectionBatch.from_detections(dets).select_class(0).filter_area(min_area)
+    # 一次性计算所有目标与所有ROI的归属（与 handle_catch / TargetSelector 共用）
+    assignment = RoiProcessor.assign_rois(seasoning.centers(), roi_set)
+    # 检查机器人状态（线程安全）- 需要在GPIO控制前获取
+    with _robot_state["lock"]:
+        is_robot_picking = _robot_state["is_picking"]
+        picking_roi_name = _robot_state["picking_roi"]
+        complete_time = _robot_state["complete_time"]
+    
+    # 流水线模式下帧从取图到后处理之间可能已发生停带/抓取完成：
+    # 取图早于稳定时间点或complete的帧画面已过时，不据此停带或发送坐标
+    frame_stale = loop_start < stability_state["stable_until"] or loop_start < complete_time
+    
+    p1 = 0
+    p2 = 0
+    best_target = None
+    best_target_roi = None  # 记录best_target所属的ROI名称
+    # 按ROI顺序绑定的GPIO实例（随编译后的ROI集合缓存）
+    gpio_slots = roi_set.bind_gpio(_gpio_resources)
+    
+    for roi_index, roi in enumerate(roi_set.rois):
+        name = roi.get("name")
+        count = int(assignment.counts[roi_index])
+        if roi.get("priority") == 1:
+            p1 = count
+        elif roi.get("priority") == 2:
+            p2 = count
+        
+        gpio_inst = gpio_slots[roi_index]
+        if gpio_inst:
+            # 关键逻辑：只有当前ROI是正在抓取的ROI时，才强制保持GPIO低电平
+            if is_robot_picking and name == picking_roi_name:
+                desired = 0  # 该ROI正在被抓取，强制低电平，皮带不移动
+            else:
+                desired = 1 if count == 0 else 0  # 正常逻辑（其他ROI或非抓取状态）
+            
+            current = gpio_inst.get()
+            
+            # 记录上次状态（用于检测状态变化）
+            last_state = stability_state["last_gpio_state"].get(name)
+            
+            if desired == 0 and frame_stale:
+                pass  # 过时画面不触发停带，保持当前状态
+            elif current is None or current != desired:
+                if desired == 1:
+                    gpio_inst.high()
+                else:
+                    # GPIO从高变低（传送带停止），启动稳定等待
+                    gpio_inst.low()
+                    if last_state == 1 and desired == 0:
+                        # 传送带刚停止，启动稳定等待
+                        stability_state["waiting_stable"] = True
+                        stability_state["stable_start_time"] = current_time
+                        stability_state["stable_until"] = current_time + stability_state["stable_wait_duration"]
+                        if logger:
+                            logger.info(f"{name}: 传送带停止，等待物体稳定 {stability_state['stable_wait_duration']*1000:.0f}ms")
+            
+            # 更新状态记录
+            if not (desired == 0 and frame_stale):
+                stability_state["last_gpio_state"][name] = desired
+        
+        if count > 0 and best_target is None:
+            sel = TargetSelector.select_from_assignment(seasoning, roi_set, assignment, min_area=min_area, roi_index=roi_index)
+            if sel and sel.get("detection"):
+                best_target = sel
+                best_target_roi = name  # 记录该目标来自哪个ROI
+    # 3. 坐标计算和TCP响应
+    tcp_response = None
+    coord_time = 0
+    tcp_time = 0
+    
+    # 只有在非等待稳定状态 AND 机器人非抓取状态时才计算和发送坐标
+    if best_target and depth_data is not None and camera_params is not None:
+        # 条件1：等待物体稳定
+        if stability_state["waiting_stable"]:
+            if logger and loop_count % 10 == 0:  # 每10帧打印一次，避免刷屏
+                logger.debug(f"[循环#{loop_count}] 等待物体稳定中，暂不发送坐标")
+        # 条件2：机器人正在抓取
+        elif is_robot_picking:
+            if logger and loop_count % 10 == 0:  # 每10帧打印一次
+                logger.debug(f"[循环#{loop_count}] 机器人抓取中，等待complete消息")
+        # 条件3：画面取于停带稳定/抓取完成之前（流水线中积压的帧）
+        elif frame_stale:
+            if logger:
+                logger.debug(f"[循环#{loop_count}] 帧取于稳定/complete之前，跳过坐标发送")
+        # 条件4：都满足，可以计算和发送
+        else:
+            coord_start = time.perf_counter()
+            coord = CoordinateProcessor.calculate_coordinate_for_detection(
+                best_target["detection"], depth_data, camera_params, None, depth_cfg=ctx.config.get("depth")
+            )
+            coord_time = (time.perf_counter() - coord_start) * 1000
+            
+            if coord and coord.get("camera_3d"):
+                world_xyz = coord["camera_3d"]
+                robot = world_to_robot_using_calib(world_xyz, ctx.project_root)
+                if robot and len(robot) >= 3:
+                    x, y, z = robot[0], robot[1], robot[2]
+                else:
+                    x, y, z = world_xyz[0], world_xyz[1], world_xyz[2]
+                tcp_response = f"{x:.2f},{y:.2f},{z:.2f}"
+    
+    if tcp_response:
+        tcp_start = time.perf_counter()
+        send_success = False
+        try:
+            cid = _target_client_id
+            comm = getattr(getattr(ctx, "initializer", None), "comm", None)
+            if comm and cid:
+                comm.push_to_client(cid, tcp_response)
+                send_success = True
+            elif comm:
+                comm.broadcast(tcp_response)
+                send_success = True
+        except Exception as e:
+            if logger:
+                logger.error(f"[循环#{loop_count}] TCP发送失败: {e}")
+        tcp_time = (time.perf_counter() - tcp_start) * 1000
+        
+        # 发送成功后，设置机器人状态为抓取中
+        if send_success:
+            with _robot_state["lock"]:
+                _robot_state["is_picking"] = True
+                _robot_state["picking_roi"] = best_target_roi  # 记录正在抓取的ROI
+                _robot_state["last_send_time"] = current_time
+            if logger:
+                logger.info(f"✓ 坐标已发送 [{tcp_response}]，机器人进入抓取状态（ROI: {best_target_roi}），等待complete消息")
+    
+    # 4. 计算总耗时
+    total_time = (time.perf_counter() - loop_start) * 1000
+    
+    # 记录各阶段耗时直方图（get_metrics 命令 / Prometheus 查询）
+    loop_metrics = {"capture": capture_time, "extract": extract_time, "detect": detect_time, "total": total_time}
+    if coord_time:
+        loop_metrics["coordinates"] = coord_time
+    if tcp_time:
+        loop_metrics["tcp_send"] = tcp_time
+    get_metrics().record_many("loop", loop_metrics)
+    
+    # 5. 输出详细日志
+    if logger:
+        # 基础信息（总是显示）
+        log_parts = [
+            f"[循环#{loop_count}]",
+            f"取图={capture_time:.1f}ms",
+            f"检测={detect_time:.1f}ms",
+            f"检测数={len(dets) if dets else 0}",
+            f"目标数={len(seasoning)}",
+            f"ROI1={p1}",
+            f"ROI2={p2}"
+        ]
+        
+        # TCP响应信息（总是显示）
+        if best_target and tcp_response:
+            # 情况1：有目标且已发送
+            log_parts.append(f"坐标={coord_time:.1f}ms")
+            log_parts.append(f"TCP=[{tcp_response}]")
+            log_parts.append(f"发送={tcp_time:.1f}ms")
+        elif best_target and not tcp_response:
+            # 情况2：有目标但未发送，区分原因
+            if is_robot_picking:
+                log_parts.append("状态=抓取中")
+                log_parts.append("TCP=[等待complete]")
+            elif stability_state["waiting_stable"]:
+                log_parts.append("状态=等待稳定")
+                log_parts.append("TCP=[暂不发送]")
+            else:
+                log_parts.append(f"坐标={coord_time:.1f}ms")
+                log_parts.append("TCP=[未发送]")
+        else:
+            # 情况3：无目标，但要检查机器人是否在抓取中
+            if is_robot_picking:
+                # 机器人抓取中，即使无目标（遮挡）也显示抓取中状态
+                log_parts.append("状态=抓取中(遮挡)")
+                log_parts.append("TCP=[等待complete]")
+            else:
+                # 真正的无目标状态
+                log_parts.append("状态=无目标")
+                log_parts.append("TCP=[0,0,0,0,0]")
+        
+        log_parts.append(f"总计={total_time:.1f}ms")
+        
+        # 无目标状态每10条才记录一次，其他情况都记录
+        should_log = True
+        if not best_target and not is_robot_picking:
+            # 无目标且非抓取中，每10条记录一次
+            should_log = (loop_count % 10 == 0)
+        
+        if should_log:
+            logger.info(" | ".join(log_parts))
+        
+        # 详细的性能分析（仅在DEBUG模式下）
+        if logger.level <= 10:  # DEBUG level
+            perf_details = [
+                f"  性能分析:",
+                f"get_frame调用={capture_time:.2f}ms",
+                f"数据提取={extract_time:.3f}ms",
+                f"ROI处理={(time.perf_counter() - post_start)*1000:.2f}ms",
+            ]
+            logger.debug(" | ".join(perf_details))
@@ -50,28 +50,56 @@ def to_hex(bStr):
 class Streaming:
 
     """ All methods that use the streaming channel. """
-    def __init__(self, ipAddress='192.168.1.10', tcpPort=2114):
+
+    BLOB_HEAD_LEN = 11
+
+    def __init__(self, ipAddress='192.168.1.10', tcpPort=2114, ringSlots=0):
+        """
+        ringSlots: Number of preallocated receive buffers reused round-robin by getFrame().
+                   0 (default) allocates a fresh bytearray per frame and self.frame is that bytearray.
+                   With N > 0 self.frame is a memoryview into one of N buffers, which is overwritten
+                   N frames later. Anything still referencing an older frame (e.g. numpy views created
+                   by Data.read(useNumpy=True)) has to be consumed or copied within that window.
+        """
         self.ipAddress = ipAddress
         self.tcpPort = tcpPort
         self.sock_stream = None
-
-    def _read(self, nBytes):
-        """ Read exactly nBytes from the streaming socket and return the number of bytes read.
-            If the peer hung-up (recv returned an empty string), we return everything read so far (thus less than nBytes).
+        self.ringSlots = max(0, int(ringSlots))
+        self._ring = [bytearray() for _ in range(self.ringSlots)]
+        self._ringIndex = 0
+        self._header = bytearray(self.BLOB_HEAD_LEN)
+
+    def _readInto(self, view, nBytes):
+        """ Read exactly nBytes from the streaming socket into the writable buffer view.
+            Returns the number of bytes read, which is less than nBytes if the peer hung-up.
         """
-        buffer = bytes()
         lenBuffer = 0
         while lenBuffer < nBytes:
-            data = self.sock_stream.recv(
-                nBytes - lenBuffer)  # recv(x) receives maximum (!!) x bytes! No guarante that we receive all required bytes!
-            lenReceived = len(data)
+            # recv_into(x) receives maximum (!!) x bytes! No guarante that we receive all required bytes!
+            lenReceived = self.sock_stream.recv_into(view[lenBuffer:nBytes], nBytes - lenBuffer)
             if lenReceived == 0:
                 break
-
-            # buffer has to be concatinated (appended) with the bytes object (data)
-            buffer += data
             lenBuffer += lenReceived
-        return buffer
+        return lenBuffer
+
+    def _read(self, nBytes):
+        """ Read exactly nBytes from the streaming socket and return the bytes read.
+            If the peer hung-up (recv returned an empty string), we return everything read so far (thus less than nBytes).
+        """
+        buffer = bytearray(nBytes)
+        lenBuffer = self._readInto(memoryview(buffer), nBytes)
+        return bytes(buffer[:lenBuffer])
+
+    def _acquireBuffer(self, nBytes):
+        """ Returns a writable buffer of at least nBytes for the next frame. """
+        if not self.ringSlots:
+            return bytearray(nBytes)
+        slot = self._ringIndex
+        self._ringIndex = (self._ringIndex + 1) % self.ringSlots
+        if len(self._ring[slot]) < nBytes:
+            # never resize in place: older frames may still export views of the previous buffer
+            self._ring[slot] = bytearray(nBytes)
+        return self._ring[slot]
 
     ''' Opens the streaming channel. '''
 
@@ -136,10 +164,11 @@ class Streaming:
 
         keepRunning = True
 
-        BLOB_HEAD_LEN = 11
+        BLOB_HEAD_LEN = self.BLOB_HEAD_LEN
         try:
-            header = self._read(BLOB_HEAD_LEN)  # read exactly the header length!
-            receiveLenth = len(header)
+            # read exactly the header length into the preallocated header buffer!
+            receiveLenth = self._readInto(memoryview(self._header), BLOB_HEAD_LEN)
+            header = self._header if receiveLenth else None
             if receiveLenth < BLOB_HEAD_LEN:
                 raise socket.error(
                     "Network connection closed by peer. Receive length is {} and should be {}".format(receiveLenth,
@@ -154,7 +183,8 @@ class Streaming:
 
         self.frame_acq_time_s = time.time()
 
-        logger.debug("len(header) = %d dump: %s" % (len(header), to_hex(header)))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("len(header) = %d dump: %s" % (len(header), to_hex(bytes(header))))
         assert len(header) == BLOB_HEAD_LEN, "Uh, not enough bytes for BLOB_HEAD_LEN, only %s" % (len(header))
 
         # check if the header content is as expected
@@ -179,19 +209,21 @@ class Streaming:
         logger.debug("pkgLength: %d" % (pkgLength))
         logger.debug("toread: %d" % (toread))
 
-        data = bytearray(len(header) + toread)
+        frameLength = len(header) + toread
+        data = self._acquireBuffer(frameLength)
         view = memoryview(data)
         view[:len(header)] = header
-        view = view[len(header):]
+        view = view[len(header):frameLength]
         while toread:
             nBytes = self.sock_stream.recv_into(view, toread)
             if nBytes == 0:
                 # premature end of connection
-                raise RuntimeError("received {} but requested {} bytes".format(len(data) - len(view), pkgLength))
+                raise RuntimeError("received {} but requested {} bytes".format(frameLength - len(view), pkgLength))
             view = view[nBytes:]
             toread -= nBytes
 
-        self.frame = data
+        # ring buffers are reused (and may be larger than this frame): hand out an exact-length view
+        self.frame = memoryview(data)[:frameLength] if self.ringSlots else data
 
         frame_acq_stop = time.time()
         self.frame_revc_time_s = (frame_acq_stop - self.frame_acq_time_s)
@@ -18,6 +18,8 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 import logging
 import struct
 
+import numpy as np
+
 from common.Streaming.ParserHelper import DepthMap, Polar2DData, CartesianData, MAX_CONFIDENCE
 
 
@@ -34,7 +36,14 @@ class BinaryParser:
                     numBytesDistance,
                     numBytesIntensity,
                     numBytesPerIntensityValue,
-                    numBytesConfidence):
+                    numBytesConfidence,
+                    useNumpy=False):
+        """ Extracts distance, intensity and confidence from the binary segment.
+
+        useNumpy: If this is True, the three planes are returned as little-endian numpy arrays
+                  created with np.frombuffer directly over binarySegment (no copy, read-only views
+                  when the segment is immutable). If this is False, tuples are returned (legacy).
+        """
         position = 0
         # the binary part starts with entries for length, a timestamp
         # and a version identifier
@@ -65,33 +74,55 @@ class BinaryParser:
         dataBlockSize = numBytesDistance + \
                         numBytesIntensity + \
                         numBytesConfidence  # calculating the end index
-        dataBinary = binarySegment[position:position + dataBlockSize]  # whole data block
-        position += dataBlockSize
-        distance = dataBinary[0:numBytesDistance]  # only the distance data (as string)
-
-        logging.debug("Reading distance...")
-        distanceData = struct.unpack('<%uH' % (len(distance) / 2), distance)
-        logging.debug("...done.")
-
-        # extract the intensity data (same procedure as distance)
-        logging.debug("Reading intensity...")
-        off = numBytesDistance
-        intensity = dataBinary[off:numBytesIntensity + off]
-        if numBytesPerIntensityValue == 2:
-            intensityData = struct.unpack('<%uH' % (len(intensity) / 2), intensity)
-        elif numBytesPerIntensityValue == 4:
-            intensityData = struct.unpack('<%uL' % (len(intensity) / 4), intensity)
+        if useNumpy:
+            # build typed views straight over the frame buffer, the planes are never copied
+            logging.debug("Reading distance/intensity/confidence as numpy views...")
+            distanceData = np.frombuffer(binarySegment, dtype='<u2',
+                                         count=numBytesDistance // 2, offset=position)
+            off = position + numBytesDistance
+            if numBytesPerIntensityValue == 2:
+                intensityData = np.frombuffer(binarySegment, dtype='<u2',
+                                              count=numBytesIntensity // 2, offset=off)
+            elif numBytesPerIntensityValue == 4:
+                intensityData = np.frombuffer(binarySegment, dtype='<u4',
+                                              count=numBytesIntensity // 4, offset=off)
+            else:
+                # legacy mode, also used for RGBA -> byte-wise
+                intensityData = np.frombuffer(binarySegment, dtype=np.uint8,
+                                              count=numBytesIntensity, offset=off)
+            off += numBytesIntensity
+            confidenceData = np.frombuffer(binarySegment, dtype='<u2',
+                                           count=numBytesConfidence // 2, offset=off)
+            position += dataBlockSize
+            logging.debug("...done.")
         else:
-            # legacy mode, also used for RGBA -> byte-wise
-            intensityData = struct.unpack('<%uB' % len(intensity), intensity)
-        logging.debug("...done.")
-
-        # extract the confidence data (same procedure as distance)
-        logging.debug("Reading confidence...")
-        off += numBytesIntensity
-        confidence = dataBinary[off:numBytesConfidence + off]
-        confidenceData = struct.unpack('<%uH' % (len(confidence) / 2), confidence)
-        logging.debug("...done.")
+            dataBinary = binarySegment[position:position + dataBlockSize]  # whole data block
+            position += dataBlockSize
+            distance = dataBinary[0:numBytesDistance]  # only the distance data (as string)
+
+            logging.debug("Reading distance...")
+            distanceData = struct.unpack('<%uH' % (len(distance) / 2), distance)
+            logging.debug("...done.")
+
+            # extract the intensity data (same procedure as distance)
+            logging.debug("Reading intensity...")
+            off = numBytesDistance
+            intensity = dataBinary[off:numBytesIntensity + off]
+            if numBytesPerIntensityValue == 2:
+                intensityData = struct.unpack('<%uH' % (len(intensity) / 2), intensity)
+            elif numBytesPerIntensityValue == 4:
+                intensityData = struct.unpack('<%uL' % (len(intensity) / 4), intensity)
+            else:
+                # legacy mode, also used for RGBA -> byte-wise
+                intensityData = struct.unpack('<%uB' % len(intensity), intensity)
+            logging.debug("...done.")
+
+            # extract the confidence data (same procedure as distance)
+            logging.debug("Reading confidence...")
+            off += numBytesIntensity
+            confidence = dataBinary[off:numBytesConfidence + off]
+            confidenceData = struct.unpack('<%uH' % (len(confidence) / 2), confidence)
+            logging.debug("...done.")
 
         # checking if all data is read
         if (position + 4 == lengthAtStart):
@@ -38,7 +38,7 @@ class Data:
 
         self.parsing_time_s = 0
 
-    def read(self, dataBuffer, convertToMM = True):
+    def read(self, dataBuffer, convertToMM = True, useNumpy = False):
         """
         Extracts necessary data segments and triggers parsing of segments. 
         
@@ -48,10 +48,17 @@ class Data:
                        - Tenth millimeters for Visionary S
                        - Quarter millimeters for Visionary T Mini
                        - Millimeters for Visionary T
+        useNumpy:    If this is True, the segments are sliced as memoryviews of dataBuffer and the depth map planes
+                     are numpy arrays viewing the frame buffer (see BinaryParser.getDepthMap). The arrays stay valid
+                     as long as dataBuffer is not overwritten.
         """
 
         parsing_start_time_s = time.time()
 
+        if useNumpy:
+            # slicing a memoryview does not copy, all segments below reference dataBuffer
+            dataBuffer = memoryview(dataBuffer)
+
         # first 11 bytes contain some internal definitions
         # code threw following error:
         #   File "..\common\Data.py", line 50, in read
@@ -111,7 +118,7 @@ class Data:
         if (self.changedCounter < changedCounter[0]):
             logging.debug("XML did change, parsing started.")
             myXMLParser = XMLParser()
-            myXMLParser.parse(xmlSegment)
+            myXMLParser.parse(bytes(xmlSegment))
             self.xmlParser = myXMLParser
             self.changedCounter = changedCounter[0]
         else:
@@ -170,7 +177,8 @@ class Data:
                                        numBytesDistance,
                                        numBytesIntensity,
                                        myXMLParser.numBytesPerIntensityValue,
-                                       numBytesConfidence)
+                                       numBytesConfidence,
+                                       useNumpy=useNumpy)
             logging.debug("...done.")
 
             if convertToMM:
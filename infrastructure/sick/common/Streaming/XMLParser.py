@@ -16,7 +16,11 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 """
 
 import logging
-from xml.etree import cElementTree as ET
+try:
+    from xml.etree import cElementTree as ET
+except ImportError:
+    # cElementTree was removed in Python 3.9, ElementTree uses the C accelerator automatically
+    from xml.etree import ElementTree as ET
 
 
 class XMLParser:
@@ -5,10 +5,13 @@ import os
 import sys
 import vc_camera_cpp
 
+from services.camera.pointcloud import build_point_cloud
+
 
 
 class CppCamera:
-    def __init__(self, ip: str, port: int = 2122, use_single_step: bool = True, logger: Optional[Any] = None, login_attempts=None):
+    def __init__(self, ip: str, port: int = 2122, use_single_step: bool = True, logger: Optional[Any] = None, login_attempts=None,
+                 pointcloud_step: int = 1):
         self._ip = ip
         self._port = port
         self._use_single_step = use_single_step
@@ -18,6 +21,12 @@ class CppCamera:
         self._last_frame_num = 0  # 记录上一帧号（用于检测旧帧复用）
         self._frame_retry_enabled = True  # 是否启用帧号验证和重试
         self._released = False  # 防止重复释放
+        self._pointcloud_step = max(1, int(pointcloud_step))  # 点云默认降采样步长
+        self._recorder = None  # 录制器（FrameRecorder，None 表示不录制）
+
+    def set_recorder(self, recorder) -> None:
+        """设置录制器：C++后端不暴露原始 BLOB，录制解析后的强度图/深度/相机参数；None 停止录制"""
+        self._recorder = recorder
 
     def connect(self) -> bool:
         ok = self._cam.connect()
@@ -83,7 +92,7 @@ class CppCamera:
         except Exception:
             pass
 
-    def get_frame(self, depth: bool = True, intensity: bool = True, camera_params: bool = True) -> Optional[Dict[str, Any]]:
+    def get_frame(self, depth: bool = True, intensity: bool = True, camera_params: bool = True, pointcloud: bool = False) -> Optional[Dict[str, Any]]:
         if not self.is_connected:
             return None
         
@@ -129,6 +138,10 @@ class CppCamera:
             # 更新最后的帧号
             self._last_frame_num = current_frame_num
         
+        recorder = self._recorder
+        if recorder is not None:
+            recorder.write_frame(d)
+        
         # 提取所需数据
         img = d.get("intensity_image") if intensity else None
         dep = d.get("depthmap") if depth else None
@@ -137,13 +150,46 @@ class CppCamera:
         # 之前的 dep.tolist() 会导致 256x256=65536 个元素的转换，耗时约 30-50ms
         # 如果下游需要 list，在使用时再转换
         
-        return {
+        result = {
             "intensity_image": img, 
             "depthmap": dep,  # 保持 numpy.ndarray 格式
             "cameraParams": params_obj,
             "frame_num": current_frame_num,
             "timestamp_ms": timestamp_ms
         }
+        
+        # 整帧世界坐标点云（C++帧不含置信度，仅按深度>0过滤）
+        if pointcloud:
+            result["pointcloud"] = self._build_point_cloud(d)
+        return result
+
+    def get_point_cloud(self, min_confidence: Optional[float] = None, step: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        获取一帧世界坐标点云
+        
+        Args:
+            min_confidence: 保持与 SickCamera 接口一致；C++帧不含置信度，忽略
+            step: 降采样步长（None使用构造参数）
+        
+        Returns:
+            (H, W, 3) float32 点云（无效像素为NaN），失败返回None
+        """
+        frame = self.get_frame(depth=True, intensity=False, camera_params=True)
+        if frame is None:
+            return None
+        return self._build_point_cloud(frame, step=step)
+
+    def _build_point_cloud(self, d: Dict[str, Any], step: Optional[int] = None) -> Optional[np.ndarray]:
+        try:
+            return build_point_cloud(
+                d.get("depthmap"),
+                d.get("cameraParams"),
+                step=self._pointcloud_step if step is None else int(step),
+            )
+        except Exception as e:
+            if self._logger:
+                self._logger.error(f"C++相机点云生成失败: {e}")
+            return None
 
     @property
     def healthy(self) -> bool:
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+点云生成
+将相机帧的深度图整帧反投影为世界坐标点云，供 SickCamera / CppCamera 共用
+"""
+
+from typing import Any, Optional
+import numpy as np
+
+
+def build_point_cloud(
+    depthmap,
+    camera_params: Any,
+    confidence=None,
+    min_confidence: float = 0,
+    step: int = 1,
+) -> Optional[np.ndarray]:
+    """
+    生成 (H, W, 3) float32 世界坐标点云（使用相机的 cam2worldMatrix）
+
+    Args:
+        depthmap: 深度数据（毫米，一维或 H×W）
+        camera_params: 相机参数（width/height/内参/畸变/f2rc/cam2worldMatrix）
+        confidence: 置信度图（与深度同尺寸，可为None）
+        min_confidence: 置信度低于该值的像素置为NaN（0表示不过滤）
+        step: 降采样步长（1为不降采样）
+
+    Returns:
+        点云数组，无效像素（深度为0或置信度不足）为NaN；参数无效返回None
+    """
+    if depthmap is None or camera_params is None:
+        return None
+
+    # 射线表按相机参数缓存，整帧反投影只需一次乘法与一次矩阵变换
+    from services.detection.coordinate_processor import CoordinateProcessor
+
+    step = max(1, int(step))
+    points = CoordinateProcessor.calculate_frame_points(depthmap, camera_params, to_world=True, step=step)
+    if points is None:
+        return None
+
+    height, width = int(camera_params.height), int(camera_params.width)
+    depth = np.asarray(depthmap).reshape(height, width)[::step, ::step]
+    invalid = ~(depth > 0)
+    if confidence is not None and min_confidence > 0:
+        try:
+            conf = np.asarray(confidence).reshape(height, width)[::step, ::step]
+            invalid |= conf < min_confidence
+        except ValueError:
+            pass
+    points[invalid] = np.nan
+    return points
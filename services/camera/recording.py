@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+相机帧录制文件（*.vcrec）
+- 单个追加写入的文件：文件头 + 若干条记录，每条记录为 [类型 u8][时间戳 f64][长度 u32][数据]
+- 类型 BLOB：SICK Python 后端的原始 BLOB 帧（回放时重新解析，解析耗时可复现）
+- 类型 FRAME：C++ 后端解析后的帧（强度图/深度/置信度的原始数组 + 相机参数JSON）
+- 由 ReplayCamera 回放，离线复现解析、检测后处理与ROI逻辑的性能
+"""
+
+import json
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+MAGIC = b"VCREC\x00\x01\n"
+KIND_BLOB = 1
+KIND_FRAME = 2
+
+_RECORD_HEADER = struct.Struct("<BdI")
+_JSON_LEN = struct.Struct("<I")
+_PARAM_FIELDS = ("width", "height", "fx", "fy", "cx", "cy", "k1", "k2", "f2rc")
+_FRAME_ARRAYS = ("intensity_image", "depthmap", "confidence")
+
+
+class FrameRecorder:
+    """
+    相机帧录制器（线程安全）
+
+    使用方式：
+        recorder = FrameRecorder("recordings/sick_20240101_120000.vcrec", max_frames=2000)
+        camera.set_recorder(recorder)     # 相机每取到一帧即写入
+        ...
+        camera.set_recorder(None)
+        recorder.close()
+    """
+
+    def __init__(self, path: str, max_frames: int = 0, max_bytes: int = 0, logger: Optional[Any] = None):
+        """
+        Args:
+            path: 录制文件路径（已存在时追加）
+            max_frames: 最多录制的帧数，0 不限制
+            max_bytes: 文件大小上限（字节），0 不限制；达到上限后停止录制
+            logger: 日志记录器
+        """
+        self.path = path
+        self._max_frames = max(0, int(max_frames))
+        self._max_bytes = max(0, int(max_bytes))
+        self._logger = logger
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self._frames = 0
+        self._bytes = self._file.tell()
+        self._full = False
+
+    def write_blob(self, data, timestamp_s: Optional[float] = None) -> bool:
+        """写入一帧原始 BLOB（bytes / bytearray / memoryview）"""
+        if data is None:
+            return False
+        return self._write(KIND_BLOB, timestamp_s, (data,))
+
+    def write_frame(self, frame: Dict[str, Any], timestamp_s: Optional[float] = None) -> bool:
+        """写入一帧解析后的数据（get_frame 返回的字典：强度图/深度/置信度/相机参数/帧号）"""
+        if not frame:
+            return False
+        meta: Dict[str, Any] = {
+            "frame_num": int(frame.get("frame_num") if frame.get("frame_num") is not None else -1),
+            "timestamp_ms": float(frame.get("timestamp_ms", 0) or 0),
+            "params": params_to_dict(frame.get("cameraParams")),
+            "arrays": [],
+        }
+        chunks = []
+        for key in _FRAME_ARRAYS:
+            value = frame.get(key)
+            if value is None:
+                continue
+            arr = np.ascontiguousarray(value)
+            meta["arrays"].append({"key": key, "dtype": arr.dtype.str, "shape": list(arr.shape)})
+            chunks.append(memoryview(arr).cast("B"))
+        head = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+        return self._write(KIND_FRAME, timestamp_s, [_JSON_LEN.pack(len(head)), head, *chunks])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"path": self.path, "frames": self._frames, "bytes": self._bytes, "full": self._full}
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except Exception:
+                    pass
+                self._file = None
+
+    # internal
+    def _write(self, kind: int, timestamp_s: Optional[float], chunks) -> bool:
+        length = sum(memoryview(c).nbytes for c in chunks)
+        ts = float(timestamp_s) if timestamp_s else time.time()
+        with self._lock:
+            if self._file is None or self._full:
+                return False
+            if (self._max_frames and self._frames >= self._max_frames) or \
+                    (self._max_bytes and self._bytes + _RECORD_HEADER.size + length > self._max_bytes):
+                self._full = True
+                if self._logger:
+                    self._logger.info(f"录制已达上限，停止写入: {self.path} | {self._frames}帧")
+                return False
+            try:
+                self._file.write(_RECORD_HEADER.pack(kind, ts, length))
+                for c in chunks:
+                    self._file.write(c)
+                self._file.flush()
+            except Exception as e:
+                if self._logger:
+                    self._logger.warning(f"录制写入失败: {e}")
+                return False
+            self._frames += 1
+            self._bytes += _RECORD_HEADER.size + length
+            return True
+
+
+class RecordingReader:
+    """
+    录制文件读取（启动时只扫描记录头建立索引；preload=True 时数据全部读入内存）
+
+    使用方式：
+        reader = RecordingReader("recordings/xxx.vcrec")
+        kind, ts, payload = reader.read(0)
+    """
+
+    def __init__(self, path: str, preload: bool = True):
+        self.path = path
+        # [(kind, timestamp_s, offset, length)]
+        self.index: List[Tuple[int, float, int, int]] = []
+        self._payloads: Optional[List[bytes]] = [] if preload else None
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"不是有效的录制文件: {path}")
+            while True:
+                header = f.read(_RECORD_HEADER.size)
+                if len(header) < _RECORD_HEADER.size:
+                    break
+                kind, ts, length = _RECORD_HEADER.unpack(header)
+                if kind not in (KIND_BLOB, KIND_FRAME):
+                    break  # 文件损坏
+                offset = f.tell()
+                if self._payloads is not None:
+                    data = f.read(length)
+                    if len(data) < length:
+                        break  # 录制中断留下的残缺记录
+                    self._payloads.append(data)
+                else:
+                    f.seek(length, os.SEEK_CUR)
+                    if f.tell() > os.fstat(f.fileno()).st_size:
+                        break
+                self.index.append((kind, ts, offset, length))
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def timestamps(self) -> List[float]:
+        return [entry[1] for entry in self.index]
+
+    def read(self, i: int) -> Tuple[int, float, bytes]:
+        kind, ts, offset, length = self.index[i]
+        if self._payloads is not None:
+            return kind, ts, self._payloads[i]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return kind, ts, f.read(length)
+
+
+def decode_frame(payload: bytes) -> Dict[str, Any]:
+    """解析 FRAME 记录：数组为 payload 上的只读视图（不复制）"""
+    (head_len,) = _JSON_LEN.unpack_from(payload, 0)
+    meta = json.loads(bytes(payload[_JSON_LEN.size:_JSON_LEN.size + head_len]).decode("utf-8"))
+    frame: Dict[str, Any] = {key: None for key in _FRAME_ARRAYS}
+    offset = _JSON_LEN.size + head_len
+    for spec in meta.get("arrays", []):
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"])) if spec["shape"] else 1
+        arr = np.frombuffer(payload, dtype=dtype, count=count, offset=offset).reshape(spec["shape"])
+        frame[spec["key"]] = arr
+        offset += count * dtype.itemsize
+    frame["cameraParams"] = params_from_dict(meta.get("params"))
+    frame["frame_num"] = int(meta.get("frame_num", -1))
+    frame["timestamp_ms"] = float(meta.get("timestamp_ms", 0.0))
+    return frame
+
+
+def params_to_dict(params: Any) -> Optional[Dict[str, Any]]:
+    """相机参数对象（SDK CameraParameters 或 C++ 对象）转为字典"""
+    if params is None:
+        return None
+    out: Dict[str, Any] = {}
+    for name in _PARAM_FIELDS:
+        value = getattr(params, name, None)
+        if value is not None:
+            out[name] = int(value) if name in ("width", "height") else float(value)
+    matrix = getattr(params, "cam2worldMatrix", None)
+    if matrix is not None:
+        out["cam2worldMatrix"] = [float(v) for v in np.asarray(matrix, dtype=np.float64).reshape(-1)]
+    return out
+
+
+def params_from_dict(values: Optional[Dict[str, Any]]) -> Any:
+    """字典还原为 SDK CameraParameters（与 SICK Python 后端返回的类型一致）"""
+    if not values:
+        return None
+    from infrastructure.sick.common.Streaming.ParserHelper import CameraParameters
+
+    params = CameraParameters()
+    for name, value in values.items():
+        setattr(params, name, value)
+    return params
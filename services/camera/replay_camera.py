@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+回放相机（无需设备）
+- 读取 FrameRecorder 录制的 *.vcrec 文件，接口与 SickCamera / CppCamera 相同：connect()/get_frame()/healthy
+- 原始 BLOB 记录每次取图时重新解析（与 SICK Python 后端同一路径），解析后的记录直接还原
+- speed=1.0 按录制时的节奏回放（调用方跟不上时与连续流相机一样跳到最新帧），speed<=0 逐帧全速回放
+"""
+
+import bisect
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from services.camera.pointcloud import build_point_cloud
+from services.camera.recording import KIND_BLOB, RecordingReader, decode_frame
+from services.camera.sick_camera import SickCamera
+from infrastructure.sick.common.Streaming.Data import Data
+
+
+class ReplayCamera:
+    """
+    回放相机
+
+    使用方式：
+        cam = ReplayCamera("recordings/sick_20240101_120000.vcrec", speed=0)   # 全速
+        cam.connect()
+        frame = cam.get_frame(depth=True, intensity=True, camera_params=True)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        speed: float = 1.0,
+        loop: bool = True,
+        numpy_parser: bool = True,
+        preload: bool = True,
+        logger: Optional[logging.Logger] = None,
+        pointcloud_min_confidence: float = 0,
+        pointcloud_step: int = 1,
+    ):
+        """
+        Args:
+            path: 录制文件路径
+            speed: 回放速度倍率（1.0 为录制时的速度），<=0 表示逐帧全速回放
+            loop: 播放到末尾后是否从头开始（False 时之后 get_frame 返回None）
+            numpy_parser: 原始 BLOB 记录是否以 numpy 视图解析（同 SickCamera）
+            preload: 连接时是否把全部记录读入内存（避免回放过程中的磁盘IO影响计时）
+            logger: 日志记录器
+            pointcloud_min_confidence: 点云置信度阈值
+            pointcloud_step: 点云降采样步长
+        """
+        self._path = path
+        self._speed = float(speed)
+        self._loop = bool(loop)
+        self._numpy_parser = bool(numpy_parser)
+        self._preload = bool(preload)
+        self._logger = logger or logging.getLogger(__name__)
+        self._pointcloud_min_confidence = float(pointcloud_min_confidence)
+        self._pointcloud_step = max(1, int(pointcloud_step))
+        self._reader: Optional[RecordingReader] = None
+        self._timestamps = []
+        self._parser = None
+        self._lock = threading.Lock()
+        self._last_index = -1
+        self._start_wall = 0.0
+        self._played = 0
+        self._skipped = 0
+        self._loops = 0
+        self.exhausted = False
+        self.is_connected = False
+        self.camera_name = "ReplayCamera"
+
+    def connect(self) -> bool:
+        try:
+            reader = RecordingReader(self._path, preload=self._preload)
+            if len(reader) == 0:
+                self._logger.error(f"录制文件中没有帧: {self._path}")
+                return False
+        except Exception as e:
+            self._logger.error(f"ReplayCamera connect failed: {e}")
+            self.is_connected = False
+            return False
+        self._reader = reader
+        self._timestamps = reader.timestamps()
+        self._rewind()
+        self._loops = 0
+        self.exhausted = False
+        self.is_connected = True
+        mode = "全速" if self._speed <= 0 else f"{self._speed:g}倍速"
+        self._logger.info(f"回放相机已就绪: {self._path} | {len(reader)}帧 | {mode}")
+        return True
+
+    def disconnect(self):
+        self.is_connected = False
+        self._reader = None
+        self._parser = None
+
+    def release(self):
+        self.disconnect()
+
+    def get_camera_name(self) -> Optional[str]:
+        return self.camera_name
+
+    def set_recorder(self, recorder) -> None:
+        """回放时不录制（接口与实际相机一致）"""
+        if recorder is not None:
+            self._logger.warning("回放相机不支持录制")
+
+    def get_frame(
+        self,
+        depth: bool = True,
+        intensity: bool = True,
+        camera_params: bool = True,
+        pointcloud: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        取下一帧（返回格式同 SickCamera.get_frame；timestamp_ms 为录制时的时间）
+        """
+        if not self.is_connected or self._reader is None:
+            self._logger.error("Camera not connected")
+            return None
+        need_depth = depth or pointcloud
+        need_params = camera_params or pointcloud
+        # 解析器复用，取帧与解析串行执行（与实际相机一致）
+        with self._lock:
+            index = self._next_index()
+            if index is None:
+                return None
+            try:
+                kind, ts, payload = self._reader.read(index)
+                if kind == KIND_BLOB:
+                    frame = self._decode_blob(payload, ts, need_depth, intensity, need_params)
+                else:
+                    frame = self._select(decode_frame(payload), need_depth, intensity, need_params)
+            except Exception as e:
+                self._logger.error(f"ReplayCamera 解析第{index}帧失败: {e}")
+                return None
+
+        if pointcloud and frame is not None:
+            try:
+                frame['pointcloud'] = build_point_cloud(
+                    frame.get('depthmap'),
+                    frame.get('cameraParams'),
+                    confidence=frame.get('confidence'),
+                    min_confidence=self._pointcloud_min_confidence,
+                    step=self._pointcloud_step,
+                )
+            except Exception as e:
+                self._logger.error(f"ReplayCamera 点云生成失败: {e}")
+                frame['pointcloud'] = None
+            if not depth:
+                frame['depthmap'] = None
+                frame['confidence'] = None
+            if not camera_params:
+                frame['cameraParams'] = None
+        return frame
+
+    def get_point_cloud(self, min_confidence: Optional[float] = None, step: Optional[int] = None) -> Optional[np.ndarray]:
+        """获取一帧世界坐标点云（参数含义同 SickCamera.get_point_cloud）"""
+        frame = self.get_frame(depth=True, intensity=False, camera_params=True)
+        if frame is None:
+            return None
+        return build_point_cloud(
+            frame.get('depthmap'),
+            frame.get('cameraParams'),
+            confidence=frame.get('confidence'),
+            min_confidence=self._pointcloud_min_confidence if min_confidence is None else float(min_confidence),
+            step=self._pointcloud_step if step is None else int(step),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "frames": len(self._timestamps),
+            "played": self._played,
+            "skipped": self._skipped,
+            "loops": self._loops,
+            "exhausted": self.exhausted,
+        }
+
+    @property
+    def frame_count(self) -> int:
+        return len(self._timestamps)
+
+    @property
+    def healthy(self) -> bool:
+        return bool(self.is_connected)
+
+    # internal
+    def _rewind(self):
+        self._last_index = -1
+        self._start_wall = time.monotonic()
+
+    def _next_index(self) -> Optional[int]:
+        """按回放速度确定下一帧；需要等待时在锁内休眠（与单线程取图的相机行为一致）"""
+        count = len(self._timestamps)
+        if self._last_index >= count - 1:
+            if not self._loop:
+                self.exhausted = True
+                return None
+            self._loops += 1
+            self._rewind()
+
+        if self._speed <= 0:
+            index = self._last_index + 1
+        else:
+            ts0 = self._timestamps[0]
+            elapsed = (time.monotonic() - self._start_wall) * self._speed
+            # 已到时间的最新一帧；若没有新帧则等待下一帧到时
+            index = bisect.bisect_right(self._timestamps, ts0 + elapsed) - 1
+            if index <= self._last_index:
+                index = self._last_index + 1
+                wait = (self._timestamps[index] - ts0) / self._speed - (time.monotonic() - self._start_wall)
+                if wait > 0:
+                    time.sleep(wait)
+            else:
+                self._skipped += index - self._last_index - 1
+        self._last_index = index
+        self._played += 1
+        return index
+
+    def _decode_blob(self, payload: bytes, ts: float, depth: bool, intensity: bool, camera_params: bool):
+        if self._parser is None:
+            self._parser = Data()
+        self._parser.read(payload, convertToMM=True, useNumpy=self._numpy_parser)
+        return SickCamera.frame_from_parser(
+            self._parser, depth, intensity, camera_params,
+            timestamp_ms=ts * 1000.0,
+            logger=self._logger,
+        )
+
+    @staticmethod
+    def _select(frame: Dict[str, Any], depth: bool, intensity: bool, camera_params: bool) -> Dict[str, Any]:
+        if not depth:
+            frame['depthmap'] = None
+            frame['confidence'] = None
+        if not intensity:
+            frame['intensity_image'] = None
+        if not camera_params:
+            frame['cameraParams'] = None
+        return frame
@@ -5,12 +5,15 @@
 SICK 相机服务封装（基于官方 SDK common 包）
 - 提供最小接口：connect()/disconnect()/get_frame()
 - 支持单步触发或连续流
+- 连续流模式下可启用后台采集线程：get_frame() 直接返回最新解析好的帧
+- 支持整帧点云：get_point_cloud() / get_frame(pointcloud=True)
 """
 
 import logging
 from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Union
 import os
 import sys
+import threading
 
 # 确保官方 SDK 的顶层包名 'common' 可被导入
 _SICK_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "infrastructure", "sick"))
@@ -25,8 +28,15 @@ from infrastructure.sick.common.Streaming.Data import Data
 import cv2
 import numpy as np
 
+from services.camera.pointcloud import build_point_cloud
+
 
 class SickCamera:
+    # 接收环形缓冲槽数：帧缓冲在 N 帧后才会被复用，保证解析出的 numpy 视图在此期间有效
+    _STREAM_RING_SLOTS = 3
+    # 采集线程连续失败次数上限（超过后标记断开，由监控器重连）
+    _GRAB_MAX_FAILURES = 20
+
     _LEVEL_ALIASES = {
         "run": Control.USERLEVEL_OPERATOR,
         "operator": Control.USERLEVEL_OPERATOR,
@@ -46,6 +56,11 @@ class SickCamera:
         use_single_step: bool = True,
         logger: Optional[logging.Logger] = None,
         login_attempts: Optional[Iterable[Union[Tuple[Union[int, str], str], Dict[str, Any]]]] = None,
+        numpy_parser: bool = True,
+        grabber: bool = False,
+        grab_timeout: float = 1.0,
+        pointcloud_min_confidence: float = 0,
+        pointcloud_step: int = 1,
     ):
         self._ip = ip
         self._port = port
@@ -55,6 +70,26 @@ class SickCamera:
         self._ctrl: Optional[Control] = None
         self._stream: Optional[Streaming] = None
         self._login_attempts: Sequence[Tuple[int, str]] = self._normalise_login_attempts(login_attempts)
+        # numpy 解析模式：深度/强度/置信度直接以 np.frombuffer 视图构建，避免 struct 元组与 list 往返
+        self._numpy_parser = bool(numpy_parser)
+        # 复用同一个 Data 对象，XML 段仅在 changedCounter 变化时重新解析
+        self._parser: Optional[Data] = None
+        # 后台采集线程 + 单槽“最新帧”邮箱（仅连续流模式有效）
+        self._grabber = bool(grabber) and not use_single_step
+        if grabber and use_single_step:
+            self._logger.warning("单步触发模式下不启用后台采集线程（每次取图需同步触发）")
+        self._grab_timeout = float(grab_timeout)
+        self._grab_thread: Optional[threading.Thread] = None
+        self._grab_stop = threading.Event()
+        self._mailbox_cond = threading.Condition()
+        self._mailbox: Optional[Dict[str, Any]] = None
+        self._mailbox_seq = 0
+        self._consumed_seq = 0
+        # 点云默认参数（get_frame(pointcloud=True) / get_point_cloud() 未指定时使用）
+        self._pointcloud_min_confidence = float(pointcloud_min_confidence)
+        self._pointcloud_step = max(1, int(pointcloud_step))
+        # 录制器（FrameRecorder，None 表示不录制）
+        self._recorder = None
         self.is_connected = False
 
     def connect(self) -> bool:
@@ -76,7 +111,7 @@ class SickCamera:
             cfg.setBlobTcpPort(self._ctrl, 2114)
 
             # 数据流
-            self._stream = Streaming(self._ip, 2114)
+            self._stream = Streaming(self._ip, 2114, ringSlots=self._STREAM_RING_SLOTS)
             self._stream.openStream()
 
             # 模式
@@ -85,13 +120,20 @@ class SickCamera:
             else:
                 self._ctrl.startStream()
 
+            self._parser = Data()
             self.is_connected = True
+            if self._grabber:
+                self._start_grabber()
             return True
         except Exception as e:
             self._logger.error(f"SickCamera connect failed: {e}")
             self.is_connected = False
             return False
 
+    def set_recorder(self, recorder) -> None:
+        """设置录制器（FrameRecorder）：之后取到的每一帧原始 BLOB 都写入录制文件；None 停止录制"""
+        self._recorder = recorder
+
     def get_camera_name(self) -> Optional[str]:
         return getattr(self, "camera_name", None)
 
@@ -155,6 +197,8 @@ class SickCamera:
 
     def disconnect(self):
         try:
+            # 先通知采集线程退出，关闭数据流后阻塞中的 recv 会立即返回
+            self._grab_stop.set()
             if self._ctrl:
                 try:
                     self._ctrl.stopStream()
@@ -172,14 +216,17 @@ class SickCamera:
                     pass
         finally:
             self.is_connected = False
+            self._stop_grabber()
             self._ctrl = None
             self._stream = None
+            self._parser = None
 
     def get_frame(
         self,
         depth: bool = True,
         intensity: bool = True,
-        camera_params: bool = True
+        camera_params: bool = True,
+        pointcloud: bool = False
     ) -> Optional[Dict[str, Any]]:
         """
         获取相机帧并返回处理后的数据
@@ -187,88 +234,273 @@ class SickCamera:
         参考 SickSDK._get_frame_data 的实现
         convert_to_mm 固定为 True
         
+        采集线程模式下不触碰网络，直接从邮箱取出最新且未被取走过的帧；
+        若邮箱中暂无新帧，最多等待 grab_timeout 秒。
+        
         Args:
-            depth: 是否返回深度数据（depthmap对象），默认True
+            depth: 是否返回深度数据，默认True
             intensity: 是否返回处理后的强度图像，默认True
             camera_params: 是否返回相机内参，默认True
+            pointcloud: 是否附加整帧世界坐标点云，默认False
             
         Returns:
             dict: {
-                'depthmap': depthmap object or None,  # 原始深度图对象（包含distance/z/intensity/confidence等）
+                'depthmap': np.ndarray / list or None,  # 深度数据（毫米，一维；numpy 解析模式下为 ndarray）
                 'intensity_image': np.ndarray or None,  # 处理后的强度图像
-                'cameraParams': CameraParams or None  # 相机内参
+                'cameraParams': CameraParams or None,  # 相机内参
+                'confidence': np.ndarray / tuple or None,  # 置信度（与深度同时返回）
+                'pointcloud': np.ndarray,  # 仅 pointcloud=True 时存在，(H, W, 3) float32，无效像素为NaN
+                'frame_num': int,  # 设备帧号（旧格式 BLOB 为 -1）
+                'timestamp_ms': float  # 本机收到该帧的时间（毫秒）
             }
             或 None（如果获取失败）
         """
         if not self.is_connected or not self._ctrl or not self._stream:
             self._logger.error("Camera not connected")
             return None
-            
-        try:
-            if self._use_single_step:
-                self._ctrl.singleStep()
-            
-            # 获取帧数据（参考 SickSDK._get_frame_data 的实现）
-            self._stream.getFrame()
-            wholeFrame = self._stream.frame
-            
-            # 解析数据（convert_to_mm 固定为 True）
-            parser = Data()
-            parser.read(wholeFrame, convertToMM=True)
-            
-            if not getattr(parser, "hasDepthMap", False):
-                self._logger.error("No depth map data available")
+        
+        # 点云需要深度与相机参数
+        need_depth = depth or pointcloud
+        need_params = camera_params or pointcloud
+        
+        if self._grab_thread is not None:
+            frame = self._take_latest(need_depth, intensity, need_params)
+        else:
+            try:
+                if self._use_single_step:
+                    self._ctrl.singleStep()
+                frame = self._capture(need_depth, intensity, need_params)
+            except Exception as e:
+                self._logger.error(f"SickCamera get_frame failed: {e}")
                 return None
+        
+        if pointcloud and frame is not None:
+            self._attach_point_cloud(frame, depth, camera_params)
+        return frame
+
+    def get_point_cloud(
+        self,
+        min_confidence: Optional[float] = None,
+        step: Optional[int] = None
+    ) -> Optional[np.ndarray]:
+        """
+        获取一帧世界坐标点云
+        
+        Args:
+            min_confidence: 置信度阈值（None使用构造参数）
+            step: 降采样步长（None使用构造参数）
+        
+        Returns:
+            (H, W, 3) float32 点云（无效像素为NaN），失败返回None
+        """
+        frame = self.get_frame(depth=True, intensity=False, camera_params=True)
+        if frame is None:
+            return None
+        self._attach_point_cloud(frame, True, True, min_confidence=min_confidence, step=step)
+        return frame.get('pointcloud')
+
+    def _attach_point_cloud(
+        self,
+        frame: Dict[str, Any],
+        depth: bool,
+        camera_params: bool,
+        min_confidence: Optional[float] = None,
+        step: Optional[int] = None
+    ) -> None:
+        """在帧字典上附加点云，并按调用方请求清理为点云额外取出的字段"""
+        try:
+            frame['pointcloud'] = build_point_cloud(
+                frame.get('depthmap'),
+                frame.get('cameraParams'),
+                confidence=frame.get('confidence'),
+                min_confidence=self._pointcloud_min_confidence if min_confidence is None else float(min_confidence),
+                step=self._pointcloud_step if step is None else int(step),
+            )
+        except Exception as e:
+            self._logger.error(f"SickCamera 点云生成失败: {e}")
+            frame['pointcloud'] = None
+        if not depth:
+            frame['depthmap'] = None
+            frame['confidence'] = None
+        if not camera_params:
+            frame['cameraParams'] = None
+
+    def _capture(self, depth: bool, intensity: bool, camera_params: bool) -> Optional[Dict[str, Any]]:
+        """从数据流读取并解析一帧（异常由调用方处理）"""
+        # 获取帧数据（参考 SickSDK._get_frame_data 的实现）
+        self._stream.getFrame()
+        wholeFrame = self._stream.frame
+        
+        # 录制模式：原始 BLOB 帧写入录制文件（ReplayCamera 回放时重新解析）
+        recorder = self._recorder
+        if recorder is not None:
+            recorder.write_blob(wholeFrame, self._stream.frame_acq_time_s)
+        
+        # 解析数据（convert_to_mm 固定为 True）
+        parser = self._parser if self._parser is not None else Data()
+        parser.read(wholeFrame, convertToMM=True, useNumpy=self._numpy_parser)
+        return self.frame_from_parser(
+            parser, depth, intensity, camera_params,
+            timestamp_ms=(self._stream.frame_acq_time_s or 0.0) * 1000.0,
+            logger=self._logger,
+        )
+
+    @staticmethod
+    def frame_from_parser(
+        parser: Data,
+        depth: bool,
+        intensity: bool,
+        camera_params: bool,
+        timestamp_ms: float = 0.0,
+        logger: Optional[logging.Logger] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """由已解析的 Data 构建 get_frame 返回的字典（相机与回放共用）"""
+        if not getattr(parser, "hasDepthMap", False):
+            if logger:
+                logger.error("No depth map data available")
+            return None
+        
+        dm = parser.depthmap
+        params = parser.cameraParams
+        
+        # 准备返回结果
+        result: Dict[str, Any] = {
+            'depthmap': None,
+            'intensity_image': None,
+            'cameraParams': None,
+            'confidence': None,
+            'frame_num': int(getattr(dm, 'frameNumber', -1)),
+            'timestamp_ms': timestamp_ms,
+        }
+        
+        # 返回深度数据（numpy 解析模式下保持 ndarray，与 CppCamera 一致）
+        if depth:
+            # 提取 distance 数据（单位：毫米）
+            distance_data = getattr(dm, 'distance', None)
+            if distance_data is None:
+                # 回退：尝试使用 z 数据
+                distance_data = getattr(dm, 'z', None)
+            if distance_data is None:
+                if logger:
+                    logger.warning("深度图对象没有 distance 或 z 属性")
+            elif isinstance(distance_data, np.ndarray):
+                result['depthmap'] = distance_data
+            else:
+                result['depthmap'] = list(distance_data)
+            # 置信度（点云过滤用，非 numpy 模式下按需再转换）
+            # numpy 模式下是接收缓冲区上的视图，缓冲区随后续帧复用，须复制后再随帧返回
+            confidence = getattr(dm, 'confidence', None)
+            result['confidence'] = np.array(confidence, copy=True) if isinstance(confidence, np.ndarray) else confidence
+        
+        # 处理强度图像
+        if intensity:
+            # 获取图像尺寸
+            width = int(getattr(params, 'width', 0) or getattr(params, 'Width', 0) or 0)
+            height = int(getattr(params, 'height', 0) or getattr(params, 'Height', 0) or 0)
             
-            dm = parser.depthmap
-            params = parser.cameraParams
-            
-            # 准备返回结果
-            result: Dict[str, Any] = {
-                'depthmap': None,
-                'intensity_image': None,
-                'cameraParams': None
-            }
-            
-            # 返回深度数据列表（与 VisionCore 中的格式一致）
-            if depth:
-                # 提取 distance 数据并转换为 list（单位：毫米）
-                distance_data = getattr(dm, 'distance', None)
-                if distance_data is not None:
-                    result['depthmap'] = list(distance_data)
+            if width > 0 and height > 0:
+                intensity_data = getattr(dm, 'intensity', None)
+                if isinstance(intensity_data, np.ndarray):
+                    # 直接对 uint16 视图做对比度调整，convertScaleAbs 输出新的 uint8 图像（OpenCV 不支持 uint32）
+                    intensity_array = intensity_data.reshape((height, width))
+                    if intensity_array.dtype == np.uint32:
+                        intensity_array = intensity_array.astype(np.float32)
+                elif intensity_data is not None:
+                    # 重塑为图像数组
+                    intensity_array = np.array(list(intensity_data), dtype=np.float32).reshape((height, width))
                 else:
-                    # 回退：尝试使用 z 数据
-                    z_data = getattr(dm, 'z', None)
-                    if z_data is not None:
-                        result['depthmap'] = list(z_data)
-                    else:
-                        self._logger.warning("深度图对象没有 distance 或 z 属性")
+                    intensity_array = None
+                if intensity_array is not None:
+                    # 调整对比度（与SickSDK._get_frame_data保持一致：alpha=0.05, beta=1）
+                    adjusted_image = cv2.convertScaleAbs(intensity_array, alpha=0.05, beta=1)
+                    result['intensity_image'] = adjusted_image
+        
+        # 返回相机参数
+        if camera_params:
+            result['cameraParams'] = params
             
-            # 处理强度图像
-            if intensity:
-                # 获取图像尺寸
-                width = int(getattr(params, 'width', 0) or getattr(params, 'Width', 0) or 0)
-                height = int(getattr(params, 'height', 0) or getattr(params, 'Height', 0) or 0)
-                
-                if width > 0 and height > 0:
-                    intensity_data = getattr(dm, 'intensity', None)
-                    if intensity_data is not None:
-                        # 重塑为图像数组
-                        intensity_array = np.array(list(intensity_data), dtype=np.float32).reshape((height, width))
-                        # 调整对比度（与SickSDK._get_frame_data保持一致：alpha=0.05, beta=1）
-                        adjusted_image = cv2.convertScaleAbs(intensity_array, alpha=0.05, beta=1)
-                        result['intensity_image'] = adjusted_image
+        return result
+
+    # --- 后台采集线程 ---
+    def _start_grabber(self) -> None:
+        """启动后台采集线程（仅连续流模式）"""
+        self._stop_grabber()
+        self._grab_stop.clear()
+        with self._mailbox_cond:
+            self._mailbox = None
+            self._mailbox_seq = 0
+            self._consumed_seq = 0
+        self._grab_thread = threading.Thread(target=self._grab_loop, daemon=True, name="SickFrameGrabber")
+        self._grab_thread.start()
+        self._logger.info("SICK 后台采集线程已启动（最新帧邮箱模式）")
+
+    def _stop_grabber(self) -> None:
+        thread = self._grab_thread
+        if thread is None:
+            return
+        self._grab_stop.set()
+        with self._mailbox_cond:
+            self._mailbox_cond.notify_all()
+        if thread is not threading.current_thread():
+            thread.join(timeout=2.0)
+        self._grab_thread = None
+
+    def _grab_loop(self) -> None:
+        """持续读取并解析帧，只保留最新一帧（旧帧直接被覆盖）"""
+        failures = 0
+        while not self._grab_stop.is_set():
+            try:
+                frame = self._capture(True, True, True)
+            except Exception as e:
+                frame = None
+                if failures == 0 or (failures + 1) % 10 == 0:
+                    self._logger.warning(f"SICK 采集线程读取失败: {e}")
             
-            # 返回相机参数
-            if camera_params:
-                result['cameraParams'] = params
-                
-            return result
+            if frame is None:
+                failures += 1
+                if failures >= self._GRAB_MAX_FAILURES:
+                    # 连续失败：视为断线，交由监控器重连
+                    self._logger.error(f"SICK 采集线程连续失败{failures}次，标记相机断开")
+                    self.is_connected = False
+                    with self._mailbox_cond:
+                        self._mailbox_cond.notify_all()
+                    break
+                self._grab_stop.wait(0.05)
+                continue
             
-        except Exception as e:
-            self._logger.error(f"SickCamera get_frame failed: {e}")
-            return None
+            failures = 0
+            with self._mailbox_cond:
+                self._mailbox = frame
+                self._mailbox_seq += 1
+                self._mailbox_cond.notify_all()
+
+    def _take_latest(self, depth: bool, intensity: bool, camera_params: bool) -> Optional[Dict[str, Any]]:
+        """从邮箱取出最新帧；同一帧不会被重复返回"""
+        with self._mailbox_cond:
+            if self._mailbox_seq <= self._consumed_seq:
+                self._mailbox_cond.wait_for(
+                    lambda: self._mailbox_seq > self._consumed_seq
+                    or self._grab_stop.is_set()
+                    or not self.is_connected,
+                    timeout=self._grab_timeout,
+                )
+            if self._mailbox is None or self._mailbox_seq <= self._consumed_seq:
+                self._logger.warning(f"SICK 采集线程 {self._grab_timeout:.1f}s 内无新帧")
+                return None
+            self._consumed_seq = self._mailbox_seq
+            frame = self._mailbox
+        
+        return {
+            'depthmap': frame['depthmap'] if depth else None,
+            'intensity_image': frame['intensity_image'] if intensity else None,
+            'cameraParams': frame['cameraParams'] if camera_params else None,
+            'confidence': frame.get('confidence') if depth else None,
+            'frame_num': frame['frame_num'],
+            'timestamp_ms': frame['timestamp_ms'],
+        }
 
     @property
     def healthy(self) -> bool:
+        if self._grab_thread is not None and not self._grab_thread.is_alive():
+            return False
         return bool(self.is_connected)
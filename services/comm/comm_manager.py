@@ -9,6 +9,8 @@ from .tcp_server import TcpServer
 from .command_router import CommandRouter
 from domain.models.mqtt import MQTTResponse
 from domain.enums.commands import MessageType
+from services.system.metrics import get_metrics
+from services.system.tracing import get_tracer
 
 
 class CommManager:
@@ -162,17 +164,21 @@ class CommManager:
                     message=message,
                     data=data,
                 )
-                result = self._router.route(req)
-                # 按配置发布响应
-                if isinstance(result, MQTTResponse) and self._mqtt is not None:
-                    try:
-                        pub_map = (self._config.get("mqtt") or {}).get("topics", {}).get("publish", {})
-                        topic = pub_map.get("message")
-                        if topic:
-                            payload_out = json.dumps(result.to_dict(), ensure_ascii=False)
-                            self._mqtt.publish(topic, payload_out)
-                    except Exception:
-                        pass
+                t0 = time.perf_counter()
+                with get_tracer().trace(f"mqtt.{command.lower()}"):
+                    result = self._router.route(req)
+                    get_metrics().record(f"mqtt.{command.lower()}", (time.perf_counter() - t0) * 1000.0)
+                    # 按配置发布响应
+                    if isinstance(result, MQTTResponse) and self._mqtt is not None:
+                        try:
+                            pub_map = (self._config.get("mqtt") or {}).get("topics", {}).get("publish", {})
+                            topic = pub_map.get("message")
+                            if topic:
+                                payload_out = json.dumps(result.to_dict(), ensure_ascii=False)
+                                with get_tracer().span("mqtt.publish"):
+                                    self._mqtt.publish(topic, payload_out)
+                        except Exception:
+                            pass
             except Exception as e:
                 if self._logger:
                     self._logger.error(f"MQTT route error: {e}")
@@ -245,19 +251,25 @@ class CommManager:
                     message="",
                     data=data,
                 )
-                result = self._router.route(req)
-                
-                # 发送结果到MQTT（如果MQTT已启用）
-                if isinstance(result, MQTTResponse) and self._mqtt is not None:
-                    try:
-                        pub_map = (self._config.get("mqtt") or {}).get("topics", {}).get("publish", {})
-                        topic = pub_map.get("message")
-                        if topic:
-                            payload_out = json.dumps(result.to_dict(), ensure_ascii=False)
-                            self._mqtt.publish(topic, payload_out)
-                    except Exception as e:
-                        if self._logger:
-                            self._logger.error(f"发送TCP结果到MQTT失败: {e}")
+                # 每条TCP命令一个trace（handler/相机/检测/发布等阶段记为其下的span，可用 dump_trace 导出）
+                with get_tracer().trace(f"tcp.{command.strip().lower()}", client=client_id):
+                    # 与MQTT路径同一计时口径：单调时钟，从调用处理器开始到处理完成（回写耗时由TCP服务器记为 tcp.reply_send）
+                    t0 = time.perf_counter()
+                    result = self._router.route(req)
+                    get_metrics().record(f"tcp.{req.command.strip().lower()}", (time.perf_counter() - t0) * 1000.0)
+                    
+                    # 发送结果到MQTT（如果MQTT已启用）
+                    if isinstance(result, MQTTResponse) and self._mqtt is not None:
+                        try:
+                            pub_map = (self._config.get("mqtt") or {}).get("topics", {}).get("publish", {})
+                            topic = pub_map.get("message")
+                            if topic:
+                                payload_out = json.dumps(result.to_dict(), ensure_ascii=False)
+                                with get_tracer().span("mqtt.publish"):
+                                    self._mqtt.publish(topic, payload_out)
+                        except Exception as e:
+                            if self._logger:
+                                self._logger.error(f"发送TCP结果到MQTT失败: {e}")
                 
                 # TCP响应处理（返回给TCP客户端）
                 if isinstance(result, MQTTResponse):
@@ -276,6 +288,24 @@ class CommManager:
                 return None
         return _on_message
 
+    def publish_message(self, result: MQTTResponse) -> bool:
+        """主动发布一条消息到 MQTT 的 message 主题（用于后台任务完成后的补充通知）"""
+        if self._mqtt is None or not isinstance(result, MQTTResponse):
+            return False
+        try:
+            import json
+            pub_map = (self._config.get("mqtt") or {}).get("topics", {}).get("publish", {})
+            topic = pub_map.get("message")
+            if not topic:
+                return False
+            with get_tracer().span("mqtt.publish"):
+                self._mqtt.publish(topic, json.dumps(result.to_dict(), ensure_ascii=False))
+            return True
+        except Exception as e:
+            if self._logger:
+                self._logger.error(f"发布MQTT消息失败: {e}")
+            return False
+
     def push_to_client(self, cid: str, text: str) -> bool:
         if not self._tcp:
             return False
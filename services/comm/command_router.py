@@ -17,6 +17,7 @@ from handlers import camera as h_camera
 from handlers import detection as h_detection
 from handlers import calibration as h_calibration
 from handlers import system as h_system
+from services.system.tracing import get_tracer
 
 
 class CommandRouter:
@@ -25,7 +26,7 @@ class CommandRouter:
         self._ctx = CommandContext(
             config={}, camera=None, detector=None, sftp=None, monitor=None, logger=None,
             project_root=os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")),
-            initializer=None, gpio=None
+            initializer=None, gpio=None, uploader=None
         )
 
     def register(self, command: str, handler: Callable[[MQTTResponse], MQTTResponse]):
@@ -39,7 +40,8 @@ class CommandRouter:
         handler = self._handlers.get(normalized)
         if not handler:
             raise ValueError(f"Unknown command: {req.command}")
-        return handler(req)
+        with get_tracer().span(f"handler.{normalized.lower()}"):
+            return handler(req)
 
     # 由外部注入依赖；可多次调用，按需更新
     def bind(self, **kwargs):
@@ -62,6 +64,10 @@ class CommandRouter:
         self.register(VisionCoreCommands.CATCH.value, lambda req: h_detection.handle_catch(req, self._ctx))
         self.register(VisionCoreCommands.START.value, lambda req: h_system.handle_start(req, self._ctx))
         self.register(VisionCoreCommands.STOP.value, lambda req: h_system.handle_stop(req, self._ctx))
+        # 运行指标（各阶段耗时分位数）
+        self.register(VisionCoreCommands.GET_METRICS.value, lambda req: h_system.handle_get_metrics(req, self._ctx))
+        # 链路追踪（Chrome trace-event JSON）
+        self.register(VisionCoreCommands.DUMP_TRACE.value, lambda req: h_system.handle_dump_trace(req, self._ctx))
 
     # 处理逻辑已全部下沉至 services/comm/handlers/*
 
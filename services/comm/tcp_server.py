@@ -14,6 +14,8 @@ import time
 from dataclasses import dataclass
 from datetime import datetime
 
+from services.system.metrics import get_metrics
+
 
 @dataclass
 class _ClientInfo:
@@ -181,7 +183,9 @@ class TcpServer:
                             try:
                                 resp = self._on_message(cid, line)
                                 if isinstance(resp, str) and resp:
+                                    t0 = time.perf_counter()
                                     self._send(sock, resp)
+                                    get_metrics().record("tcp.reply_send", (time.perf_counter() - t0) * 1000.0)
                             except Exception:
                                 pass
                 except socket.timeout:
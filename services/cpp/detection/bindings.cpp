@@ -3,6 +3,7 @@
 #include <pybind11/stl.h>
 #include "DetectorLib.h"
 #include "RKNNDetector.h"
+#include <algorithm>
 #include <cstring>
 
 namespace py = pybind11;
@@ -91,6 +92,69 @@ PYBIND11_MODULE(vc_detection_cpp, m) {
             auto [data, height, width, channels] = numpy_to_image_data(img);
             return svc.detect(data, height, width, channels);
         }, py::arg("image"), "Perform detection")
+        .def("detect_arrays", [](DetectionService& svc, py::array_t<uint8_t> img) {
+            // Struct-of-arrays result: avoids creating one Python object per box.
+            // Masks are cropped to their (clamped) box and returned as box-local arrays.
+            auto [data, height, width, channels] = numpy_to_image_data(img);
+            std::vector<DetectionBox> dets = svc.detect(data, height, width, channels);
+            
+            const py::ssize_t n = static_cast<py::ssize_t>(dets.size());
+            py::array_t<int32_t> boxes({n, static_cast<py::ssize_t>(4)});
+            py::array_t<float> scores(n);
+            py::array_t<int32_t> class_ids(n);
+            py::array_t<int32_t> offsets({n, static_cast<py::ssize_t>(2)});
+            py::list masks;
+            
+            auto b = boxes.mutable_unchecked<2>();
+            auto s = scores.mutable_unchecked<1>();
+            auto c = class_ids.mutable_unchecked<1>();
+            auto o = offsets.mutable_unchecked<2>();
+            
+            for (py::ssize_t i = 0; i < n; ++i) {
+                const DetectionBox& box = dets[i];
+                b(i, 0) = box.xmin;
+                b(i, 1) = box.ymin;
+                b(i, 2) = box.xmax;
+                b(i, 3) = box.ymax;
+                s(i) = box.score;
+                c(i) = box.class_id;
+                
+                const int mh = box.mask_height;
+                const int mw = box.mask_width;
+                if (box.seg_mask.empty() || static_cast<size_t>(mh) * mw != box.seg_mask.size()) {
+                    o(i, 0) = box.xmin;
+                    o(i, 1) = box.ymin;
+                    masks.append(py::none());
+                    continue;
+                }
+                
+                const int x0 = std::max(0, std::min(box.xmin, mw));
+                const int y0 = std::max(0, std::min(box.ymin, mh));
+                const int x1 = std::max(x0, std::min(box.xmax, mw));
+                const int y1 = std::max(y0, std::min(box.ymax, mh));
+                const int lw = x1 - x0;
+                const int lh = y1 - y0;
+                
+                py::array_t<uint8_t> local({lh, lw});
+                uint8_t* dst = static_cast<uint8_t*>(local.request().ptr);
+                for (int y = 0; y < lh; ++y) {
+                    std::memcpy(dst + static_cast<size_t>(y) * lw,
+                                box.seg_mask.data() + static_cast<size_t>(y0 + y) * mw + x0,
+                                lw);
+                }
+                o(i, 0) = x0;
+                o(i, 1) = y0;
+                masks.append(local);
+            }
+            
+            py::dict out;
+            out["boxes"] = boxes;
+            out["scores"] = scores;
+            out["class_ids"] = class_ids;
+            out["masks"] = masks;
+            out["mask_offsets"] = offsets;
+            return out;
+        }, py::arg("image"), "Perform detection, return dict of arrays with box-local masks")
         .def("release", &DetectionService::release, "Release resources");
     
     // RKNNDetector class binding
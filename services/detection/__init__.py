@@ -10,6 +10,8 @@
 
 from .coordinate_processor import CoordinateProcessor
 from .roi_processor import RoiProcessor
+from .nms_processor import NmsProcessor
+from .batch import DetectionBatch
 from .target_selector import TargetSelector
 from .visualizer import DetectionVisualizer
 from .factory import create_detector
@@ -17,6 +19,8 @@ from .factory import create_detector
 __all__ = [
     'CoordinateProcessor',
     'RoiProcessor',
+    'NmsProcessor',
+    'DetectionBatch',
     'TargetSelector',
     'DetectionVisualizer',
     'create_detector',
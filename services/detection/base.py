@@ -1,8 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from typing import List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -14,6 +14,120 @@ class DetectionBox:
     xmax: int
     ymax: int
     seg_mask: Optional["np.ndarray"] = None  # 延迟导入以避免硬依赖
+    mask_offset: Optional[Tuple[int, int]] = None  # seg_mask为框内局部mask时其左上角(x, y)；None表示整幅图尺寸
+    _mask_cache: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def compact(self) -> "DetectionBox":
+        """
+        压缩mask并预先计算面积、质心（检测后端解码时调用一次）
+        - 整幅图mask裁剪为非零像素外接矩形内的局部mask，记录偏移
+        - 已是局部mask时只计算派生属性
+        """
+        if self.seg_mask is not None and self.mask_offset is None:
+            import cv2
+            import numpy as np
+            mask = self.seg_mask if self.seg_mask.dtype == np.uint8 else (self.seg_mask > 0).astype(np.uint8)
+            x, y, w, h = cv2.boundingRect(mask)
+            # 拷贝局部区域，释放整幅图mask
+            self.seg_mask = np.ascontiguousarray(mask[y:y + h, x:x + w]) if w > 0 and h > 0 else np.zeros((0, 0), dtype=np.uint8)
+            self.mask_offset = (int(x), int(y))
+        _ = self.mask_area, self.mask_centroid
+        return self
+
+    @property
+    def mask_area(self) -> Optional[float]:
+        """mask像素数（缓存），无mask返回None"""
+        return self._cached("area", self._compute_area)
+
+    @property
+    def mask_centroid(self) -> Optional[Tuple[float, float]]:
+        """mask质心(x, y)，整幅图坐标（缓存），无mask或空mask返回None"""
+        return self._cached("centroid", self._compute_centroid)
+
+    @property
+    def contour(self) -> Optional["np.ndarray"]:
+        """mask最大外轮廓 (N, 1, 2) int32，整幅图坐标（缓存），无mask返回None"""
+        return self._cached("contour", self._compute_contour)
+
+    def full_mask(self, height: int, width: int) -> Optional["np.ndarray"]:
+        """将mask展开为整幅图尺寸（局部mask按偏移放回，超出图像部分裁掉）"""
+        if self.seg_mask is None:
+            return None
+        if self.mask_offset is None:
+            return self.seg_mask
+        import numpy as np
+        full = np.zeros((height, width), dtype=self.seg_mask.dtype)
+        x0, y0 = self.mask_offset
+        mh, mw = self.seg_mask.shape[:2]
+        x1, y1 = min(width, x0 + mw), min(height, y0 + mh)
+        if x1 > x0 and y1 > y0:
+            full[y0:y1, x0:x1] = self.seg_mask[:y1 - y0, :x1 - x0]
+        return full
+
+    # internal
+    def _cached(self, key: str, compute):
+        if self.seg_mask is None:
+            return None
+        # seg_mask被整体替换时缓存失效
+        if self._mask_cache.get("_id") is not self.seg_mask:
+            self._mask_cache.clear()
+            self._mask_cache["_id"] = self.seg_mask
+        if key not in self._mask_cache:
+            self._mask_cache[key] = compute()
+        return self._mask_cache[key]
+
+    def _local_u8(self):
+        import numpy as np
+        mask = self.seg_mask
+        if mask.dtype != np.uint8 or mask.ndim != 2:
+            mask = (mask.reshape(mask.shape[0], -1) > 0).astype(np.uint8)
+        return mask
+
+    def _compute_area(self) -> float:
+        import numpy as np
+        return float(np.count_nonzero(self.seg_mask))
+
+    def _compute_centroid(self) -> Optional[Tuple[float, float]]:
+        import cv2
+        mask = self._local_u8()
+        if mask.size == 0:
+            return None
+        m = cv2.moments(mask, binaryImage=True)
+        if m["m00"] <= 0:
+            return None
+        ox, oy = self.mask_offset or (0, 0)
+        return (m["m10"] / m["m00"] + ox, m["m01"] / m["m00"] + oy)
+
+    def _compute_contour(self):
+        import cv2
+        mask = self._local_u8()
+        if mask.size == 0:
+            return None
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE,
+                                       offset=tuple(self.mask_offset or (0, 0)))
+        if not contours:
+            return None
+        return max(contours, key=cv2.contourArea)
+
+
+def mask_area_of(detection: Any) -> Optional[float]:
+    """
+    获取检测结果的mask面积（像素数）
+    DetectionBox直接使用缓存；其他带seg_mask的对象回退为逐像素统计
+
+    Returns:
+        面积；无mask返回None
+    """
+    if isinstance(detection, DetectionBox):
+        return detection.mask_area
+    mask = getattr(detection, 'seg_mask', None)
+    if mask is None:
+        return None
+    try:
+        import numpy as np
+        return float(np.count_nonzero(np.asarray(mask)))
+    except Exception:
+        return None
 
 
 class DetectionService:
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+检测结果批（结构数组）
+以 NumPy 数组保存一帧的全部检测结果，过滤、ROI判断、排序可整体向量化；
+同时兼容 List[DetectionBox] 的用法（len/迭代/下标/切片/真值判断）
+"""
+
+from typing import Any, Iterable, List, Optional, Sequence
+import numpy as np
+
+from .base import DetectionBox, mask_area_of
+
+
+class DetectionBatch:
+    """
+    检测结果批
+
+    字段（长度均为N）：
+    - boxes: (N, 4) int32，xmin, ymin, xmax, ymax
+    - scores: (N,) float32
+    - class_ids: (N,) int32
+    - masks: 长度N的列表，元素为框内局部mask或None
+    - mask_offsets: (N, 2) int32，局部mask左上角(x, y)
+    - areas: (N,) float32，mask像素数；无mask为NaN
+
+    元素按需生成 DetectionBox 并缓存（同一批次内多次访问返回同一对象）
+    """
+
+    __slots__ = ("boxes", "scores", "class_ids", "masks", "mask_offsets", "areas", "_items")
+
+    def __init__(
+        self,
+        boxes: Optional[np.ndarray] = None,
+        scores: Optional[np.ndarray] = None,
+        class_ids: Optional[np.ndarray] = None,
+        masks: Optional[Sequence[Optional[np.ndarray]]] = None,
+        mask_offsets: Optional[np.ndarray] = None,
+        areas: Optional[np.ndarray] = None,
+        _items: Optional[List[Any]] = None,
+    ):
+        self.boxes = np.asarray(boxes if boxes is not None else np.empty((0, 4)), dtype=np.int32).reshape(-1, 4)
+        n = self.boxes.shape[0]
+        self.scores = np.asarray(scores, dtype=np.float32).reshape(-1) if scores is not None else np.zeros(n, dtype=np.float32)
+        self.class_ids = np.asarray(class_ids, dtype=np.int32).reshape(-1) if class_ids is not None else np.zeros(n, dtype=np.int32)
+        self.masks = list(masks) if masks is not None else [None] * n
+        if mask_offsets is not None:
+            self.mask_offsets = np.asarray(mask_offsets, dtype=np.int32).reshape(-1, 2)
+        else:
+            self.mask_offsets = np.ascontiguousarray(self.boxes[:, :2])
+        if areas is not None:
+            self.areas = np.asarray(areas, dtype=np.float32).reshape(-1)
+        else:
+            self.areas = np.array(
+                [np.nan if m is None else float(np.count_nonzero(m)) for m in self.masks], dtype=np.float32
+            ).reshape(-1)
+        self._items = list(_items) if _items is not None else [None] * n
+
+        if not (len(self.scores) == len(self.class_ids) == len(self.masks) == len(self.mask_offsets) == len(self.areas) == n):
+            raise ValueError("DetectionBatch字段长度不一致")
+
+    # ---- 构造 ----
+    @classmethod
+    def from_detections(cls, detections: Iterable[Any]) -> "DetectionBatch":
+        """
+        由检测结果列表构造（已是DetectionBatch则原样返回）
+        原对象作为元素保留，过滤后返回的仍是同一批对象
+        """
+        if isinstance(detections, DetectionBatch):
+            return detections
+        items = list(detections or [])
+        n = len(items)
+        boxes = np.zeros((n, 4), dtype=np.int32)
+        scores = np.zeros(n, dtype=np.float32)
+        class_ids = np.zeros(n, dtype=np.int32)
+        offsets = np.zeros((n, 2), dtype=np.int32)
+        areas = np.full(n, np.nan, dtype=np.float32)
+        masks: List[Optional[np.ndarray]] = []
+        for i, d in enumerate(items):
+            boxes[i] = (
+                int(getattr(d, 'xmin', 0)), int(getattr(d, 'ymin', 0)),
+                int(getattr(d, 'xmax', 0)), int(getattr(d, 'ymax', 0)),
+            )
+            scores[i] = float(getattr(d, 'score', 0.0))
+            class_ids[i] = int(getattr(d, 'class_id', getattr(d, 'classId', -1)))
+            mask = getattr(d, 'seg_mask', None)
+            masks.append(mask if isinstance(mask, np.ndarray) else None)
+            offset = getattr(d, 'mask_offset', None)
+            offsets[i] = offset if offset is not None else (0, 0)
+            area = mask_area_of(d) if masks[-1] is not None else None
+            if area is not None:
+                areas[i] = area
+        return cls(boxes, scores, class_ids, masks, offsets, areas, _items=items)
+
+    # ---- 列表兼容 ----
+    def __len__(self) -> int:
+        return self.boxes.shape[0]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._item(i)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            n = len(self)
+            if key < 0:
+                key += n
+            if not 0 <= key < n:
+                raise IndexError("DetectionBatch index out of range")
+            return self._item(int(key))
+        return self.take(key)
+
+    def __repr__(self) -> str:
+        return f"<DetectionBatch n={len(self)}>"
+
+    def to_list(self) -> List[Any]:
+        return list(self)
+
+    # ---- 向量化操作 ----
+    def take(self, index) -> "DetectionBatch":
+        """按索引数组、布尔掩码或切片取子集"""
+        idx = np.arange(len(self))[index]
+        idx = np.atleast_1d(idx)
+        return DetectionBatch(
+            self.boxes[idx],
+            self.scores[idx],
+            self.class_ids[idx],
+            [self.masks[i] for i in idx],
+            self.mask_offsets[idx],
+            self.areas[idx],
+            _items=[self._items[i] for i in idx],
+        )
+
+    def centers(self) -> np.ndarray:
+        """检测框中心点 (N, 2) float32"""
+        b = self.boxes.astype(np.float32)
+        return np.stack([(b[:, 0] + b[:, 2]) * 0.5, (b[:, 1] + b[:, 3]) * 0.5], axis=1)
+
+    def select_class(self, class_id: int) -> "DetectionBatch":
+        return self.take(self.class_ids == int(class_id))
+
+    def filter_area(self, min_area: float) -> "DetectionBatch":
+        """保留有mask且面积不小于min_area的目标"""
+        with np.errstate(invalid='ignore'):
+            keep = ~np.isnan(self.areas) & (self.areas >= float(min_area))
+        return self.take(keep)
+
+    def sorted_by_score(self) -> "DetectionBatch":
+        return self.take(np.argsort(-self.scores, kind='stable'))
+
+    # internal
+    def _item(self, i: int):
+        item = self._items[i]
+        if item is None:
+            mask = self.masks[i]
+            xmin, ymin, xmax, ymax = (int(v) for v in self.boxes[i])
+            item = DetectionBox(
+                class_id=int(self.class_ids[i]),
+                score=float(self.scores[i]),
+                xmin=xmin,
+                ymin=ymin,
+                xmax=xmax,
+                ymax=ymax,
+                seg_mask=mask,
+                mask_offset=(int(self.mask_offsets[i, 0]), int(self.mask_offsets[i, 1])) if mask is not None else None,
+            )
+            if mask is not None and not np.isnan(self.areas[i]):
+                # 面积已在解码时算好，直接填入缓存
+                item._mask_cache.update({"_id": mask, "area": float(self.areas[i])})
+            self._items[i] = item
+        return item
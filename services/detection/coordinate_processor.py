@@ -8,9 +8,12 @@
 """
 
 from typing import List, Optional, Tuple, Dict, Any
+import threading
 import numpy as np
 import math
 
+from .base import mask_area_of
+
 
 class CoordinateProcessor:
     """
@@ -28,6 +31,14 @@ class CoordinateProcessor:
     - 可视化（由 DetectionVisualizer 负责）
     """
     
+    # 深度估计方法：center=中心3×3邻域平均；其余基于分割mask内的有效深度
+    DEPTH_METHODS = ('center', 'median', 'trimmed_mean', 'percentile')
+    
+    # 射线查找表缓存：{相机参数键: (H, W, 3) float32}
+    _ray_lock = threading.Lock()
+    _ray_tables: Dict[Tuple, np.ndarray] = {}
+    _ray_table_limit = 4
+    
     @staticmethod
     def _calculate_3d_fast(x: float, y: float, depth: float, 
                           cx: float, cy: float, fx: float, fy: float,
@@ -78,6 +89,176 @@ class CoordinateProcessor:
         except Exception:
             return False, [0.0, 0.0, 0.0]
     
+    @staticmethod
+    def _ray_key(camera_params: Any) -> Tuple:
+        """射线表缓存键：只与图像尺寸和内参/畸变系数有关"""
+        return (
+            int(camera_params.width), int(camera_params.height),
+            float(camera_params.cx), float(camera_params.cy),
+            float(camera_params.fx), float(camera_params.fy),
+            float(camera_params.k1), float(camera_params.k2),
+        )
+    
+    @classmethod
+    def get_ray_table(cls, camera_params: Any) -> np.ndarray:
+        """
+        获取逐像素射线方向查找表（按相机参数缓存，参数变化时重建）
+        
+        射线已包含畸变校正与 s0_inv 归一化，像素 (x, y) 的相机坐标为：
+            ray[y, x] * depth - (0, 0, f2rc)
+        
+        Args:
+            camera_params: 相机参数对象
+        
+        Returns:
+            (H, W, 3) float32 射线表（只读）
+        """
+        key = cls._ray_key(camera_params)
+        with cls._ray_lock:
+            table = cls._ray_tables.get(key)
+        if table is not None:
+            return table
+        
+        width, height, cx, cy, fx, fy, k1, k2 = key
+        xp = ((cx - np.arange(width, dtype=np.float64)) / fx)[None, :]
+        yp = ((cy - np.arange(height, dtype=np.float64)) / fy)[:, None]
+        r2 = xp * xp + yp * yp
+        k = 1 + k1 * r2 + k2 * r2 * r2
+        xd = xp * k
+        yd = yp * k
+        s0_inv = 1.0 / np.sqrt(xd * xd + yd * yd + 1)
+        table = np.stack([xd * s0_inv, yd * s0_inv, s0_inv], axis=-1).astype(np.float32)
+        table.setflags(write=False)
+        
+        with cls._ray_lock:
+            if len(cls._ray_tables) >= cls._ray_table_limit:
+                cls._ray_tables.clear()
+            cls._ray_tables[key] = table
+        return table
+    
+    @staticmethod
+    def _cam2world_matrix(camera_params: Any) -> Optional[np.ndarray]:
+        """相机内置的相机→世界变换矩阵 (4x4)，无效返回None"""
+        m = getattr(camera_params, 'cam2worldMatrix', None)
+        if m is not None and len(m) == 16:
+            return np.array(m, dtype=np.float64).reshape(4, 4)
+        return None
+    
+    @classmethod
+    def calculate_frame_points(
+        cls,
+        depth_data,
+        camera_params: Any,
+        to_world: bool = True,
+        step: int = 1
+    ) -> Optional[np.ndarray]:
+        """
+        整帧深度图反投影为点云（射线表 × 深度 + 一次矩阵变换）
+        
+        Args:
+            depth_data: 深度数据（一维或 H×W）
+            camera_params: 相机参数对象
+            to_world: 是否用 cam2worldMatrix 转换到世界坐标
+            step: 降采样步长（每隔step个像素取一点，1为不降采样）
+        
+        Returns:
+            (H/step, W/step, 3) float32 点坐标（深度为0的像素结果无意义，由调用方按深度过滤）；
+            参数无效返回None
+        """
+        try:
+            if depth_data is None or camera_params is None:
+                return None
+            rays = cls.get_ray_table(camera_params)
+            height, width = rays.shape[:2]
+            depth = np.asarray(depth_data, dtype=np.float32).reshape(height, width)
+            step = max(1, int(step))
+            if step > 1:
+                rays = rays[::step, ::step]
+                depth = depth[::step, ::step]
+            
+            points = rays * depth[..., None]
+            points[..., 2] -= np.float32(camera_params.f2rc)
+            
+            m_c2w = cls._cam2world_matrix(camera_params) if to_world else None
+            if m_c2w is not None:
+                rot = m_c2w[:3, :3].T.astype(np.float32)
+                points = points @ rot
+                points += m_c2w[:3, 3].astype(np.float32)
+            return points
+        except Exception:
+            return None
+    
+    @staticmethod
+    def _calculate_3d_batch(xs: np.ndarray, ys: np.ndarray, depths: np.ndarray,
+                            cx: float, cy: float, fx: float, fy: float,
+                            k1: float, k2: float, f2rc: float,
+                            m_c2w: Optional[np.ndarray]) -> np.ndarray:
+        """
+        批量3D坐标计算（与 _calculate_3d_fast 公式一致，整批向量化）
+        
+        Args:
+            xs, ys: (N,) 像素坐标
+            depths: (N,) 深度值
+            其余参数同 _calculate_3d_fast
+        
+        Returns:
+            (N, 3) 世界坐标（未提供 m_c2w 时为相机坐标）
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        depths = np.asarray(depths, dtype=np.float64)
+        
+        # 相机坐标系下的归一化坐标 + 径向畸变校正
+        xp = (cx - xs) / fx
+        yp = (cy - ys) / fy
+        r2 = xp * xp + yp * yp
+        k = 1 + k1 * r2 + k2 * r2 * r2
+        xd = xp * k
+        yd = yp * k
+        
+        s = depths / np.sqrt(xd * xd + yd * yd + 1)
+        cam = np.stack([xd * s, yd * s, s - f2rc], axis=1)
+        
+        # 世界坐标系转换：一次矩阵乘法
+        if m_c2w is not None:
+            m = np.asarray(m_c2w, dtype=np.float64)
+            return cam @ m[:3, :3].T + m[:3, 3]
+        return cam
+    
+    @staticmethod
+    def _get_robust_depth_batch(xs: np.ndarray, ys: np.ndarray, depth_data: np.ndarray,
+                                width: int, height: int, radius: int = 1) -> np.ndarray:
+        """
+        批量获取稳定深度值（与 _get_robust_depth_at_point 相同：邻域内有效深度取平均）
+        
+        Args:
+            xs, ys: (N,) 整数像素坐标
+            depth_data: 一维深度数组
+            width, height: 图像尺寸
+            radius: 邻近像素搜索半径
+        
+        Returns:
+            (N,) 深度值，无有效深度为0
+        """
+        xs = np.asarray(xs, dtype=np.int64).reshape(-1, 1)
+        ys = np.asarray(ys, dtype=np.int64).reshape(-1, 1)
+        if depth_data.size == 0:
+            return np.zeros(xs.shape[0], dtype=np.float64)
+        offsets = np.arange(-radius, radius + 1)
+        dx = np.tile(offsets, offsets.size)
+        dy = np.repeat(offsets, offsets.size)
+        
+        px = xs + dx[None, :]
+        py = ys + dy[None, :]
+        index = py * width + px
+        inside = (px >= 0) & (px < width) & (py >= 0) & (py < height) & (index < depth_data.size)
+        
+        values = np.where(inside, depth_data[np.where(inside, index, 0)], 0.0).astype(np.float64)
+        valid = values > 0
+        count = valid.sum(axis=1)
+        total = np.where(valid, values, 0.0).sum(axis=1)
+        return np.where(count > 0, total / np.maximum(count, 1), 0.0)
+    
     @staticmethod
     def _transform_point_fast(camera_point: List[float], 
                              transformation_matrix: Optional[np.ndarray]) -> Optional[List[float]]:
@@ -145,13 +326,114 @@ class CoordinateProcessor:
         else:
             return 0.0
     
+    @staticmethod
+    def _get_mask_depth(detection: Any, depth_2d: np.ndarray, method: str = 'median',
+                        percentile: float = 10.0, trim: float = 0.2, min_pixels: int = 20) -> float:
+        """
+        基于分割mask估计目标深度（只取mask覆盖区域内的有效深度，整块数组运算）
+        
+        Args:
+            detection: 检测框（seg_mask 为框内局部mask或整幅图mask，mask_offset 为局部mask左上角）
+            depth_2d: (H, W) 深度图
+            method: median=中位数；trimmed_mean=去掉两端各trim比例后取平均；
+                    percentile=取第percentile百分位（较小值对应离相机最近的顶面）
+            percentile: percentile 方法使用的百分位
+            trim: trimmed_mean 方法两端各去掉的比例（0~0.5）
+            min_pixels: 有效深度像素少于该值时返回0（由调用方回退到中心邻域）
+        
+        Returns:
+            深度值，无法估计返回0
+        """
+        mask = getattr(detection, 'seg_mask', None)
+        if not isinstance(mask, np.ndarray) or mask.ndim != 2:
+            return 0.0
+        offset = getattr(detection, 'mask_offset', None) or (0, 0)
+        ox, oy = int(offset[0]), int(offset[1])
+        mh, mw = mask.shape
+        height, width = depth_2d.shape[:2]
+        
+        # mask区域与深度图求交
+        x0, y0 = max(ox, 0), max(oy, 0)
+        x1, y1 = min(ox + mw, width), min(oy + mh, height)
+        if x1 <= x0 or y1 <= y0:
+            return 0.0
+        region = mask[y0 - oy:y1 - oy, x0 - ox:x1 - ox] > 0
+        values = depth_2d[y0:y1, x0:x1][region]
+        values = values[values > 0]
+        if values.size < max(1, int(min_pixels)):
+            return 0.0
+        
+        if method == 'percentile':
+            return float(np.percentile(values, float(percentile)))
+        if method == 'trimmed_mean':
+            trim = min(max(float(trim), 0.0), 0.49)
+            ordered = np.sort(values)
+            k = int(ordered.size * trim)
+            return float(ordered[k:ordered.size - k].mean(dtype=np.float64))
+        return float(np.median(values))
+    
+    @classmethod
+    def calculate_world_points(
+        cls,
+        points,
+        depth_data,
+        camera_params: Any,
+        radius: int = 1
+    ) -> Optional[Dict[str, np.ndarray]]:
+        """
+        批量计算像素点的3D世界坐标（N个点一次向量化计算）
+        
+        Args:
+            points: (N, 2) 像素坐标 [x, y]
+            depth_data: 深度数据（支持 list, tuple, numpy.ndarray）
+            camera_params: 相机参数对象
+            radius: 深度邻域搜索半径
+        
+        Returns:
+            {
+                'world': (N, 3) 世界坐标（无效点为0）,
+                'depth': (N,) 深度值(mm),
+                'valid': (N,) bool，深度有效
+            }
+            参数无效返回None
+        """
+        try:
+            if camera_params is None or depth_data is None:
+                return None
+            if not isinstance(depth_data, (list, tuple, np.ndarray)):
+                return None
+            
+            points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+            depth_flat = np.asarray(depth_data).reshape(-1)
+            
+            width = int(camera_params.width)
+            height = int(camera_params.height)
+            m_c2w = cls._cam2world_matrix(camera_params)
+            
+            # 与单点计算一致：中心点取整后取邻域深度
+            xs_int = np.rint(points[:, 0]).astype(np.int64)
+            ys_int = np.rint(points[:, 1]).astype(np.int64)
+            depths = cls._get_robust_depth_batch(xs_int, ys_int, depth_flat, width, height, radius=radius)
+            valid = depths > 0
+            
+            world = cls._calculate_3d_batch(
+                points[:, 0], points[:, 1], depths,
+                camera_params.cx, camera_params.cy, camera_params.fx, camera_params.fy,
+                camera_params.k1, camera_params.k2, camera_params.f2rc, m_c2w
+            )
+            world[~valid] = 0.0
+            return {'world': world, 'depth': depths, 'valid': valid}
+        except Exception:
+            return None
+    
     @classmethod
     def calculate_coordinate_for_detection(
         cls,
         detection: Any,
         depth_data,  # 支持 list, tuple, numpy.ndarray
         camera_params: Any,
-        transformation_matrix: Optional[np.ndarray] = None
+        transformation_matrix: Optional[np.ndarray] = None,
+        depth_cfg: Optional[Dict[str, Any]] = None
     ) -> Optional[Dict[str, Any]]:
         """
         为单个检测框计算3D坐标
@@ -161,6 +443,8 @@ class CoordinateProcessor:
             depth_data: 深度数据（支持 list, tuple, numpy.ndarray，一维）
             camera_params: 相机参数对象
             transformation_matrix: 坐标变换矩阵（相机→机器人）
+            depth_cfg: 深度估计配置 config['depth']（method/percentile/trim/minPixels），
+                       为None或method=center时使用中心3×3邻域平均
         
         Returns:
             包含坐标信息的字典：
@@ -198,10 +482,8 @@ class CoordinateProcessor:
             center_y = 0.5 * (float(detection.ymin) + float(detection.ymax))
             
             # 获取mask面积
-            mask = getattr(detection, 'seg_mask', None)
-            if mask is not None:
-                area = float(mask.sum())
-            else:
+            area = mask_area_of(detection)
+            if area is None:
                 # 没有mask，使用矩形面积
                 area = float((detection.xmax - detection.xmin) * (detection.ymax - detection.ymin))
             
@@ -213,11 +495,26 @@ class CoordinateProcessor:
             if not isinstance(depth_data, (list, tuple, np.ndarray)):
                 return None
             
-            # 如果是 numpy 数组，确保是一维的（展平）
-            if isinstance(depth_data, np.ndarray) and depth_data.ndim != 1:
-                depth_data = depth_data.flatten()
+            depth = 0.0
+            method = str((depth_cfg or {}).get('method', 'center')).lower()
+            if method in cls.DEPTH_METHODS and method != 'center':
+                # 基于mask的深度估计；mask无效或有效像素不足时回退到中心邻域
+                try:
+                    depth_2d = np.asarray(depth_data).reshape(height, width)
+                    depth = cls._get_mask_depth(
+                        detection, depth_2d, method,
+                        percentile=float(depth_cfg.get('percentile', 10.0)),
+                        trim=float(depth_cfg.get('trim', 0.2)),
+                        min_pixels=int(depth_cfg.get('minPixels', 20)),
+                    )
+                except ValueError:
+                    depth = 0.0
             
-            depth = cls._get_robust_depth_at_point(cx_int, cy_int, depth_data, width, height, radius=1)
+            if depth <= 0:
+                # 如果是 numpy 数组，确保是一维的（展平）
+                if isinstance(depth_data, np.ndarray) and depth_data.ndim != 1:
+                    depth_data = depth_data.reshape(-1)
+                depth = cls._get_robust_depth_at_point(cx_int, cy_int, depth_data, width, height, radius=1)
             
             if depth <= 0:
                 return None
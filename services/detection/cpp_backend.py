@@ -17,6 +17,7 @@ import numpy as np
 import vc_detection_cpp
 
 from .base import DetectionService, DetectionBox
+from .batch import DetectionBatch
 
 
 class CPPRKNNDetector(DetectionService):
@@ -122,7 +123,7 @@ class CPPRKNNDetector(DetectionService):
         except Exception as e:
             raise RuntimeError(f"加载C++ RKNN模型失败: {e}")
     
-    def detect(self, image) -> List[DetectionBox]:
+    def detect(self, image) -> DetectionBatch:
         """
         执行目标检测
         
@@ -130,7 +131,7 @@ class CPPRKNNDetector(DetectionService):
             image: 输入图像 (numpy数组，BGR或灰度格式)
         
         Returns:
-            List[DetectionBox]: 检测结果列表
+            DetectionBatch: 检测结果（兼容List[DetectionBox]用法）
         """
         try:
             # 确保图像是numpy数组
@@ -146,6 +147,19 @@ class CPPRKNNDetector(DetectionService):
             if not image.flags['C_CONTIGUOUS']:
                 image = np.ascontiguousarray(image)
             
+            # 新版绑定直接返回结构数组（局部mask），不逐个创建Python对象
+            if hasattr(self._detector, 'detect_arrays'):
+                arrays = self._detector.detect_arrays(image)
+                batch = DetectionBatch(
+                    boxes=arrays['boxes'],
+                    scores=arrays['scores'],
+                    class_ids=arrays['class_ids'],
+                    masks=arrays['masks'],
+                    mask_offsets=arrays['mask_offsets'],
+                )
+                self._logger.debug(f"C++检测完成，检测到{len(batch)}个目标")
+                return batch
+            
             # 调用C++检测器
             cpp_boxes = self._detector.detect(image)
             
@@ -164,10 +178,10 @@ class CPPRKNNDetector(DetectionService):
                     ymax=cpp_box.ymax,
                     seg_mask=seg_mask
                 )
-                results.append(box)
+                results.append(box.compact())
             
             self._logger.debug(f"C++检测完成，检测到{len(results)}个目标")
-            return results
+            return DetectionBatch.from_detections(results)
             
         except Exception as e:
             self._logger.error(f"C++检测失败: {e}")
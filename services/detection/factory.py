@@ -73,7 +73,9 @@ def create_detector(config: dict, logger: Optional[Any] = None) -> DetectionServ
                 nms_threshold=nms, 
                 logger=logger,
                 target=target,
-                device_id=device_id
+                device_id=device_id,
+                nms_top_k=int(model_cfg.get("nms_top_k", 300)),
+                nms_mask_iou=bool(model_cfg.get("nms_mask_iou", False))
             )
     
     raise ValueError(f"Unknown detection backend: {backend}")
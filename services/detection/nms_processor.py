@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NMS处理器
+提供向量化的按类别非极大值抑制，供各检测后端共用
+"""
+
+from typing import Optional
+import numpy as np
+
+
+class NmsProcessor:
+    """向量化NMS（IoU矩阵一次算出，按类别抑制，可选top-k预筛与mask-IoU）"""
+
+    @staticmethod
+    def iou_matrix(boxes: np.ndarray) -> np.ndarray:
+        """
+        计算检测框两两IoU
+
+        Args:
+            boxes: (N, 4) xmin, ymin, xmax, ymax
+
+        Returns:
+            (N, N) IoU矩阵
+        """
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+        areas = np.maximum(0.0, x2 - x1) * np.maximum(0.0, y2 - y1)
+
+        iw = np.maximum(0.0, np.minimum(x2[:, None], x2[None, :]) - np.maximum(x1[:, None], x1[None, :]))
+        ih = np.maximum(0.0, np.minimum(y2[:, None], y2[None, :]) - np.maximum(y1[:, None], y1[None, :]))
+        inter = iw * ih
+        union = areas[:, None] + areas[None, :] - inter
+        return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+    @staticmethod
+    def mask_iou_matrix(masks: np.ndarray) -> np.ndarray:
+        """
+        计算mask两两IoU
+
+        Args:
+            masks: (N, ...) 二值mask（任意空间尺寸，同一批次尺寸一致）
+
+        Returns:
+            (N, N) IoU矩阵
+        """
+        masks = np.asarray(masks)
+        n = masks.shape[0]
+        flat = (masks.reshape(n, -1) > 0).astype(np.float32)
+        inter = flat @ flat.T
+        areas = np.diag(inter)
+        union = areas[:, None] + areas[None, :] - inter
+        return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+    @staticmethod
+    def nms(
+        boxes: np.ndarray,
+        scores: np.ndarray,
+        classes: Optional[np.ndarray] = None,
+        iou_threshold: float = 0.45,
+        top_k: Optional[int] = None,
+        masks: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        按类别非极大值抑制
+
+        Args:
+            boxes: (N, 4) 检测框
+            scores: (N,) 置信度
+            classes: (N,) 类别ID；为None时不区分类别
+            iou_threshold: IoU大于该值的同类框被抑制
+            top_k: 仅保留置信度最高的前k个候选参与NMS（None或<=0表示不限制）
+            masks: (N, ...) 可选二值mask，提供时用mask-IoU代替框IoU
+
+        Returns:
+            保留的原始索引（按置信度降序）
+        """
+        scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+        n = scores.shape[0]
+        if n == 0:
+            return np.empty((0,), dtype=np.int64)
+
+        order = np.argsort(-scores, kind="stable")
+        if top_k is not None and top_k > 0 and n > top_k:
+            order = order[:top_k]
+
+        if masks is not None:
+            iou = NmsProcessor.mask_iou_matrix(np.asarray(masks)[order])
+        else:
+            iou = NmsProcessor.iou_matrix(np.asarray(boxes)[order])
+
+        suppress = iou > iou_threshold
+        if classes is not None:
+            cls = np.asarray(classes).reshape(-1)[order]
+            # 不同类别不进行NMS
+            suppress &= cls[:, None] == cls[None, :]
+
+        m = order.shape[0]
+        removed = np.zeros(m, dtype=bool)
+        keep = []
+        for i in range(m):
+            if removed[i]:
+                continue
+            keep.append(i)
+            removed[i + 1:] |= suppress[i, i + 1:]
+
+        return order[np.asarray(keep, dtype=np.int64)]
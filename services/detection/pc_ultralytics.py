@@ -14,6 +14,7 @@ import numpy as np
 from ultralytics import YOLO  # type: ignore
 
 from .base import DetectionService, DetectionBox
+from .batch import DetectionBatch
 
 
 class PCUltralyticsDetector(DetectionService):
@@ -163,9 +164,9 @@ class PCUltralyticsDetector(DetectionService):
                 ymax=ymax,
                 seg_mask=mask_bin
             )
-            boxes.append(box)
+            boxes.append(box.compact())
         
-        return boxes
+        return DetectionBatch.from_detections(boxes)
 
     def release(self):
         """释放模型资源"""
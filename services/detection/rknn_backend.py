@@ -17,7 +17,9 @@ try:
 except ImportError:
     RKNN = None
 
-from .base import DetectionService, DetectionBox
+from .base import DetectionService
+from .batch import DetectionBatch
+from .nms_processor import NmsProcessor
 
 
 class RKNNDetector(DetectionService):
@@ -33,7 +35,9 @@ class RKNNDetector(DetectionService):
         nms_threshold: float = 0.45, 
         logger: Optional[logging.Logger] = None,
         target: str = 'rk3588',
-        device_id: Optional[str] = None
+        device_id: Optional[str] = None,
+        nms_top_k: int = 300,
+        nms_mask_iou: bool = False
     ):
         """
         初始化RKNN检测器
@@ -45,6 +49,8 @@ class RKNNDetector(DetectionService):
             logger: 日志记录器
             target: 目标RKNPU平台
             device_id: 设备ID
+            nms_top_k: 参与NMS的最大候选数（按置信度取前N个，<=0表示不限制）
+            nms_mask_iou: 是否使用mask-IoU（proto分辨率）进行NMS
         """
         if RKNN is None:
             raise RuntimeError("RKNN未安装，无法使用RKNN检测器")
@@ -55,6 +61,8 @@ class RKNNDetector(DetectionService):
         self._logger = logger or logging.getLogger(__name__)
         self._target = target
         self._device_id = device_id
+        self._nms_top_k = int(nms_top_k)
+        self._nms_mask_iou = bool(nms_mask_iou)
         self._rknn = None
         
         # YOLOv8-Seg 256x256 模型参数
@@ -70,84 +78,42 @@ class RKNNDetector(DetectionService):
         self._generate_meshgrid()
     
     def _generate_meshgrid(self):
-        """生成网格坐标，用于解码检测框"""
+        """生成网格坐标，用于解码检测框（每个检测头一个 (h*w, 2) 数组，列为 x, y 中心）"""
         self._meshgrid = []
         for index in range(self._head_num):
             h, w = self._map_sizes[index]
-            for i in range(h):
-                for j in range(w):
-                    self._meshgrid.append(j + 0.5)
-                    self._meshgrid.append(i + 0.5)
+            ys, xs = np.meshgrid(np.arange(h, dtype=np.float32), np.arange(w, dtype=np.float32), indexing='ij')
+            grid = np.stack([xs.reshape(-1), ys.reshape(-1)], axis=1) + 0.5
+            self._meshgrid.append(grid)
     
-    @staticmethod
-    def _sigmoid(x):
-        """Sigmoid激活函数"""
-        return 1.0 / (1.0 + math.exp(-x))
-    
-    @staticmethod
-    def _iou_rect(a, b):
-        """计算两个矩形的IoU
-        
-        Args:
-            a, b: (xmin, ymin, xmax, ymax)
-        
-        Returns:
-            float: IoU值
+    def _proto_masks(self, proto, mask_coeffs, boxes, img_h, img_w):
         """
-        ixmin = max(a[0], b[0])
-        iymin = max(a[1], b[1])
-        ixmax = min(a[2], b[2])
-        iymax = min(a[3], b[3])
-        
-        iw = max(0.0, ixmax - ixmin)
-        ih = max(0.0, iymax - iymin)
-        inter = iw * ih
-        
-        area_a = max(0.0, a[2] - a[0]) * max(0.0, a[3] - a[1])
-        area_b = max(0.0, b[2] - b[0]) * max(0.0, b[3] - b[1])
-        union = area_a + area_b - inter
-        
-        if union <= 0:
-            return 0.0
-        return inter / union
-    
-    def _nms_rect(self, boxes, scores, classes):
-        """NMS非极大值抑制
-        
-        Args:
-            boxes: 检测框列表 [(xmin, ymin, xmax, ymax), ...]
-            scores: 置信度列表
-            classes: 类别ID列表
+        在proto分辨率下生成候选的二值mask（仅用于mask-IoU NMS）
         
         Returns:
-            List[int]: 保留的索引列表
+            np.ndarray: (N, mh, mw) bool，失败返回None
         """
-        idxs = list(range(len(boxes)))
-        idxs.sort(key=lambda i: scores[i], reverse=True)
-        kept = []
-        
-        while idxs:
-            i = idxs.pop(0)
-            kept.append(i)
-            rest = []
-            
-            for j in idxs:
-                # 不同类别不进行NMS
-                if classes[j] != classes[i]:
-                    rest.append(j)
-                    continue
-                
-                # IoU小于阈值则保留
-                if self._iou_rect(boxes[i], boxes[j]) <= self._nms:
-                    rest.append(j)
+        try:
+            proto = np.asarray(proto[0], dtype=np.float32)
+            c, mh, mw = proto.shape
+            # sigmoid(x) > 0.5 等价于 x > 0
+            masks = (mask_coeffs @ proto.reshape(c, -1)).reshape(-1, mh, mw) > 0
             
-            idxs = rest
-        
-        return kept
+            # 裁剪到检测框（换算到proto坐标系）
+            bx = boxes * np.array([mw / float(img_w), mh / float(img_h)] * 2, dtype=np.float32)
+            xs = np.arange(mw, dtype=np.float32) + 0.5
+            ys = np.arange(mh, dtype=np.float32) + 0.5
+            in_x = (xs[None, :] >= bx[:, 0:1]) & (xs[None, :] < bx[:, 2:3])
+            in_y = (ys[None, :] >= bx[:, 1:2]) & (ys[None, :] < bx[:, 3:4])
+            masks &= in_y[:, :, None] & in_x[:, None, :]
+            return masks
+        except Exception as e:
+            self._logger.warning(f"生成NMS用mask失败，回退到框IoU: {e}")
+            return None
     
     def _postprocess_boxes(self, outputs, img_h, img_w):
         """
-        YOLOv8-Seg后处理：解码检测框和mask系数
+        YOLOv8-Seg后处理：解码检测框和mask系数（NumPy向量化）
         
         Args:
             outputs: RKNN推理输出
@@ -155,123 +121,136 @@ class RKNNDetector(DetectionService):
             img_w: 原图宽度
         
         Returns:
-            tuple: (boxes, scores, classes, mask_coeffs)
+            tuple: (boxes (N,4), scores (N,), classes (N,), mask_coeffs (N,32))，均为np.ndarray
         """
-        output = [outputs[i].reshape((-1)) for i in range(len(outputs))]
         scale_h = img_h / float(self._input_size[1])
         scale_w = img_w / float(self._input_size[0])
+        scale = np.array([scale_w, scale_h, scale_w, scale_h], dtype=np.float32)
+        limit = np.array([img_w, img_h, img_w, img_h], dtype=np.float32)
+        
+        # sigmoid单调：sigmoid(x) > conf 等价于 x > logit(conf)，阈值判断无需对全部元素求exp
+        if self._conf <= 0.0:
+            logit_thr = -np.inf
+        elif self._conf >= 1.0:
+            logit_thr = np.inf
+        else:
+            logit_thr = math.log(self._conf / (1.0 - self._conf))
         
         boxes = []
         scores = []
         classes = []
         mask_coeffs = []
         
-        grid_index = -2
-        
         for head_idx in range(self._head_num):
-            # YOLOv8输出：reg(回归), cls(分类), mask(掩码系数)
-            reg = output[head_idx * 2 + 0]
-            cls = output[head_idx * 2 + 1]
-            msk = output[6 + head_idx]
-            
             h, w = self._map_sizes[head_idx]
             stride = self._strides[head_idx]
             
-            for i in range(h):
-                for j in range(w):
-                    grid_index += 2
-                    
-                    for class_id in range(self._class_num):
-                        # 计算分类置信度
-                        cls_idx = class_id * h * w + i * w + j
-                        cls_val = self._sigmoid(cls[cls_idx])
-                        
-                        if cls_val <= self._conf:
-                            continue
-                        
-                        # 解码检测框
-                        base_idx = i * w + j
-                        x1 = (self._meshgrid[grid_index + 0] - reg[0 * h * w + base_idx]) * stride
-                        y1 = (self._meshgrid[grid_index + 1] - reg[1 * h * w + base_idx]) * stride
-                        x2 = (self._meshgrid[grid_index + 0] + reg[2 * h * w + base_idx]) * stride
-                        y2 = (self._meshgrid[grid_index + 1] + reg[3 * h * w + base_idx]) * stride
-                        
-                        # 缩放到原图尺寸
-                        xmin = max(0.0, x1 * scale_w)
-                        ymin = max(0.0, y1 * scale_h)
-                        xmax = min(float(img_w), x2 * scale_w)
-                        ymax = min(float(img_h), y2 * scale_h)
-                        
-                        if xmax <= xmin or ymax <= ymin:
-                            continue
-                        
-                        # 提取mask系数
-                        mask_vec = [msk[m * h * w + base_idx] for m in range(self._mask_num)]
-                        
-                        boxes.append((xmin, ymin, xmax, ymax))
-                        scores.append(float(cls_val))
-                        classes.append(int(class_id))
-                        mask_coeffs.append(mask_vec)
+            # YOLOv8输出：reg(回归), cls(分类), mask(掩码系数)，均为通道优先 (C, h*w)
+            reg = np.asarray(outputs[head_idx * 2 + 0], dtype=np.float32).reshape(4, h * w)
+            cls = np.asarray(outputs[head_idx * 2 + 1], dtype=np.float32).reshape(self._class_num, h * w)
+            msk = np.asarray(outputs[6 + head_idx], dtype=np.float32).reshape(self._mask_num, h * w)
+            
+            # 按 (网格, 类别) 顺序取出超过阈值的候选
+            cell_idx, class_idx = np.nonzero(cls.T > logit_thr)
+            if cell_idx.size == 0:
+                continue
+            
+            # 解码检测框并缩放到原图尺寸
+            grid = self._meshgrid[head_idx][cell_idx]  # (N, 2)
+            ltrb = reg[:, cell_idx].T  # (N, 4)
+            xyxy = np.concatenate([grid - ltrb[:, :2], grid + ltrb[:, 2:]], axis=1) * (stride * scale)
+            xyxy = np.clip(xyxy, 0.0, limit)
+            
+            valid = (xyxy[:, 2] > xyxy[:, 0]) & (xyxy[:, 3] > xyxy[:, 1])
+            if not np.any(valid):
+                continue
+            cell_idx = cell_idx[valid]
+            class_idx = class_idx[valid]
+            
+            logits = cls[class_idx, cell_idx]
+            boxes.append(xyxy[valid])
+            scores.append(1.0 / (1.0 + np.exp(-logits)))
+            classes.append(class_idx.astype(np.int32))
+            # 提取mask系数（花式索引一次取出全部候选）
+            mask_coeffs.append(msk[:, cell_idx].T)
+        
+        if not boxes:
+            return (
+                np.empty((0, 4), dtype=np.float32),
+                np.empty((0,), dtype=np.float32),
+                np.empty((0,), dtype=np.int32),
+                np.empty((0, self._mask_num), dtype=np.float32),
+            )
         
-        return boxes, scores, classes, mask_coeffs
+        return (
+            np.concatenate(boxes),
+            np.concatenate(scores),
+            np.concatenate(classes),
+            np.ascontiguousarray(np.concatenate(mask_coeffs)),
+        )
     
     def _decode_masks(self, proto, mask_coeffs, boxes, img_h, img_w):
         """
-        解码分割掩码
+        解码分割掩码（先裁剪后上采样）
+        - 所有保留目标的系数与proto一次矩阵乘得到低分辨率mask
+        - 每个目标只在其检测框范围内从proto上采样（与整图resize后再裁剪逐像素一致）
         
         Args:
             proto: proto输出 (C, H, W)
-            mask_coeffs: mask系数列表
+            mask_coeffs: mask系数 (K, C)
             boxes: 检测框列表
             img_h: 原图高度
             img_w: 原图宽度
         
         Returns:
-            List[np.ndarray]: 分割掩码列表（原图尺寸）
+            List[Tuple[np.ndarray, Tuple[int, int]]]: (框内局部mask, 左上角(x, y)) 列表
         """
-        if not mask_coeffs or proto is None:
+        if len(mask_coeffs) == 0 or proto is None:
             return []
         
         try:
-            proto = np.array(proto[0])
+            proto = np.asarray(proto[0], dtype=np.float32)
             if proto.ndim != 3:
                 return []
             
             c, mh, mw = proto.shape
-            proto2d = proto.reshape(c, -1)  # (C, H*W)
+            coeffs = np.asarray(mask_coeffs, dtype=np.float32).reshape(-1, c)
+            
+            # 批量计算mask: coeffs @ proto，再统一sigmoid
+            mask_low = coeffs @ proto.reshape(c, -1)  # (K, H*W)
+            mask_low = (1.0 / (1.0 + np.exp(-mask_low))).reshape(-1, mh, mw)
+            
+            sx = mw / float(img_w)
+            sy = mh / float(img_h)
             
             masks = []
-            for i, coeffs in enumerate(mask_coeffs):
+            for i in range(mask_low.shape[0]):
+                xmin, ymin, xmax, ymax = boxes[i]
+                xmin = max(0, int(xmin))
+                ymin = max(0, int(ymin))
+                xmax = min(img_w, int(xmax))
+                ymax = min(img_h, int(ymax))
+                bw = max(0, xmax - xmin)
+                bh = max(0, ymax - ymin)
+                if bw == 0 or bh == 0:
+                    masks.append((np.zeros((bh, bw), dtype=np.uint8), (xmin, ymin)))
+                    continue
                 try:
-                    # 计算mask: coeffs @ proto
-                    coeffs_np = np.array(coeffs, dtype=np.float32).reshape(1, -1)
-                    mask_low = coeffs_np @ proto2d  # (1, H*W)
-                    mask_low = 1.0 / (1.0 + np.exp(-mask_low))  # sigmoid
-                    mask_low = mask_low.reshape(mh, mw)
-                    
-                    # 缩放到原图尺寸
-                    mask_full = cv2.resize(mask_low, (img_w, img_h), interpolation=cv2.INTER_LINEAR)
-                    
+                    # 目标像素(x, y)对应proto坐标：((x + xmin + 0.5) * sx - 0.5, (y + ymin + 0.5) * sy - 0.5)
+                    m = np.array([
+                        [sx, 0.0, (xmin + 0.5) * sx - 0.5],
+                        [0.0, sy, (ymin + 0.5) * sy - 0.5],
+                    ], dtype=np.float64)
+                    mask_box = cv2.warpAffine(
+                        mask_low[i], m, (bw, bh),
+                        flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP,
+                        borderMode=cv2.BORDER_REPLICATE,
+                    )
                     # 二值化
-                    mask_bin = (mask_full > 0.5).astype(np.uint8)
-                    
-                    # 裁剪到检测框区域
-                    xmin, ymin, xmax, ymax = boxes[i]
-                    xmin = max(0, int(xmin))
-                    ymin = max(0, int(ymin))
-                    xmax = min(img_w, int(xmax))
-                    ymax = min(img_h, int(ymax))
-                    
-                    # 创建只在检测框内的mask
-                    mask_final = np.zeros((img_h, img_w), dtype=np.uint8)
-                    if xmax > xmin and ymax > ymin:
-                        mask_final[ymin:ymax, xmin:xmax] = mask_bin[ymin:ymax, xmin:xmax]
-                    
-                    masks.append(mask_final)
-                    
+                    masks.append(((mask_box > 0.5).astype(np.uint8), (xmin, ymin)))
                 except Exception as e:
                     self._logger.warning(f"解码mask {i} 失败: {e}")
-                    masks.append(np.zeros((img_h, img_w), dtype=np.uint8))
+                    masks.append((np.zeros((bh, bw), dtype=np.uint8), (xmin, ymin)))
             
             return masks
             
@@ -308,7 +287,7 @@ class RKNNDetector(DetectionService):
                 self._rknn = None
             raise RuntimeError(f"加载RKNN模型失败: {e}")
     
-    def detect(self, image) -> List[DetectionBox]:
+    def detect(self, image) -> DetectionBatch:
         """
         执行目标检测
         
@@ -316,7 +295,7 @@ class RKNNDetector(DetectionService):
             image: 输入图像 (BGR格式或灰度图)
         
         Returns:
-            List[DetectionBox]: 检测结果列表
+            DetectionBatch: 检测结果（兼容List[DetectionBox]用法）
         """
         if self._rknn is None:
             self.load()
@@ -350,44 +329,44 @@ class RKNNDetector(DetectionService):
             outputs = self._rknn.inference(inputs=[img_rgb], data_format='nhwc')
         except Exception as e:
             self._logger.error(f"RKNN推理失败: {e}")
-            return []
+            return DetectionBatch()
         
         # 后处理：解码检测框和mask系数
         boxes, scores, classes, mask_coeffs = self._postprocess_boxes(outputs, img_h, img_w)
         
-        if not boxes:
-            return []
+        if len(boxes) == 0:
+            return DetectionBatch()
         
-        # NMS
-        keep_indices = self._nms_rect(boxes, scores, classes)
+        # NMS（按类别，向量化）
+        nms_masks = None
+        if self._nms_mask_iou:
+            nms_masks = self._proto_masks(outputs[-1], mask_coeffs, boxes, img_h, img_w)
+        keep_indices = NmsProcessor.nms(
+            boxes, scores, classes,
+            iou_threshold=self._nms,
+            top_k=self._nms_top_k,
+            masks=nms_masks,
+        )
         
         # 保留NMS后的结果
-        kept_boxes = [boxes[i] for i in keep_indices]
-        kept_scores = [scores[i] for i in keep_indices]
-        kept_classes = [classes[i] for i in keep_indices]
-        kept_coeffs = [mask_coeffs[i] for i in keep_indices]
+        kept_boxes = boxes[keep_indices]
+        kept_scores = scores[keep_indices]
+        kept_classes = classes[keep_indices]
+        kept_coeffs = mask_coeffs[keep_indices]
         
         # 解码分割掩码
         masks = self._decode_masks(outputs[-1], kept_coeffs, kept_boxes, img_h, img_w)
         
-        # 构建检测结果
-        results = []
-        for i in range(len(kept_boxes)):
-            xmin, ymin, xmax, ymax = kept_boxes[i]
-            mask = masks[i] if i < len(masks) else None
-            
-            box = DetectionBox(
-                class_id=kept_classes[i],
-                score=kept_scores[i],
-                xmin=int(xmin),
-                ymin=int(ymin),
-                xmax=int(xmax),
-                ymax=int(ymax),
-                seg_mask=mask
-            )
-            results.append(box)
-        
-        return results
+        # 构建检测结果（结构数组，不逐个创建Python对象）
+        mask_list = [m for m, _ in masks] if len(masks) == len(kept_boxes) else None
+        offsets = [o for _, o in masks] if mask_list is not None else None
+        return DetectionBatch(
+            boxes=kept_boxes.astype(np.int32),
+            scores=kept_scores,
+            class_ids=kept_classes,
+            masks=mask_list,
+            mask_offsets=offsets,
+        )
     
     def release(self):
         """释放RKNN资源"""
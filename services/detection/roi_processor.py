@@ -6,9 +6,85 @@ ROI处理模块
 负责ROI区域判断、掩码创建和目标过滤
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+from dataclasses import dataclass, field
+import threading
 import numpy as np
 
+from .batch import DetectionBatch
+
+
+@dataclass
+class RoiSet:
+    """
+    编译后的ROI集合（配置顺序）
+    - rois: 统一格式ROI字典列表 {x1, y1, x2, y2, priority, name}
+    - rects: (R, 4) float32 矩形边界
+    - priorities: (R,) int32 优先级（数字越小越高）
+    - order: (R,) 按优先级排序后的ROI下标（同优先级保持配置顺序）
+    - width, height: 编译时的图像尺寸（用于生成叠加层）
+
+    GPIO绑定与ROI叠加层按需生成并缓存在对象上，配置或图像尺寸变化时随整个RoiSet一起失效
+    """
+    rois: List[Dict]
+    rects: np.ndarray
+    priorities: np.ndarray
+    order: np.ndarray
+    width: int = 0
+    height: int = 0
+    _gpio_binding: Optional[Tuple[Any, List[Any]]] = field(default=None, init=False, repr=False)
+    _overlay: Optional[Tuple[np.ndarray, np.ndarray]] = field(default=None, init=False, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.rois)
+
+    @property
+    def names(self) -> List[str]:
+        return [r['name'] for r in self.rois]
+
+    def bind_gpio(self, resources: Optional[Dict[str, Any]]) -> List[Any]:
+        """
+        按ROI顺序返回对应的GPIO实例（未绑定为None）
+
+        Args:
+            resources: {roi_name: GPIO实例}，由 handle_start 打开
+        """
+        binding = self._gpio_binding
+        if binding is not None and binding[0] is resources:
+            return binding[1]
+        resources = resources or {}
+        slots = [resources.get(r.get('name')) for r in self.rois]
+        self._gpio_binding = (resources, slots)
+        return slots
+
+    def overlay(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        预绘制的ROI叠加层 (BGR图层, 像素mask)，首次调用时生成
+        """
+        if self._overlay is None:
+            from .visualizer import DetectionVisualizer
+            self._overlay = DetectionVisualizer.build_roi_overlay(self.rois, self.height, self.width)
+        return self._overlay
+
+
+@dataclass
+class RoiAssignment:
+    """
+    一批目标中心点对一组ROI的判定结果
+    - membership: (N, R) bool，中心点是否在ROI内（ROI重叠时可同时属于多个）
+    - counts: (R,) 每个ROI内的中心点数量（按membership统计）
+    - assigned: (N,) 每个目标所属的最高优先级ROI下标，不在任何ROI内为-1
+    - assigned_counts: (R,) 按assigned统计的数量（每个目标只计入一个ROI）
+    """
+    membership: np.ndarray
+    counts: np.ndarray
+    assigned: np.ndarray
+    assigned_counts: np.ndarray
+
+    def assigned_count_by_priority(self, roi_set: RoiSet, priority: int) -> int:
+        """指定优先级的ROI内（按assigned）目标数量之和"""
+        return int(self.assigned_counts[roi_set.priorities == int(priority)].sum())
+
 
 class RoiProcessor:
     """
@@ -16,6 +92,167 @@ class RoiProcessor:
     提供统一的ROI相关功能（目前支持矩形ROI）
     """
     
+    _compiled_lock = threading.Lock()
+    _compiled_cache: Dict[str, Any] = {}
+    _compiled_version = 0
+    
+    @staticmethod
+    def parse_gpio(region: Dict) -> Optional[Dict]:
+        """
+        解析ROI区域的GPIO配置
+        
+        Args:
+            region: ROI区域配置（含可选的 gpio: {enable, chip, pin}）
+        
+        Returns:
+            {chip, pin}；未启用或配置无效时返回None
+        """
+        try:
+            gcfg = (region or {}).get('gpio') or {}
+            if not bool(gcfg.get('enable', False)):
+                return None
+            chip = str(gcfg.get('chip', ''))
+            if chip and not chip.startswith('/'):
+                chip = '/' + chip
+            return {'chip': chip, 'pin': int(gcfg.get('pin'))}
+        except Exception:
+            return None
+    
+    @staticmethod
+    def build_roi_list(regions: List[Dict], width: int, height: int) -> List[Dict]:
+        """
+        将 config['roi']['regions'] 转换为统一格式ROI字典列表（限制在图像范围内）
+        
+        Args:
+            regions: ROI区域配置列表（width/height/offsetx/offsety/priority/name）
+            width, height: 图像尺寸
+        
+        Returns:
+            [{x1, y1, x2, y2, priority, name, gpio}, ...]，配置顺序
+        """
+        roi_list = []
+        for region in regions or []:
+            if not isinstance(region, dict):
+                continue
+            try:
+                x1 = int(region.get('offsetx', 0))
+                y1 = int(region.get('offsety', 0))
+                x2 = x1 + int(region.get('width', 120))
+                y2 = y1 + int(region.get('height', 140))
+                roi_list.append({
+                    'x1': max(0, min(x1, width)),
+                    'y1': max(0, min(y1, height)),
+                    'x2': max(0, min(x2, width)),
+                    'y2': max(0, min(y2, height)),
+                    'priority': int(region.get('priority', 999)),
+                    'name': str(region.get('name', 'roi')),
+                    'gpio': RoiProcessor.parse_gpio(region),
+                })
+            except Exception:
+                continue
+        return roi_list
+    
+    @staticmethod
+    def compile_rois(roi_list: List[Dict], width: int = 0, height: int = 0) -> RoiSet:
+        """
+        将ROI字典列表编译为数组形式
+        
+        Args:
+            roi_list: ROI字典列表（需包含 x1, y1, x2, y2，可选 priority, name）
+            width, height: 图像尺寸（生成叠加层时使用）
+        
+        Returns:
+            RoiSet
+        """
+        rois = []
+        for roi in roi_list or []:
+            if not isinstance(roi, dict):
+                continue
+            if any(roi.get(k) is None for k in ('x1', 'y1', 'x2', 'y2')):
+                continue
+            rois.append(roi)
+        rects = np.array([[r['x1'], r['y1'], r['x2'], r['y2']] for r in rois], dtype=np.float32).reshape(-1, 4)
+        priorities = np.array([int(r.get('priority', 999)) for r in rois], dtype=np.int32)
+        order = np.argsort(priorities, kind='stable')
+        return RoiSet(rois=rois, rects=rects, priorities=priorities, order=order, width=int(width), height=int(height))
+    
+    @staticmethod
+    def get_compiled_rois(roi_cfg: Optional[Dict], width: int, height: int) -> RoiSet:
+        """
+        获取编译后的ROI集合（不再逐帧重建）
+        
+        仅在以下情况重新编译：
+        - 调用了 invalidate_compiled_rois()（handle_save_config 修改 roi 配置时）
+        - 图像尺寸变化
+        - config['roi']['regions'] 被替换为新对象
+        
+        Args:
+            roi_cfg: config['roi']
+            width, height: 图像尺寸
+        """
+        regions = (roi_cfg or {}).get('regions') or []
+        with RoiProcessor._compiled_lock:
+            key = (RoiProcessor._compiled_version, id(regions), int(width), int(height))
+            cache = RoiProcessor._compiled_cache
+            # 同时保存regions引用，避免对象被回收后id复用
+            if cache.get('key') == key and cache.get('regions') is regions:
+                return cache['roi_set']
+        roi_set = RoiProcessor.compile_rois(RoiProcessor.build_roi_list(regions, width, height), width, height)
+        with RoiProcessor._compiled_lock:
+            # 编译期间若已失效则不写入缓存（下次调用重新编译）
+            if key[0] == RoiProcessor._compiled_version:
+                RoiProcessor._compiled_cache = {'key': key, 'regions': regions, 'roi_set': roi_set}
+        return roi_set
+    
+    @staticmethod
+    def invalidate_compiled_rois() -> None:
+        """使已编译的ROI集合失效（ROI配置热更新后调用）"""
+        with RoiProcessor._compiled_lock:
+            RoiProcessor._compiled_version += 1
+            RoiProcessor._compiled_cache = {}
+    
+    @staticmethod
+    def assign_rois(centers: np.ndarray, roi_set: RoiSet) -> RoiAssignment:
+        """
+        一次性计算所有中心点与所有ROI的归属关系
+        
+        Args:
+            centers: (N, 2) 目标中心点
+            roi_set: 编译后的ROI集合
+        
+        Returns:
+            RoiAssignment
+        """
+        centers = np.asarray(centers, dtype=np.float32).reshape(-1, 2)
+        n, r = centers.shape[0], len(roi_set)
+        if n == 0 or r == 0:
+            return RoiAssignment(
+                membership=np.zeros((n, r), dtype=bool),
+                counts=np.zeros(r, dtype=np.int64),
+                assigned=np.full(n, -1, dtype=np.int64),
+                assigned_counts=np.zeros(r, dtype=np.int64),
+            )
+        
+        cx = centers[:, 0:1]
+        cy = centers[:, 1:2]
+        rects = roi_set.rects
+        membership = (
+            (cx >= rects[None, :, 0]) & (cx <= rects[None, :, 2]) &
+            (cy >= rects[None, :, 1]) & (cy <= rects[None, :, 3])
+        )
+        
+        # 按优先级顺序取第一个命中的ROI
+        by_priority = membership[:, roi_set.order]
+        hit = by_priority.any(axis=1)
+        assigned = np.where(hit, roi_set.order[np.argmax(by_priority, axis=1)], -1)
+        
+        return RoiAssignment(
+            membership=membership,
+            counts=membership.sum(axis=0),
+            assigned=assigned,
+            assigned_counts=np.bincount(assigned[hit], minlength=r),
+        )
+    
     @staticmethod
     def is_point_in_roi(x: float, y: float, roi_config: Dict) -> bool:
         """
@@ -67,23 +304,20 @@ class RoiProcessor:
         if not roi_config or not roi_config.get('enable'):
             return detection_results
         
-        filtered = []
-        for detection in detection_results:
-            try:
-                # 计算检测框中心点
-                xmin = float(getattr(detection, 'xmin', 0))
-                ymin = float(getattr(detection, 'ymin', 0))
-                xmax = float(getattr(detection, 'xmax', 0))
-                ymax = float(getattr(detection, 'ymax', 0))
-                center_x = 0.5 * (xmin + xmax)
-                center_y = 0.5 * (ymin + ymax)
-                
-                # 检查中心点是否在ROI内
-                if RoiProcessor.is_point_in_roi(center_x, center_y, roi_config):
-                    filtered.append(detection)
-            except Exception:
-                continue
+        x1 = roi_config.get('x1')
+        y1 = roi_config.get('y1')
+        x2 = roi_config.get('x2')
+        y2 = roi_config.get('y2')
+        if x1 is None or y1 is None or x2 is None or y2 is None:
+            return DetectionBatch()
         
-        return filtered
+        # 整批计算检测框中心点并判断是否在ROI内
+        batch = DetectionBatch.from_detections(detection_results)
+        centers = batch.centers()
+        inside = (
+            (centers[:, 0] >= x1) & (centers[:, 0] <= x2) &
+            (centers[:, 1] >= y1) & (centers[:, 1] <= y2)
+        )
+        return batch.take(inside)
     
 
@@ -9,6 +9,8 @@
 from typing import List, Optional, Dict, Any
 import numpy as np
 
+from .batch import DetectionBatch
+
 
 class TargetSelector:
     """
@@ -63,96 +65,65 @@ class TargetSelector:
         except ImportError:
             return None
         
-        # 提取所有ROI，按优先级排序（数字越小优先级越高）
-        valid_rois = [roi for roi in roi_configs if isinstance(roi, dict)]
-        
-        if not valid_rois:
+        roi_set = RoiProcessor.compile_rois([roi for roi in roi_configs if isinstance(roi, dict)])
+        if len(roi_set) == 0:
             return None
         
-        # 按priority排序（优先级数字越小越高）
-        valid_rois.sort(key=lambda r: r.get('priority', 999))
-        
-        # 准备候选目标列表，添加目标的基本信息
-        candidates = []
-        filtered_by_area = 0
-        filtered_by_roi = 0
+        batch = DetectionBatch.from_detections(detection_results)
+        assignment = RoiProcessor.assign_rois(batch.centers(), roi_set)
+        return TargetSelector.select_from_assignment(batch, roi_set, assignment, min_area=min_area)
+    
+    @staticmethod
+    def select_from_assignment(
+        batch: DetectionBatch,
+        roi_set: Any,
+        assignment: Any,
+        min_area: float = 0.0,
+        roi_index: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        基于ROI判定结果选择最佳目标（与 RoiProcessor.assign_rois 共用同一份归属结果）
         
-        for idx, detection in enumerate(detection_results):
-            try:
-                # 获取中心点
-                xmin = float(getattr(detection, 'xmin', 0))
-                ymin = float(getattr(detection, 'ymin', 0))
-                xmax = float(getattr(detection, 'xmax', 0))
-                ymax = float(getattr(detection, 'ymax', 0))
-                center_x = 0.5 * (xmin + xmax)
-                center_y = 0.5 * (ymin + ymax)
-                
-                # 使用mask面积（与system.py保持一致）
-                mask = getattr(detection, 'seg_mask', None)
-                if mask is None or not isinstance(mask, np.ndarray):
-                    # 没有mask，跳过该检测结果
-                    filtered_by_area += 1
-                    continue
-                
-                area = float(np.sum(mask > 0))  # mask像素数
-                
-                # 面积过滤
-                if area < min_area:
-                    filtered_by_area += 1
-                    continue
-                
-                # 获取其他属性
-                score = float(getattr(detection, 'score', 0.0))
-                class_id = int(getattr(detection, 'classId', getattr(detection, 'class_id', 0)))
-                
-                # 检查该目标在哪些ROI内，记录优先级最高的ROI
-                best_roi_priority = None
-                best_roi_name = None
-                
-                for roi in valid_rois:
-                    if RoiProcessor.is_point_in_roi(center_x, center_y, roi):
-                        # 找到第一个（优先级最高的）包含该目标的ROI
-                        best_roi_priority = roi.get('priority', 999)
-                        best_roi_name = roi.get('name', f"roi_p{best_roi_priority}")
-                        break  # 找到最高优先级ROI后立即退出
-                
-                # 如果目标不在任何ROI内，跳过
-                if best_roi_priority is None:
-                    filtered_by_roi += 1
-                    continue
-                
-                candidates.append({
-                    'target_id': idx + 1,
-                    'detection': detection,
-                    'center': [center_x, center_y],
-                    'area': area,
-                    'score': score,
-                    'class_id': class_id,
-                    'roi_priority': best_roi_priority,
-                    'roi_name': best_roi_name
-                })
-                
-            except Exception as e:
-                continue
+        Args:
+            batch: 检测结果批
+            roi_set: 编译后的ROI集合（RoiSet）
+            assignment: batch中心点对roi_set的判定结果（RoiAssignment）
+            min_area: 最小面积阈值（像素）
+            roi_index: 指定只在该ROI内选择（按membership判断）；None表示按最高优先级ROI分组选择
         
-        if not candidates:
+        Returns:
+            与 select_by_multi_roi_priority 相同格式的目标信息字典，无有效目标时返回None
+        """
+        if len(batch) == 0 or len(roi_set) == 0:
             return None
         
-        # 按选择逻辑排序并选择最佳目标：
-        # 1. 优先级高（priority数字小）
-        # 2. 面积大
-        # 使用稳定排序，先按面积降序，再按优先级升序
-        candidates.sort(key=lambda c: (-c['area'], c['roi_priority']))
+        # 面积过滤（没有mask的目标面积为NaN，同样被过滤）
+        with np.errstate(invalid='ignore'):
+            valid = ~np.isnan(batch.areas) & (batch.areas >= float(min_area))
         
-        # 实际上我们需要先按优先级分组，在每个优先级内选择最大面积
-        # 选择优先级最高（数字最小）的ROI组
-        best_priority = min(c['roi_priority'] for c in candidates)
-        
-        # 筛选出优先级最高的ROI中的所有目标
-        top_priority_candidates = [c for c in candidates if c['roi_priority'] == best_priority]
+        if roi_index is not None:
+            roi_of = np.where(assignment.membership[:, roi_index], roi_index, -1)
+        else:
+            roi_of = assignment.assigned
+        valid &= roi_of >= 0
+        if not np.any(valid):
+            return None
         
-        # 在这些目标中选择面积最大的
-        best = max(top_priority_candidates, key=lambda c: c['area'])
+        # 选择优先级最高（数字最小）的ROI组，在组内选择面积最大的目标
+        priorities = roi_set.priorities[np.where(valid, roi_of, 0)]
+        best_priority = priorities[valid].min()
+        group = np.flatnonzero(valid & (priorities == best_priority))
+        idx = int(group[np.argmax(batch.areas[group])])
         
-        return best
-
+        roi = roi_set.rois[int(roi_of[idx])]
+        xmin, ymin, xmax, ymax = (float(v) for v in batch.boxes[idx])
+        return {
+            'target_id': idx + 1,
+            'detection': batch[idx],
+            'center': [0.5 * (xmin + xmax), 0.5 * (ymin + ymax)],
+            'area': float(batch.areas[idx]),
+            'score': float(batch.scores[idx]),
+            'class_id': int(batch.class_ids[idx]),
+            'roi_priority': roi.get('priority', 999),
+            'roi_name': roi.get('name', f"roi_p{roi.get('priority', 999)}")
+        }
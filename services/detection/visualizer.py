@@ -27,6 +27,13 @@ class DetectionVisualizer:
         (0, 255, 255),  # 黄色
     ]
     
+    # ROI边框颜色（按优先级）
+    ROI_PRIORITY_COLORS = {
+        1: (0, 255, 255),    # 黄色
+        2: (255, 128, 0),    # 橙色
+    }
+    ROI_DEFAULT_COLOR = (128, 128, 128)  # 灰色
+    
     @staticmethod
     def draw_detections(
         image: np.ndarray, 
@@ -84,10 +91,16 @@ class DetectionVisualizer:
                     mask = getattr(detection, 'seg_mask', None)
                     if mask is not None and isinstance(mask, np.ndarray):
                         try:
-                            # 半透明填充
-                            overlay = annotated_image.copy()
-                            overlay[mask > 0] = color
-                            cv2.addWeighted(overlay, 0.35, annotated_image, 0.65, 0, annotated_image)
+                            # 局部mask（mask_offset不为None）只在其所在区域内叠加
+                            offset = getattr(detection, 'mask_offset', None)
+                            ox, oy = (int(offset[0]), int(offset[1])) if offset is not None else (0, 0)
+                            region = annotated_image[oy:oy + mask.shape[0], ox:ox + mask.shape[1]]
+                            region_mask = mask[:region.shape[0], :region.shape[1]] > 0
+                            
+                            # 半透明填充（region是原图视图，原地写回）
+                            overlay = region.copy()
+                            overlay[region_mask] = color
+                            cv2.addWeighted(overlay, 0.35, region, 0.65, 0, region)
                             
                             # 绘制轮廓
                             if show_contour:
@@ -101,9 +114,10 @@ class DetectionVisualizer:
                                 else:
                                     # 从mask计算轮廓
                                     contours, _ = cv2.findContours(
-                                        (mask > 0).astype(np.uint8),
+                                        region_mask.astype(np.uint8),
                                         cv2.RETR_EXTERNAL,
-                                        cv2.CHAIN_APPROX_SIMPLE
+                                        cv2.CHAIN_APPROX_SIMPLE,
+                                        offset=(ox, oy)
                                     )
                                     if contours:
                                         largest_contour = max(contours, key=cv2.contourArea)
@@ -132,6 +146,171 @@ class DetectionVisualizer:
                 return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
             return image.copy()
     
+    @staticmethod
+    def render(
+        image: np.ndarray,
+        detection_results: List[Any],
+        roi_overlay: Optional[tuple] = None,
+        crosshair: Optional[tuple] = None,
+        colors: Optional[List[tuple]] = None,
+        show_mask: bool = True,
+        show_contour: bool = True,
+        show_bbox: bool = False,
+        mask_alpha: float = 0.35,
+        thickness: int = 2,
+        crosshair_size: int = 20,
+        crosshair_color: tuple = (0, 255, 0),
+        inplace: bool = False
+    ) -> np.ndarray:
+        """
+        单缓冲区一次性绘制检测结果、ROI与十字准星
+        
+        所有mask先合成到一张标签图，只做一次半透明混合（仅混合被覆盖的像素）；
+        轮廓使用检测结果缓存的轮廓；ROI叠加层与十字准星原地绘制，全程不复制整幅图。
+        与 draw_detections + apply_roi_overlay + draw_crosshair 的结果在mask互不重叠时逐像素一致；
+        mask重叠处只按后一个目标的颜色混合一次（不再叠加多次）。
+        
+        Args:
+            image: 输入图像（灰度或BGR）
+            detection_results: 检测结果列表（DetectionBox对象列表或DetectionBatch）
+            roi_overlay: build_roi_overlay 的返回值，默认None不绘制ROI
+            crosshair: 十字准星中心 (x, y)，默认None不绘制
+            colors: 自定义颜色列表，默认None则使用默认颜色
+            show_mask: 是否绘制分割mask，默认True
+            show_contour: 是否绘制轮廓，默认True
+            show_bbox: 是否绘制边界框，默认False
+            mask_alpha: mask填充透明度，默认0.35
+            thickness: 轮廓/边界框/十字准星线条粗细
+            crosshair_size: 十字准星大小（半径）
+            crosshair_color: 十字准星颜色，默认绿色
+            inplace: 输入为BGR时直接在输入图像上绘制，默认False（先复制一份）
+        
+        Returns:
+            绘制结果（BGR）
+        """
+        try:
+            if len(image.shape) == 2 or image.shape[2] == 1:
+                canvas = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+            else:
+                canvas = image if inplace else image.copy()
+        except Exception:
+            return image
+        
+        try:
+            color_palette = colors if colors else DetectionVisualizer.DEFAULT_COLORS
+            items = []
+            for detection in detection_results if detection_results is not None else []:
+                try:
+                    class_id = int(getattr(detection, 'classId', getattr(detection, 'class_id', 0)))
+                except Exception:
+                    class_id = 0
+                items.append((class_id % len(color_palette), detection))
+            
+            if show_mask and items:
+                DetectionVisualizer._blend_masks(canvas, items, color_palette, mask_alpha)
+            
+            for color_index, detection in items:
+                color = color_palette[color_index]
+                mask = getattr(detection, 'seg_mask', None)
+                has_mask = isinstance(mask, np.ndarray)
+                
+                # 绘制轮廓（优先使用缓存的轮廓）
+                if show_mask and show_contour and has_mask:
+                    try:
+                        contour = getattr(detection, 'contour', None)
+                        if contour is None:
+                            offset = getattr(detection, 'mask_offset', None)
+                            ox, oy = (int(offset[0]), int(offset[1])) if offset is not None else (0, 0)
+                            contours, _ = cv2.findContours(
+                                (mask > 0).astype(np.uint8),
+                                cv2.RETR_EXTERNAL,
+                                cv2.CHAIN_APPROX_SIMPLE,
+                                offset=(ox, oy)
+                            )
+                            contour = max(contours, key=cv2.contourArea) if contours else None
+                        if contour is not None:
+                            cv2.polylines(canvas, [contour.reshape(-1, 1, 2)], True, color, thickness)
+                    except Exception:
+                        pass
+                
+                # 绘制边界框（若启用或没有mask）
+                if show_bbox or not show_mask:
+                    try:
+                        xmin = int(getattr(detection, 'xmin', 0))
+                        ymin = int(getattr(detection, 'ymin', 0))
+                        xmax = int(getattr(detection, 'xmax', 0))
+                        ymax = int(getattr(detection, 'ymax', 0))
+                        cv2.rectangle(canvas, (xmin, ymin), (xmax, ymax), color, thickness)
+                    except Exception:
+                        pass
+            
+            if roi_overlay:
+                DetectionVisualizer.apply_roi_overlay(canvas, roi_overlay)
+            
+            if crosshair is not None:
+                DetectionVisualizer._stroke_crosshair(
+                    canvas, int(crosshair[0]), int(crosshair[1]), crosshair_size, crosshair_color, thickness
+                )
+        except Exception:
+            pass
+        
+        return canvas
+    
+    @staticmethod
+    def _blend_masks(canvas: np.ndarray, items: List[tuple], color_palette: List[tuple], alpha: float):
+        """
+        将全部mask合成到一张标签图后一次性半透明混合（原地写回canvas）
+        
+        Args:
+            canvas: BGR画布
+            items: [(颜色索引, 检测结果), ...]
+            color_palette: 颜色列表
+            alpha: 填充透明度
+        """
+        height, width = canvas.shape[:2]
+        patches = []
+        x0, y0, x1, y1 = width, height, 0, 0
+        for color_index, detection in items:
+            mask = getattr(detection, 'seg_mask', None)
+            if not isinstance(mask, np.ndarray) or mask.ndim != 2:
+                continue
+            offset = getattr(detection, 'mask_offset', None)
+            ox, oy = (int(offset[0]), int(offset[1])) if offset is not None else (0, 0)
+            # 裁到图像范围内
+            mx0, my0 = max(0, -ox), max(0, -oy)
+            mx1, my1 = min(mask.shape[1], width - ox), min(mask.shape[0], height - oy)
+            if mx1 <= mx0 or my1 <= my0:
+                continue
+            patches.append((color_index, ox + mx0, oy + my0, mask[my0:my1, mx0:mx1]))
+            x0, y0 = min(x0, ox + mx0), min(y0, oy + my0)
+            x1, y1 = max(x1, ox + mx1), max(y1, oy + my1)
+        if not patches:
+            return
+        
+        # 颜色层与覆盖掩码只覆盖所有mask的外接区域；后绘制的目标覆盖先绘制的目标
+        fill = np.zeros((y1 - y0, x1 - x0, 3), dtype=np.uint8)
+        covered = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+        # 每种颜色只生成一块纯色图（按最大mask尺寸），各目标切片复用
+        max_h = max(p[3].shape[0] for p in patches)
+        max_w = max(p[3].shape[1] for p in patches)
+        swatches = {}
+        for color_index, px, py, mask in patches:
+            h, w = mask.shape
+            swatch = swatches.get(color_index)
+            if swatch is None:
+                swatch = np.empty((max_h, max_w, 3), dtype=np.uint8)
+                swatch[:] = np.asarray(color_palette[color_index], dtype=np.uint8)
+                swatches[color_index] = swatch
+            local = (mask > 0).view(np.uint8)
+            cv2.copyTo(swatch[:h, :w], local, fill[py - y0:py - y0 + h, px - x0:px - x0 + w])
+            view = covered[py - y0:py - y0 + h, px - x0:px - x0 + w]
+            cv2.bitwise_or(view, local, dst=view)
+        
+        # 整块混合一次，再只把被覆盖的像素写回画布
+        region = canvas[y0:y1, x0:x1]
+        blended = cv2.addWeighted(fill, alpha, region, 1.0 - alpha, 0)
+        cv2.copyTo(blended, covered, region)
+    
     @staticmethod
     def draw_roi(
         image: np.ndarray,
@@ -183,6 +362,65 @@ class DetectionVisualizer:
         except Exception:
             return image.copy()
     
+    @staticmethod
+    def build_roi_overlay(
+        rois: List[Dict],
+        height: int,
+        width: int,
+        thickness: int = 2
+    ) -> tuple:
+        """
+        预绘制ROI叠加层（与逐个调用 draw_roi 的结果逐像素一致）
+        
+        Args:
+            rois: ROI字典列表（x1, y1, x2, y2, priority）
+            height, width: 图像尺寸
+            thickness: 线条粗细
+        
+        Returns:
+            (layer, mask)：layer为(H, W, 3) BGR图层，mask为(H, W) bool，标记被绘制的像素
+        """
+        layer = np.zeros((int(height), int(width), 3), dtype=np.uint8)
+        mask = np.zeros((int(height), int(width)), dtype=np.uint8)
+        for roi in rois or []:
+            try:
+                x1, y1, x2, y2 = (int(roi[k]) for k in ('x1', 'y1', 'x2', 'y2'))
+            except Exception:
+                continue
+            color = DetectionVisualizer.ROI_PRIORITY_COLORS.get(
+                roi.get('priority'), DetectionVisualizer.ROI_DEFAULT_COLOR
+            )
+            cv2.rectangle(layer, (x1, y1), (x2, y2), color, thickness)
+            cv2.rectangle(mask, (x1, y1), (x2, y2), 255, thickness)
+        return layer, mask.astype(bool)
+    
+    @staticmethod
+    def apply_roi_overlay(image: np.ndarray, overlay: Optional[tuple]) -> np.ndarray:
+        """
+        将预绘制的ROI叠加层贴到图像上
+        
+        Args:
+            image: 输入图像（彩色图原地绘制，灰度图先转为BGR）
+            overlay: build_roi_overlay 的返回值
+        
+        Returns:
+            绘制了ROI的图像
+        """
+        try:
+            if len(image.shape) == 2 or image.shape[2] == 1:
+                result = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+            else:
+                result = image
+            if not overlay:
+                return result
+            layer, mask = overlay
+            if layer.shape[:2] != result.shape[:2]:
+                return result
+            np.copyto(result, layer, where=mask[..., None])
+            return result
+        except Exception:
+            return image
+    
     @staticmethod
     def draw_crosshair(
         image: np.ndarray,
@@ -207,31 +445,20 @@ class DetectionVisualizer:
         """
         try:
             result = image.copy()
-            
-            # 绘制水平线
-            cv2.line(
-                result,
-                (center_x - size, center_y),
-                (center_x + size, center_y),
-                color,
-                thickness
-            )
-            
-            # 绘制垂直线
-            cv2.line(
-                result,
-                (center_x, center_y - size),
-                (center_x, center_y + size),
-                color,
-                thickness
-            )
-            
-            # 绘制中心点
-            cv2.circle(result, (center_x, center_y), 3, color, -1)
-            
+            DetectionVisualizer._stroke_crosshair(result, center_x, center_y, size, color, thickness)
             return result
             
         except Exception:
             return image.copy()
     
+    @staticmethod
+    def _stroke_crosshair(image: np.ndarray, center_x: int, center_y: int, size: int, color: tuple, thickness: int):
+        """在图像上原地绘制十字准星"""
+        # 绘制水平线
+        cv2.line(image, (center_x - size, center_y), (center_x + size, center_y), color, thickness)
+        # 绘制垂直线
+        cv2.line(image, (center_x, center_y - size), (center_x, center_y + size), color, thickness)
+        # 绘制中心点
+        cv2.circle(image, (center_x, center_y), 3, color, -1)
+    
 
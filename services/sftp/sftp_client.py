@@ -5,6 +5,7 @@ from typing import Optional, Any
 import os
 import posixpath
 import socket
+import time
 
 import paramiko  # type: ignore
 
@@ -19,10 +20,13 @@ class SftpClient:
         self._password = self._cfg.get("password", "")
         self._remote_root = self._cfg.get("remote_path", "/")
         self._timeout = int(self._cfg.get("connection_timeout", 15))
+        self._reconnect_interval = float(self._cfg.get("reconnect_interval", 5))
+        self._next_connect_at = 0.0  # 按需重连失败后，在此时间之前不再尝试（避免每次上传都等待连接超时）
 
         self._transport: Optional[paramiko.Transport] = None
         self._sftp: Optional[paramiko.SFTPClient] = None
         self._was_connected = False  # 标记是否曾经连接过，用于检测断开
+        self._known_dirs = set()  # 本次连接中已确认存在的远程目录（避免每次上传都逐级stat）
 
     def connect(self, verbose: bool = True) -> bool:
         """
@@ -42,6 +46,7 @@ class SftpClient:
             self._transport.banner_timeout = self._timeout
             self._transport.connect(username=self._username, password=self._password)
             self._sftp = paramiko.SFTPClient.from_transport(self._transport)
+            self._known_dirs.clear()
             
             # 标记已连接
             self._was_connected = True
@@ -109,15 +114,19 @@ class SftpClient:
         
         # 主动断开时重置标志
         self._was_connected = False
+        self._known_dirs.clear()
         
         if self._logger and verbose:
             self._logger.debug("SFTP 已断开")
 
     def _ensure_connected(self):
-        """确保已连接（按需连接，静默模式）"""
+        """确保已连接（按需连接，静默模式；失败后 reconnect_interval 秒内直接报错）"""
         if self._sftp is None:
+            if time.monotonic() < self._next_connect_at:
+                raise RuntimeError("SFTP 未连接")
             ok = self.connect(verbose=False)
             if not ok:
+                self._next_connect_at = time.monotonic() + self._reconnect_interval
                 raise RuntimeError("SFTP 未连接")
 
     @staticmethod
@@ -130,6 +139,8 @@ class SftpClient:
         assert self._sftp is not None
         # 逐级创建目录
         remote_path = self._to_posix_path(remote_path)
+        if posixpath.dirname(remote_path) in self._known_dirs:
+            return
         dirs = []
         p = remote_path
         while True:
@@ -144,6 +155,8 @@ class SftpClient:
         cur = "/" if remote_path.startswith("/") else ""
         for i, d in enumerate(dirs[:-1]):  # 不包含文件名部分
             cur = posixpath.join(cur, d) if cur else d
+            if cur in self._known_dirs:
+                continue
             try:
                 self._sftp.stat(cur)
             except IOError:
@@ -155,6 +168,7 @@ class SftpClient:
                     if self._logger:
                         self._logger.error(f"SFTP 创建目录失败: {cur} err={e}")
                     raise
+            self._known_dirs.add(cur)
 
     def upload_file(self, local_path: str, remote_rel_path: str) -> bool:
         self._ensure_connected()
@@ -273,6 +287,7 @@ class SftpClient:
             if self._was_connected and self._logger:
                 self._logger.warning(f"SFTP 连接已断开: {self._host}:{self._port} | 将自动重连")
                 self._was_connected = False
+            self._known_dirs.clear()
             
             if self._sftp:
                 try:
@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+本地磁盘暂存（SFTP不可用时保存待上传的图像）
+- 数据追加写入段文件（*.seg），每条记录在索引文件（*.idx）中追加一行，避免大量小文件
+- 游标文件记录已上传到的位置；段内记录全部上传后删除该段
+- 按总大小与存放时间淘汰最旧的段
+- 启动时从段文件与索引恢复（索引中超出段文件长度的残缺记录被忽略）
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class DiskSpool:
+    """
+    追加写入的磁盘暂存队列（先进先出）
+
+    使用方式：
+        spool = DiskSpool("spool/sftp", max_bytes=512 * 1024 * 1024)
+        spool.append(jpg_bytes, "images/catch_xxx.jpg")
+        records = spool.peek(8)          # [(key, remote_rel_path, data), ...]
+        spool.ack(records[-1][0])        # 确认上传到该记录（含）为止
+    """
+
+    SEG_SUFFIX = ".seg"
+    IDX_SUFFIX = ".idx"
+    CURSOR_FILE = "cursor"
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        max_age_s: float = 7 * 24 * 3600,
+        segment_bytes: int = 16 * 1024 * 1024,
+        logger: Optional[Any] = None,
+    ):
+        """
+        Args:
+            root: 暂存目录
+            max_bytes: 段文件总大小上限（超出时淘汰最旧的段）
+            max_age_s: 记录最长保存时间（秒），段内最新记录超时后整段淘汰；<=0 不限制
+            segment_bytes: 单个段文件大小（超过后新建段）
+            logger: 日志记录器
+        """
+        self._root = root
+        self._max_bytes = max(1, int(max_bytes))
+        self._max_age_s = float(max_age_s)
+        self._segment_bytes = max(1, int(segment_bytes))
+        self._logger = logger
+        self._lock = threading.Lock()
+        # seq -> {"records": [(offset, length, remote_rel, ts)], "size": 段文件大小}
+        self._segments: Dict[int, Dict[str, Any]] = {}
+        self._cursor: Tuple[int, int] = (0, 0)  # 下一条待上传记录 (seq, index)
+        self._writer_seq: Optional[int] = None
+        self._seg_file = None
+        self._idx_file = None
+        self._evicted = 0
+        os.makedirs(self._root, exist_ok=True)
+        self._recover()
+
+    # ---- 写入 ----
+    def append(self, data: bytes, remote_rel_path: str) -> bool:
+        """追加一条记录；失败返回False"""
+        try:
+            with self._lock:
+                seg = self._writable_segment(len(data))
+                offset = seg["size"]
+                self._seg_file.write(data)
+                self._seg_file.flush()
+                ts = time.time()
+                self._idx_file.write(json.dumps([offset, len(data), remote_rel_path, round(ts, 3)]) + "\n")
+                self._idx_file.flush()
+                seg["size"] = offset + len(data)
+                seg["records"].append((offset, len(data), remote_rel_path, ts))
+                self._enforce_limits()
+            return True
+        except Exception as e:
+            if self._logger:
+                self._logger.warning(f"暂存写入失败: {remote_rel_path} | {e}")
+            return False
+
+    # ---- 读取与确认 ----
+    def peek(self, max_items: int = 8) -> List[Tuple[Tuple[int, int], str, bytes]]:
+        """按写入顺序读取最多max_items条未上传的记录：[(key, remote_rel_path, data), ...]"""
+        out = []
+        with self._lock:
+            seq, index = self._cursor
+            for s in sorted(k for k in self._segments if k >= seq):
+                records = self._segments[s]["records"]
+                start = index if s == seq else 0
+                if start >= len(records):
+                    continue
+                with open(self._path(s, self.SEG_SUFFIX), "rb") as f:
+                    for i in range(start, len(records)):
+                        offset, length, remote_rel, _ = records[i]
+                        f.seek(offset)
+                        out.append(((s, i), remote_rel, f.read(length)))
+                        if len(out) >= max_items:
+                            return out
+        return out
+
+    def ack(self, key: Tuple[int, int]):
+        """确认上传到key（含）为止；已全部上传的段被删除"""
+        with self._lock:
+            seq, index = key
+            if (seq, index + 1) <= self._cursor:
+                return
+            self._cursor = (seq, index + 1)
+            for s in sorted(self._segments):
+                if s >= seq:
+                    break
+                self._remove_segment(s)
+            seg = self._segments.get(seq)
+            if seg is not None and index + 1 >= len(seg["records"]) and seq != self._writer_seq:
+                self._remove_segment(seq)
+            self._save_cursor()
+
+    def pending(self) -> int:
+        """未上传的记录数"""
+        with self._lock:
+            return self._pending_locked()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "segments": len(self._segments),
+                "bytes": sum(seg["size"] for seg in self._segments.values()),
+                "pending": self._pending_locked(),
+                "evicted": self._evicted,
+            }
+
+    def close(self):
+        with self._lock:
+            self._close_writer()
+
+    # internal
+    def _path(self, seq: int, suffix: str) -> str:
+        return os.path.join(self._root, f"{seq:08d}{suffix}")
+
+    def _pending_locked(self) -> int:
+        seq, index = self._cursor
+        total = 0
+        for s, seg in self._segments.items():
+            if s > seq:
+                total += len(seg["records"])
+            elif s == seq:
+                total += max(0, len(seg["records"]) - index)
+        return total
+
+    def _writable_segment(self, incoming: int) -> Dict[str, Any]:
+        seg = self._segments.get(self._writer_seq) if self._writer_seq is not None else None
+        if seg is not None and seg["records"] and seg["size"] + incoming > self._segment_bytes:
+            self._close_writer()
+            seg = None
+        if seg is None:
+            seq = max(max(self._segments, default=-1), self._cursor[0]) + 1
+            self._seg_file = open(self._path(seq, self.SEG_SUFFIX), "ab")
+            self._idx_file = open(self._path(seq, self.IDX_SUFFIX), "a", encoding="utf-8")
+            seg = {"records": [], "size": 0}
+            self._segments[seq] = seg
+            self._writer_seq = seq
+        return seg
+
+    def _close_writer(self):
+        for f in (self._seg_file, self._idx_file):
+            try:
+                if f is not None:
+                    f.close()
+            except Exception:
+                pass
+        self._seg_file = None
+        self._idx_file = None
+        self._writer_seq = None
+
+    def _remove_segment(self, seq: int):
+        if seq == self._writer_seq:
+            self._close_writer()
+        self._segments.pop(seq, None)
+        for suffix in (self.SEG_SUFFIX, self.IDX_SUFFIX):
+            try:
+                os.remove(self._path(seq, suffix))
+            except OSError:
+                pass
+
+    def _enforce_limits(self):
+        """淘汰最旧的段，直到总大小与存放时间都在限制内"""
+        now = time.time()
+        while self._segments:
+            oldest = min(self._segments)
+            seg = self._segments[oldest]
+            total = sum(s["size"] for s in self._segments.values())
+            newest_ts = seg["records"][-1][3] if seg["records"] else now
+            too_big = total > self._max_bytes
+            too_old = self._max_age_s > 0 and now - newest_ts > self._max_age_s
+            if not (too_big or too_old):
+                break
+            seq, index = self._cursor
+            if oldest > seq:
+                lost = len(seg["records"])
+            elif oldest == seq:
+                lost = max(0, len(seg["records"]) - index)
+            else:
+                lost = 0
+            self._evicted += lost
+            self._remove_segment(oldest)
+            if self._cursor[0] <= oldest:
+                self._cursor = (oldest + 1, 0)
+                self._save_cursor()
+            if self._logger and lost:
+                self._logger.warning(f"暂存超出限制，淘汰 {lost} 条未上传的记录")
+
+    def _save_cursor(self):
+        tmp = os.path.join(self._root, self.CURSOR_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(f"{self._cursor[0]} {self._cursor[1]}")
+        os.replace(tmp, os.path.join(self._root, self.CURSOR_FILE))
+
+    def _recover(self):
+        """从段文件与索引恢复；之后的写入总是新建段（不在可能残缺的段尾追加）"""
+        for name in os.listdir(self._root):
+            if not name.endswith(self.SEG_SUFFIX):
+                continue
+            try:
+                seq = int(name[:-len(self.SEG_SUFFIX)])
+            except ValueError:
+                continue
+            size = os.path.getsize(self._path(seq, self.SEG_SUFFIX))
+            records = []
+            try:
+                with open(self._path(seq, self.IDX_SUFFIX), "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            offset, length, remote_rel, ts = json.loads(line)
+                        except Exception:
+                            continue
+                        if offset + length <= size:
+                            records.append((int(offset), int(length), str(remote_rel), float(ts)))
+            except OSError:
+                pass
+            self._segments[seq] = {"records": records, "size": size}
+
+        try:
+            with open(os.path.join(self._root, self.CURSOR_FILE), "r", encoding="utf-8") as f:
+                seq, index = (int(v) for v in f.read().split())
+            self._cursor = (seq, index)
+        except Exception:
+            self._cursor = (min(self._segments, default=0), 0)
+
+        # 删除已全部上传的段
+        for s in sorted(self._segments):
+            seq, index = self._cursor
+            if s < seq or (s == seq and index >= len(self._segments[s]["records"])):
+                self._remove_segment(s)
+        if self._segments and self._cursor[0] < min(self._segments):
+            self._cursor = (min(self._segments), 0)
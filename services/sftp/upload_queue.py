@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SFTP异步上传队列
+- submit 只入队，立即返回；后台线程复用已建立的SFTP连接逐个上传
+- 队列有界：积压时丢弃最旧的任务，或写入本地暂存（overflow="spill"，见 DiskSpool）
+- 上传失败（服务器不可达/写入失败）后进入离线状态：retry_interval 内新任务直接写入暂存，不再等待连接超时
+- 队列空闲且在线时，后台线程按写入顺序补传暂存中的记录
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from services.system.metrics import get_metrics
+from services.system.pipeline import DropOldestQueue, StageStats
+from .spool import DiskSpool
+
+
+class SftpUploadQueue:
+    """
+    SFTP异步上传队列
+
+    使用方式：
+        uploader = SftpUploadQueue(sftp_client, queue_size=32, overflow="spill", spool=DiskSpool("spool/sftp"))
+        uploader.submit(jpg_bytes, "images/catch_20240101_120000_000.jpg")
+    """
+
+    OVERFLOW_MODES = ("drop", "spill")
+
+    def __init__(
+        self,
+        client: Optional[Any] = None,
+        queue_size: int = 32,
+        batch_size: int = 8,
+        overflow: str = "drop",
+        spool: Optional[DiskSpool] = None,
+        retry_interval: float = 10.0,
+        logger: Optional[Any] = None,
+        get_timeout: float = 0.5,
+    ):
+        """
+        Args:
+            client: SftpClient实例（可稍后通过 set_client 设置/替换）
+            queue_size: 队列容量
+            batch_size: 后台线程每次取出/补传的最大任务数
+            overflow: 积压或上传失败时的处理方式："drop" 丢弃，"spill" 写入本地暂存
+            spool: overflow="spill" 时使用的本地暂存
+            retry_interval: 上传失败后的离线时长（秒），期间不尝试连接
+            logger: 日志记录器
+            get_timeout: 队列等待超时（秒），用于响应停止
+        """
+        self._client = client
+        self._batch_size = max(1, int(batch_size))
+        self._overflow = overflow if overflow in self.OVERFLOW_MODES else "drop"
+        self._spool = spool
+        self._retry_interval = max(0.0, float(retry_interval))
+        self._offline_until = 0.0
+        self._logger = logger
+        self._get_timeout = float(get_timeout)
+        self._queue = DropOldestQueue(queue_size, on_drop=self._on_overflow)
+        self._stats = StageStats()
+        self._counts = {"uploaded": 0, "failed": 0, "spilled": 0, "discarded": 0, "drained": 0}
+        self._counts_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def set_client(self, client: Optional[Any]):
+        """设置/替换SFTP客户端（SFTP重连后由初始化器调用，同时结束离线状态）"""
+        self._client = client
+        self._offline_until = 0.0
+
+    def submit(self, data: bytes, remote_rel_path: str) -> bool:
+        """
+        提交上传任务（不等待网络）
+
+        Args:
+            data: 文件字节数据
+            remote_rel_path: 远程相对路径
+
+        Returns:
+            是否已入队
+        """
+        if data is None or not remote_rel_path:
+            return False
+        self.start()
+        # 编码器返回的 memoryview 不会被复用，直接入队，不再复制
+        if not isinstance(data, (bytes, memoryview)):
+            data = bytes(data)
+        self._queue.put((data, str(remote_rel_path)))
+        return True
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self._stop_event.is_set():
+                self._stop_event.clear()
+                self._queue = DropOldestQueue(self._queue.maxsize, on_drop=self._on_overflow)
+            self._thread = threading.Thread(target=self._loop, name="SftpUploadQueue", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """停止后台线程（未上传的任务按 overflow 策略处理）"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        self._stop_event.set()
+        pending = self._queue.drain()
+        self._queue.close()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+        for job in pending:
+            self._on_overflow(job)
+        if self._spool is not None:
+            self._spool.close()
+
+    def is_alive(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._stats.snapshot()
+        with self._counts_lock:
+            snapshot.update(self._counts)
+        snapshot.update({
+            "pending": self._queue.qsize(),
+            "overflowed": self._queue.dropped,
+            "offline": self._is_offline(),
+        })
+        if self._spool is not None:
+            snapshot["spool"] = self._spool.stats()
+        return snapshot
+
+    # internal
+    def _loop(self):
+        draining = False
+        while not self._stop_event.is_set():
+            # 暂存中还有待补传的记录时不等待，新任务仍优先
+            batch = self._queue.get_batch(self._batch_size, timeout=0 if draining else self._get_timeout)
+            if batch:
+                self._upload_batch(batch)
+            draining = self._spool is not None and not self._is_offline() and self._drain_spool()
+
+    def _upload_batch(self, batch):
+        for i, (data, remote_rel) in enumerate(batch):
+            if self._is_offline() or not self._upload_one(data, remote_rel):
+                # 服务器不可用时本批剩余任务直接按溢出策略处理，不再逐个等待连接
+                for job in batch[i:]:
+                    self._on_overflow(job)
+                return
+
+    def _drain_spool(self) -> bool:
+        """
+        补传暂存中的记录（按写入顺序；失败即停止，等待下次重试）
+
+        Returns:
+            是否可能还有待补传的记录
+        """
+        try:
+            records = self._spool.peek(self._batch_size)
+        except Exception as e:
+            if self._logger:
+                self._logger.warning(f"读取暂存失败: {e}")
+            self._go_offline()
+            return False
+        last_key = None
+        drained = 0
+        for key, remote_rel, data in records:
+            if self._stop_event.is_set() or self._queue.qsize() > 0 or not self._upload_one(data, remote_rel):
+                break
+            last_key = key
+            drained += 1
+        if last_key is not None:
+            self._spool.ack(last_key)
+            self._count("drained", drained)
+        return drained > 0 and drained == len(records)
+
+    def _upload_one(self, data: bytes, remote_rel: str) -> bool:
+        client = self._client
+        t0 = time.perf_counter()
+        ok = False
+        if client is not None:
+            try:
+                ok = bool(client.upload_bytes(data, remote_rel))
+            except Exception as e:
+                if self._logger:
+                    self._logger.debug(f"SFTP异步上传异常: {remote_rel} | {e}")
+        if ok:
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            self._stats.record(elapsed_ms)
+            get_metrics().record("sftp.upload", elapsed_ms)
+            self._count("uploaded")
+            return True
+        self._stats.record_error()
+        self._count("failed")
+        self._go_offline()
+        return False
+
+    def _is_offline(self) -> bool:
+        return time.monotonic() < self._offline_until
+
+    def _go_offline(self):
+        if not self._is_offline() and self._logger:
+            self._logger.warning(f"SFTP上传失败，{self._retry_interval:.0f}秒内不再尝试连接")
+        self._offline_until = time.monotonic() + self._retry_interval
+
+    def _on_overflow(self, job):
+        """积压被挤出或上传失败的任务：按策略丢弃或写入本地暂存"""
+        data, remote_rel = job
+        if self._overflow == "spill" and self._spool is not None:
+            if self._spool.append(data, remote_rel):
+                self._count("spilled")
+                return
+        self._count("discarded")
+        if self._logger:
+            self._logger.warning(f"SFTP上传任务已丢弃: {remote_rel}")
+
+    def _count(self, key: str, n: int = 1):
+        with self._counts_lock:
+            self._counts[key] += n
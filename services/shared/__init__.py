@@ -7,10 +7,12 @@
 """
 
 from .image_utils import ImageUtils
+from .jpeg_encoder import JpegEncoder
 from .sftp_helper import SftpHelper
 
 __all__ = [
     'ImageUtils',
+    'JpegEncoder',
     'SftpHelper',
 ]
 
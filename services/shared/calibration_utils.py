@@ -1,43 +1,157 @@
 import os
 import json
+import time
+import threading
 
+import numpy as np
 
-def world_to_robot_using_calib(world_xyz, project_root: str):
-    try:
-        if world_xyz is None:
-            return None
-        xw, yw, zw = float(world_xyz[0]), float(world_xyz[1]), float(world_xyz[2])
-        calib_path = os.path.join(project_root, "configs", "transformation_matrix.json")
-        if not os.path.exists(calib_path):
-            return None
-        with open(calib_path, "r", encoding="utf-8") as f:
-            data = json.load(f) or {}
+
+# 机器人坐标Z轴下限（防止机械臂下探过深）
+_Z_MIN = -85.0
+# 标定文件 mtime 检查间隔（秒）：间隔内直接使用缓存，热路径上不做任何文件操作
+_STAT_INTERVAL = 1.0
+
+_cache_lock = threading.Lock()
+_cache = {}  # {calib_path: {"transform", "stamp", "checked_at"}}
+
+
+class CalibrationTransform:
+    """
+    已解析的标定变换（世界坐标 → 机器人坐标）
+    - xy_affine: matrix_xy (2×3) + z_mapping (alpha, beta)
+    - matrix: 4×4 齐次变换矩阵
+    """
+
+    def __init__(self, mode: str, matrix: np.ndarray, alpha: float = 1.0, beta: float = 0.0):
+        self.mode = mode
+        self.matrix = matrix
+        self.alpha = alpha
+        self.beta = beta
+
+    @classmethod
+    def from_dict(cls, data: dict):
         mx = data.get("matrix_xy")
         zm = data.get("z_mapping")
         if isinstance(mx, list) and len(mx) == 2 and all(isinstance(r, list) and len(r) == 3 for r in mx) and isinstance(zm, dict):
-            a11, a12, a13 = float(mx[0][0]), float(mx[0][1]), float(mx[0][2])
-            a21, a22, a23 = float(mx[1][0]), float(mx[1][1]), float(mx[1][2])
-            xr = a11 * xw + a12 * yw + a13
-            yr = a21 * xw + a22 * yw + a23
             alpha = float(zm.get("alpha", 1.0)) if zm else 1.0
             beta = float(zm.get("beta", 0.0)) if zm else 0.0
-            zr = alpha * zw + beta
-            if zr < -85.0:
-                zr = -85.0
-            return [xr, yr, zr]
+            return cls("xy_affine", np.array(mx, dtype=np.float64), alpha, beta)
         M = data.get("matrix")
         if isinstance(M, list) and len(M) == 4 and all(isinstance(r, list) and len(r) == 4 for r in M):
-            m = M
-            xr = m[0][0]*xw + m[0][1]*yw + m[0][2]*zw + m[0][3]
-            yr = m[1][0]*xw + m[1][1]*yw + m[1][2]*zw + m[1][3]
-            zr = m[2][0]*xw + m[2][1]*yw + m[2][2]*zw + m[2][3]
-            w = m[3][0]*xw + m[3][1]*yw + m[3][2]*zw + m[3][3]
-            if w != 0:
-                xr, yr, zr = xr / w, yr / w, zr / w
-            if zr < -85.0:
-                zr = -85.0
-            return [xr, yr, zr]
+            return cls("matrix", np.array(M, dtype=np.float64))
+        return None
+
+    def transform(self, points) -> np.ndarray:
+        """
+        批量变换
+
+        Args:
+            points: (N, 3) 世界坐标
+
+        Returns:
+            (N, 3) 机器人坐标（Z轴限制在下限以上）
+        """
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        xw, yw, zw = pts[:, 0], pts[:, 1], pts[:, 2]
+        m = self.matrix
+        # 逐项展开（与逐点计算的运算顺序一致，结果逐位相同）
+        if self.mode == "xy_affine":
+            xr = m[0, 0] * xw + m[0, 1] * yw + m[0, 2]
+            yr = m[1, 0] * xw + m[1, 1] * yw + m[1, 2]
+            zr = self.alpha * zw + self.beta
+        else:
+            xr = m[0, 0] * xw + m[0, 1] * yw + m[0, 2] * zw + m[0, 3]
+            yr = m[1, 0] * xw + m[1, 1] * yw + m[1, 2] * zw + m[1, 3]
+            zr = m[2, 0] * xw + m[2, 1] * yw + m[2, 2] * zw + m[2, 3]
+            w = m[3, 0] * xw + m[3, 1] * yw + m[3, 2] * zw + m[3, 3]
+            nz = w != 0
+            safe_w = np.where(nz, w, 1.0)
+            xr = np.where(nz, xr / safe_w, xr)
+            yr = np.where(nz, yr / safe_w, yr)
+            zr = np.where(nz, zr / safe_w, zr)
+        zr = np.maximum(zr, _Z_MIN)
+        return np.stack([xr, yr, zr], axis=1)
+
+
+def _calib_path(project_root: str) -> str:
+    return os.path.join(project_root, "configs", "transformation_matrix.json")
+
+
+def _load_transform(calib_path: str):
+    try:
+        with open(calib_path, "r", encoding="utf-8") as f:
+            data = json.load(f) or {}
+        return CalibrationTransform.from_dict(data)
+    except Exception:
         return None
+
+
+def get_calibration_transform(project_root: str):
+    """
+    获取标定变换（缓存；按文件 mtime/大小 检测变化，检查频率受 _STAT_INTERVAL 限制）
+
+    Returns:
+        CalibrationTransform，标定文件不存在或无效时返回None
+    """
+    calib_path = _calib_path(project_root)
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(calib_path)
+        if entry is not None and now - entry["checked_at"] < _STAT_INTERVAL:
+            return entry["transform"]
+
+    try:
+        st = os.stat(calib_path)
+        stamp = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        stamp = None
+
+    if entry is not None and entry["stamp"] == stamp:
+        transform = entry["transform"]
+    else:
+        transform = _load_transform(calib_path) if stamp is not None else None
+
+    with _cache_lock:
+        _cache[calib_path] = {"transform": transform, "stamp": stamp, "checked_at": now}
+    return transform
+
+
+def invalidate_calibration_cache(project_root: str = None) -> None:
+    """标定文件更新后调用，下次取用时重新加载（不传参数则清空全部）"""
+    with _cache_lock:
+        if project_root is None:
+            _cache.clear()
+        else:
+            _cache.pop(_calib_path(project_root), None)
+
+
+def world_to_robot_batch(world_points, project_root: str):
+    """
+    批量世界坐标 → 机器人坐标
+
+    Args:
+        world_points: (N, 3) 世界坐标
+
+    Returns:
+        (N, 3) 机器人坐标；无有效标定时返回None
+    """
+    try:
+        transform = get_calibration_transform(project_root)
+        if transform is None:
+            return None
+        return transform.transform(world_points)
     except Exception:
         return None
 
+
+def world_to_robot_using_calib(world_xyz, project_root: str):
+    try:
+        if world_xyz is None:
+            return None
+        xw, yw, zw = float(world_xyz[0]), float(world_xyz[1]), float(world_xyz[2])
+        robot = world_to_robot_batch([[xw, yw, zw]], project_root)
+        if robot is None:
+            return None
+        return [float(v) for v in robot[0]]
+    except Exception:
+        return None
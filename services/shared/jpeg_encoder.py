@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+JPEG编码服务
+- 按命令配置编码质量与最大宽度（超出时等比缩小）
+- 灰度图直接按单通道编码（数据量约为彩色的1/3）
+- 返回编码缓冲区的 memoryview，不再额外复制为 bytes
+- 后端可选：OpenCV（默认）或 libjpeg-turbo（安装 PyTurboJPEG 时）
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+import cv2
+import numpy as np
+
+
+class JpegEncoder:
+    """
+    JPEG编码器
+
+    使用方式：
+        encoder = JpegEncoder.get("auto")
+        jpg = encoder.encode(image, quality=85, max_width=1280)
+
+        # 按配置中的命令策略编码
+        jpg = JpegEncoder.encode_for(config, "catch", image)
+    """
+
+    BACKENDS = ("auto", "opencv", "turbojpeg")
+    DEFAULT_QUALITY = 95
+
+    _instances: Dict[str, "JpegEncoder"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, backend: str = "auto", logger: Optional[Any] = None):
+        """
+        Args:
+            backend: "auto"（有 PyTurboJPEG 时使用 libjpeg-turbo，否则 OpenCV）、"opencv" 或 "turbojpeg"
+            logger: 日志记录器
+        """
+        self._logger = logger
+        self._turbo = None
+        self._turbo_consts = None
+        if backend in ("auto", "turbojpeg"):
+            self._turbo = self._load_turbojpeg(required=(backend == "turbojpeg"))
+        self.backend = "turbojpeg" if self._turbo is not None else "opencv"
+
+    @classmethod
+    def get(cls, backend: str = "auto") -> "JpegEncoder":
+        """获取共享的编码器实例（每种后端一个，避免重复加载 libjpeg-turbo）"""
+        backend = backend if backend in cls.BACKENDS else "auto"
+        with cls._instances_lock:
+            encoder = cls._instances.get(backend)
+            if encoder is None:
+                encoder = cls(backend)
+                cls._instances[backend] = encoder
+            return encoder
+
+    @staticmethod
+    def policy_for(config: Optional[dict], command: str) -> Dict[str, Any]:
+        """
+        读取命令的编码策略（jpeg.commands.<command> 覆盖 jpeg 下的默认值）
+
+        Returns:
+            {"backend", "quality", "max_width"}
+        """
+        jpeg_cfg = (config.get("jpeg") or {}) if isinstance(config, dict) else {}
+        cmd_cfg = (jpeg_cfg.get("commands") or {}).get(command) or {}
+        try:
+            quality = int(cmd_cfg.get("quality", jpeg_cfg.get("quality", JpegEncoder.DEFAULT_QUALITY)))
+        except Exception:
+            quality = JpegEncoder.DEFAULT_QUALITY
+        try:
+            max_width = int(cmd_cfg.get("max_width", jpeg_cfg.get("max_width", 0)) or 0)
+        except Exception:
+            max_width = 0
+        return {
+            "backend": str(jpeg_cfg.get("backend", "auto")),
+            "quality": min(100, max(1, quality)),
+            "max_width": max(0, max_width),
+        }
+
+    @staticmethod
+    def encode_for(config: Optional[dict], command: str, image: np.ndarray) -> Optional[memoryview]:
+        """按配置中该命令的策略编码（失败返回None）"""
+        policy = JpegEncoder.policy_for(config, command)
+        return JpegEncoder.get(policy["backend"]).encode(
+            image, quality=policy["quality"], max_width=policy["max_width"]
+        )
+
+    def encode(self, image: np.ndarray, quality: int = DEFAULT_QUALITY, max_width: int = 0) -> Optional[memoryview]:
+        """
+        编码为JPEG
+
+        Args:
+            image: 灰度(H, W)/(H, W, 1) 或 BGR(H, W, 3) 图像
+            quality: JPEG质量（1-100）
+            max_width: 最大宽度，超出时等比缩小；0 表示不缩放
+
+        Returns:
+            JPEG数据的 memoryview（可直接写文件/上传），失败返回None
+        """
+        try:
+            if image is None:
+                return None
+            if image.ndim == 3 and image.shape[2] == 1:
+                image = image[:, :, 0]
+            if max_width and image.shape[1] > max_width:
+                height = max(1, int(round(image.shape[0] * max_width / image.shape[1])))
+                image = cv2.resize(image, (int(max_width), height), interpolation=cv2.INTER_AREA)
+            if self._turbo is not None:
+                return self._encode_turbo(image, int(quality))
+            ok, buf = cv2.imencode(".jpg", image, [int(cv2.IMWRITE_JPEG_QUALITY), int(quality)])
+            if not ok:
+                return None
+            return memoryview(buf.reshape(-1))
+        except Exception as e:
+            if self._logger:
+                self._logger.debug(f"JPEG编码失败: {e}")
+            return None
+
+    # internal
+    def _encode_turbo(self, image: np.ndarray, quality: int) -> memoryview:
+        pf_bgr, pf_gray, samp_420, samp_gray = self._turbo_consts
+        image = np.ascontiguousarray(image)
+        if image.ndim == 2:
+            data = self._turbo.encode(image[:, :, None], quality=quality, pixel_format=pf_gray, jpeg_subsample=samp_gray)
+        else:
+            data = self._turbo.encode(image, quality=quality, pixel_format=pf_bgr, jpeg_subsample=samp_420)
+        return memoryview(data)
+
+    def _load_turbojpeg(self, required: bool):
+        try:
+            from turbojpeg import TurboJPEG, TJPF_BGR, TJPF_GRAY, TJSAMP_420, TJSAMP_GRAY  # type: ignore
+            turbo = TurboJPEG()
+            self._turbo_consts = (TJPF_BGR, TJPF_GRAY, TJSAMP_420, TJSAMP_GRAY)
+            return turbo
+        except Exception as e:
+            if required and self._logger:
+                self._logger.warning(f"libjpeg-turbo 不可用，改用OpenCV编码: {e}")
+            return None
@@ -22,7 +22,8 @@ class SftpHelper:
         sftp,
         image_data: bytes,
         prefix: str = "image",
-        remote_dir: str = "images"
+        remote_dir: str = "images",
+        plan: Optional[Dict[str, any]] = None
     ) -> Optional[Dict[str, any]]:
         """
         上传图像字节数据到SFTP服务器
@@ -32,6 +33,7 @@ class SftpHelper:
             image_data: 图像字节数据
             prefix: 文件名前缀，默认"image"
             remote_dir: 远程目录，默认"images"
+            plan: 预先生成的上传信息（plan_image_upload），给定时上传到其中的路径
             
         Returns:
             上传信息字典，包含文件名、路径等信息，失败返回None
@@ -47,37 +49,101 @@ class SftpHelper:
             if not sftp or image_data is None:
                 return None
             
-            # 生成带时间戳的文件名
-            ts = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
-            filename = f"{prefix}_{ts}.jpg"
-            
-            # 构建远程路径
-            remote_rel = os.path.join(remote_dir, filename).replace("\\", "/")
+            upload_info = SftpHelper._resolve_plan(plan, len(image_data), prefix, remote_dir)
             
             # 使用SFTP客户端的upload_bytes方法上传
-            ok = sftp.upload_bytes(image_data, remote_rel)
+            ok = sftp.upload_bytes(image_data, upload_info["remote_rel_path"])
             if not ok:
                 return None
             
-            # 构建返回信息
-            remote_path = os.path.dirname(remote_rel).replace("\\", "/")
-            if not remote_path.startswith("/"):
-                remote_path = f"/{remote_path}" if remote_path else "/"
-            if not remote_path.endswith("/"):
-                remote_path = f"{remote_path}/"
-            remote_file = f"{remote_path.rstrip('/')}/{filename}"
-            
-            return {
-                "filename": filename,
-                "remote_path": remote_path,
-                "remote_rel_path": remote_rel,
-                "remote_file": remote_file,
-                "file_size": len(image_data),
-            }
+            return upload_info
+            
+        except Exception:
+            return None
+    
+    @staticmethod
+    def submit_image_bytes(
+        uploader,
+        sftp,
+        image_data: bytes,
+        prefix: str = "image",
+        remote_dir: str = "images",
+        plan: Optional[Dict[str, any]] = None
+    ) -> Optional[Dict[str, any]]:
+        """
+        提交图像上传：有异步上传队列时入队并立即返回预测的上传信息，否则同步上传
+        
+        Args:
+            uploader: SftpUploadQueue实例（None则同步上传）
+            sftp: SFTP客户端实例
+            image_data: 图像字节数据
+            prefix: 文件名前缀，默认"image"
+            remote_dir: 远程目录，默认"images"
+            plan: 预先生成的上传信息（plan_image_upload），给定时上传到其中的路径
             
+        Returns:
+            上传信息字典（格式同 upload_image_bytes），失败返回None
+        """
+        if uploader is None:
+            return SftpHelper.upload_image_bytes(sftp, image_data, prefix, remote_dir, plan=plan)
+        try:
+            if not sftp or image_data is None:
+                return None
+            upload_info = SftpHelper._resolve_plan(plan, len(image_data), prefix, remote_dir)
+            if not uploader.submit(image_data, upload_info["remote_rel_path"]):
+                return None
+            return upload_info
         except Exception:
             return None
     
+    @staticmethod
+    def plan_image_upload(
+        file_size: Optional[int],
+        prefix: str = "image",
+        remote_dir: str = "images"
+    ) -> Dict[str, any]:
+        """
+        生成上传信息（带时间戳的文件名与远程路径），不执行上传
+        
+        Args:
+            file_size: 文件大小（图像尚未编码时为None）
+            prefix: 文件名前缀
+            remote_dir: 远程目录
+            
+        Returns:
+            上传信息字典（格式同 upload_image_bytes）
+        """
+        # 生成带时间戳的文件名
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        filename = f"{prefix}_{ts}.jpg"
+        
+        # 构建远程路径
+        remote_rel = os.path.join(remote_dir, filename).replace("\\", "/")
+        
+        remote_path = os.path.dirname(remote_rel).replace("\\", "/")
+        if not remote_path.startswith("/"):
+            remote_path = f"/{remote_path}" if remote_path else "/"
+        if not remote_path.endswith("/"):
+            remote_path = f"{remote_path}/"
+        remote_file = f"{remote_path.rstrip('/')}/{filename}"
+        
+        return {
+            "filename": filename,
+            "remote_path": remote_path,
+            "remote_rel_path": remote_rel,
+            "remote_file": remote_file,
+            "file_size": int(file_size) if file_size is not None else None,
+        }
+    
+    @staticmethod
+    def _resolve_plan(plan: Optional[Dict[str, any]], file_size: int, prefix: str, remote_dir: str) -> Dict[str, any]:
+        """沿用预先生成的上传信息（补上实际文件大小），没有时新生成"""
+        if plan and plan.get("remote_rel_path"):
+            upload_info = dict(plan)
+            upload_info["file_size"] = int(file_size)
+            return upload_info
+        return SftpHelper.plan_image_upload(file_size, prefix, remote_dir)
+    
     @staticmethod
     def build_full_path(
         remote_rel_path: str,
@@ -11,6 +11,9 @@ from services.camera.sick_camera import SickCamera
 from services.detection.factory import create_detector
 from services.servo.gpio import GPIO
 from services.sftp.sftp_client import SftpClient
+from services.sftp.upload_queue import SftpUploadQueue
+from .metrics import MetricsHttpServer, get_metrics
+from .tracing import get_tracer
 from .monitor import SystemMonitor
 
 # 注意：CppCamera 不在此处导入，因为需要先调用 _prepare_cpp_camera_libs()
@@ -26,6 +29,9 @@ class SystemInitializer:
         self.camera: Optional[SickCamera] = None
         self.detector = None
         self.sftp: Optional[SftpClient] = None
+        self.uploader: Optional[SftpUploadQueue] = None
+        self.metrics_server: Optional[MetricsHttpServer] = None
+        self.recorder = None  # 相机录制器（camera.record.enable=true 时）
         self.monitor: Optional[SystemMonitor] = None
         self.gpio: Optional[GPIO] = None
         
@@ -82,7 +88,8 @@ class SystemInitializer:
         if p == "aarch":
             model["backend"] = "rknn"
             model["use_cpp"] = True
-            camera_cfg["backend"] = "cpp"
+            if camera_cfg.get("backend") != "replay":  # 回放相机不受平台限制
+                camera_cfg["backend"] = "cpp"
             sub = model.get("aarch") or {}
             if isinstance(sub, dict):
                 if sub.get("path"):
@@ -94,7 +101,8 @@ class SystemInitializer:
         elif p == "windows":
             model["backend"] = "pc"
             model["use_cpp"] = False
-            camera_cfg["backend"] = "cpp"
+            if camera_cfg.get("backend") != "replay":  # 回放相机不受平台限制
+                camera_cfg["backend"] = "cpp"
             sub = model.get("windows") or {}
             if isinstance(sub, dict):
                 if sub.get("path"):
@@ -229,6 +237,7 @@ class SystemInitializer:
         self._prepare_cpp_camera_libs()
         self.router.register_default()
         self.router.bind(config=self._cfg, logger=self._logger, initializer=self)
+        self._configure_tracing()
         
         # ========== 第一阶段：启动关键组件（主线程阻塞重试） ==========
         
@@ -261,6 +270,9 @@ class SystemInitializer:
         # 5. 尝试启动SFTP（非关键组件，失败不阻塞）
         self._try_start_sftp()
         
+        # 6. Prometheus指标端点（可选，失败不阻塞）
+        self._try_start_metrics_server()
+        
         # ========== 第三阶段：启动监控器 ==========
         self._setup_monitor()
         
@@ -368,6 +380,11 @@ class SystemInitializer:
         ip = (cam_cfg.get("connection") or {}).get("ip", "192.168.2.99")
         port = int((cam_cfg.get("connection") or {}).get("port", 2122))
         use_single = bool((cam_cfg.get("mode") or {}).get("useSingleStep", True))
+        numpy_parser = bool((cam_cfg.get("mode") or {}).get("numpyParser", True))
+        grabber = bool((cam_cfg.get("mode") or {}).get("grabber", False))
+        pc_cfg = cam_cfg.get("pointcloud") or {}
+        pointcloud_step = int(pc_cfg.get("step", 1))
+        pointcloud_min_conf = float(pc_cfg.get("minConfidence", 0))
         auth_cfg = (cam_cfg.get("auth") or {})
         login_attempts = auth_cfg.get("loginAttempts")
         
@@ -396,6 +413,7 @@ class SystemInitializer:
                     use_single_step=use_single,
                     logger=self._logger,
                     login_attempts=login_attempts,
+                    pointcloud_step=pointcloud_step,
                 )
                 
                 if self._logger:
@@ -413,6 +431,25 @@ class SystemInitializer:
                 if self._logger:
                     self._logger.error(error_msg)
                 raise RuntimeError(error_msg) from e
+        elif backend == "replay":
+            # 回放录制文件（无需设备，用于离线复现与性能测试）
+            import os
+            from services.camera.replay_camera import ReplayCamera
+            replay_cfg = cam_cfg.get("replay") or {}
+            replay_path = str(replay_cfg.get("path", ""))
+            if replay_path and not os.path.isabs(replay_path):
+                replay_path = os.path.join(self._get_project_root(), replay_path)
+            self.camera = ReplayCamera(
+                replay_path,
+                speed=float(replay_cfg.get("speed", 1.0)),
+                loop=bool(replay_cfg.get("loop", True)),
+                numpy_parser=numpy_parser,
+                logger=self._logger,
+                pointcloud_min_confidence=pointcloud_min_conf,
+                pointcloud_step=pointcloud_step,
+            )
+            if self._logger:
+                self._logger.info(f"使用回放相机（配置指定）: {replay_path}")
         elif backend == "sick":
             self.camera = SickCamera(
                 ip=ip,
@@ -420,12 +457,20 @@ class SystemInitializer:
                 use_single_step=use_single,
                 logger=self._logger,
                 login_attempts=login_attempts,
+                numpy_parser=numpy_parser,
+                grabber=grabber,
+                pointcloud_min_confidence=pointcloud_min_conf,
+                pointcloud_step=pointcloud_step,
             )
             if self._logger:
                 self._logger.info("使用 Python 相机后端（配置指定）")
         else:
             raise ValueError(f"无效的相机后端配置: '{backend}'")
         
+        # 录制模式：取到的每一帧写入录制文件（回放相机不录制）
+        if backend != "replay":
+            self._attach_camera_recorder(cam_cfg, backend)
+        
         # 无限重试直到相机连接成功（可被Ctrl+C中断）
         retry_count = 0
         while not self._is_stopping:
@@ -461,6 +506,32 @@ class SystemInitializer:
                 if self._stop_event.wait(timeout=self._retry_delay):
                     break  # 收到停止信号
     
+    def _attach_camera_recorder(self, cam_cfg: dict, backend: str):
+        """camera.record.enable=true 时创建录制器（sick后端录制原始BLOB，cpp后端录制解析后的帧）"""
+        rec_cfg = cam_cfg.get("record") or {}
+        if not bool(rec_cfg.get("enable", False)) or not hasattr(self.camera, "set_recorder"):
+            return
+        try:
+            import os
+            from services.camera.recording import FrameRecorder
+            rec_dir = str(rec_cfg.get("path", "recordings"))
+            if not os.path.isabs(rec_dir):
+                rec_dir = os.path.join(self._get_project_root(), rec_dir)
+            filename = f"{backend}_{time.strftime('%Y%m%d_%H%M%S')}.vcrec"
+            self.recorder = FrameRecorder(
+                os.path.join(rec_dir, filename),
+                max_frames=int(rec_cfg.get("maxFrames", 0)),
+                max_bytes=int(float(rec_cfg.get("maxMB", 0)) * 1024 * 1024),
+                logger=self._logger,
+            )
+            self.camera.set_recorder(self.recorder)
+            if self._logger:
+                self._logger.info(f"相机录制已开启: {self.recorder.path}")
+        except Exception as e:
+            self.recorder = None
+            if self._logger:
+                self._logger.warning(f"相机录制开启失败: {e}")
+    
     def _warmup_camera(self):
         """
         相机预热取图
@@ -541,7 +612,7 @@ class SystemInitializer:
                         # 创建彩色掩码
                         color = np.array([0, 255, 0], dtype=np.uint8)  # 绿色
                         mask_colored = np.zeros_like(vis_image)
-                        mask_colored[det.seg_mask > 0] = color
+                        mask_colored[det.full_mask(*vis_image.shape[:2]) > 0] = color
                         
                         # 半透明叠加
                         vis_image = cv2.addWeighted(vis_image, 1.0, mask_colored, 0.3, 0)
@@ -759,6 +830,76 @@ class SystemInitializer:
                 self.router.bind(sftp=self.sftp)
             except Exception:
                 self.sftp = None
+        
+        self._start_sftp_uploader(sftp_cfg)
+    
+    def _try_start_metrics_server(self):
+        """启动本地 Prometheus 指标端点（metrics.prometheus.enable=true 时）"""
+        prom_cfg = ((self._cfg.get("metrics") or {}).get("prometheus") or {})
+        if not bool(prom_cfg.get("enable", False)):
+            return
+        server = MetricsHttpServer(
+            get_metrics(),
+            host=str(prom_cfg.get("host", "127.0.0.1")),
+            port=int(prom_cfg.get("port", 9108)),
+            logger=self._logger,
+        )
+        if server.start():
+            self.metrics_server = server
+    
+    def _configure_tracing(self):
+        """按 tracing 配置设置链路追踪开关与缓冲区大小"""
+        trace_cfg = self._cfg.get("tracing") or {}
+        try:
+            get_tracer().configure(
+                enable=bool(trace_cfg.get("enable", True)),
+                capacity=int(trace_cfg.get("buffer_size", 8192)),
+            )
+        except Exception as e:
+            if self._logger:
+                self._logger.warning(f"链路追踪配置无效: {e}")
+    
+    def _start_sftp_uploader(self, sftp_cfg: dict):
+        """创建SFTP异步上传队列（sftp.upload.async=false 时保持同步上传）"""
+        upload_cfg = (sftp_cfg.get("upload") or {})
+        if not self.sftp or not bool(upload_cfg.get("async", True)):
+            return
+        try:
+            import os
+            from services.sftp.spool import DiskSpool
+            overflow = str(upload_cfg.get("overflow", "spill"))
+            spool = None
+            if overflow == "spill":
+                spool_dir = str(upload_cfg.get("spool_dir", "spool/sftp"))
+                if not os.path.isabs(spool_dir):
+                    spool_dir = os.path.join(self._get_project_root(), spool_dir)
+                spool = DiskSpool(
+                    os.path.normpath(spool_dir),
+                    max_bytes=int(float(upload_cfg.get("spool_max_mb", 512)) * 1024 * 1024),
+                    max_age_s=float(upload_cfg.get("spool_max_age_hours", 168)) * 3600,
+                    segment_bytes=int(float(upload_cfg.get("spool_segment_mb", 16)) * 1024 * 1024),
+                    logger=self._logger,
+                )
+                if spool.pending() and self._logger:
+                    self._logger.info(f"SFTP暂存中有 {spool.pending()} 条待补传记录")
+            self.uploader = SftpUploadQueue(
+                self.sftp,
+                queue_size=int(upload_cfg.get("queue_size", 32)),
+                batch_size=int(upload_cfg.get("batch_size", 8)),
+                overflow=overflow,
+                spool=spool,
+                retry_interval=float(upload_cfg.get("retry_interval", 10)),
+                logger=self._logger,
+            )
+            self.uploader.start()
+            self.router.bind(uploader=self.uploader)
+            get_metrics().register_gauge("sftp_uploader", self.uploader.stats)
+            if self._logger:
+                self._logger.info(f"SFTP异步上传已启用 | 队列={upload_cfg.get('queue_size', 32)} | 溢出={upload_cfg.get('overflow', 'spill')}")
+        except Exception as e:
+            self.uploader = None
+            if self._logger:
+                self._logger.warning(f"SFTP异步上传队列创建失败: {e} | 使用同步上传")
 
     def request_stop(self):
         """
@@ -779,7 +920,7 @@ class SystemInitializer:
         2. 停止通信服务（TCP、MQTT）
         3. 释放检测器资源
         4. 断开相机连接
-        5. 断开SFTP连接
+        5. 停止SFTP上传队列并断开SFTP连接
         6. 强制垃圾回收
         """
         self._is_stopping = True
@@ -841,7 +982,21 @@ class SystemInitializer:
                     if self._logger:
                         self._logger.error(f"释放相机资源失败: {e}")
             
-            # 5. 断开SFTP
+            if self.recorder:
+                self.recorder.close()
+                self.recorder = None
+            
+            # 5. 停止指标端点、SFTP上传队列并断开SFTP
+            if self.metrics_server:
+                self.metrics_server.stop()
+                self.metrics_server = None
+            if self.uploader:
+                try:
+                    self.uploader.stop()
+                    self.uploader = None
+                except Exception as e:
+                    if self._logger:
+                        self._logger.error(f"停止SFTP上传队列失败: {e}")
             if self.sftp:
                 try:
                     if self._logger:
@@ -1097,6 +1252,8 @@ class SystemInitializer:
             
             # 重新绑定到路由
             self.router.bind(sftp=self.sftp)
+            if self.uploader:
+                self.uploader.set_client(self.sftp)
             
             # 连接成功，记录一次日志
             if self._logger:
@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+耗时指标注册表
+- 每个阶段一个直方图（对数分桶，相对误差约4%），记录开销为一次二分查找
+- 可查询 count / mean / min / max / p50 / p95 / p99
+- 可输出 Prometheus 文本格式（summary），并可在本地端口提供 /metrics
+"""
+
+import bisect
+import math
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+
+# 分桶上界（毫秒）：0.01ms ~ 约100s，每个2倍区间分16档
+_BUCKET_BOUNDS: List[float] = [0.01 * 2 ** (i / 16.0) for i in range(16 * 24)]
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """线程安全的耗时直方图（毫秒）"""
+
+    __slots__ = ("_lock", "_counts", "_count", "_sum", "_min", "_max")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._min = math.inf
+        self._max = 0.0
+
+    def record(self, value_ms: float):
+        try:
+            v = float(value_ms)
+        except Exception:
+            return
+        if not math.isfinite(v) or v < 0:
+            return
+        idx = bisect.bisect_left(_BUCKET_BOUNDS, v)
+        with self._lock:
+            self._counts[idx] += 1
+            self._count += 1
+            self._sum += v
+            if v < self._min:
+                self._min = v
+            if v > self._max:
+                self._max = v
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            count, total, vmin, vmax = self._count, self._sum, self._min, self._max
+        if count == 0:
+            return {"count": 0}
+        result = {
+            "count": count,
+            "mean": round(total / count, 3),
+            "min": round(vmin, 3),
+            "max": round(vmax, 3),
+            "sum": round(total, 3),
+        }
+        for q in QUANTILES:
+            result[f"p{int(q * 100)}"] = round(self._quantile(counts, count, q, vmin, vmax), 3)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+            self._count = 0
+            self._sum = 0.0
+            self._min = math.inf
+            self._max = 0.0
+
+    @staticmethod
+    def _quantile(counts: List[int], count: int, q: float, vmin: float, vmax: float) -> float:
+        """取分位数所在桶的上界（限制在实际最小/最大值之间）"""
+        rank = max(1, int(math.ceil(q * count)))
+        seen = 0
+        for idx, c in enumerate(counts):
+            seen += c
+            if seen >= rank:
+                upper = _BUCKET_BOUNDS[idx] if idx < len(_BUCKET_BOUNDS) else vmax
+                return min(max(upper, vmin), vmax)
+        return vmax
+
+
+class MetricsRegistry:
+    """
+    指标注册表
+
+    使用方式：
+        metrics = get_metrics()
+        metrics.record("catch.detection", 12.3)
+        metrics.record_many("catch", time_points)   # {阶段: 毫秒}
+        metrics.snapshot()                            # {"histograms": {...}, "gauges": {...}}
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._gauges: Dict[str, Callable[[], Any]] = {}
+
+    def histogram(self, name: str) -> Histogram:
+        hist = self._histograms.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(name, Histogram())
+        return hist
+
+    def record(self, name: str, value_ms: float):
+        self.histogram(name).record(value_ms)
+
+    def record_many(self, prefix: str, values: Dict[str, float]):
+        """批量记录 {阶段: 毫秒}，指标名为 "<prefix>.<阶段>" """
+        for key, value in (values or {}).items():
+            self.histogram(f"{prefix}.{key}" if prefix else str(key)).record(value)
+
+    def register_gauge(self, name: str, provider: Callable[[], Any]):
+        """注册状态提供者（查询时调用，返回字典或数值，如流水线/上传队列统计）"""
+        with self._lock:
+            self._gauges[name] = provider
+
+    def unregister_gauge(self, name: str):
+        with self._lock:
+            self._gauges.pop(name, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            histograms = dict(self._histograms)
+            gauges = dict(self._gauges)
+        result = {"histograms": {name: h.snapshot() for name, h in sorted(histograms.items())}, "gauges": {}}
+        for name, provider in sorted(gauges.items()):
+            try:
+                value = provider()
+            except Exception:
+                continue
+            if value:
+                result["gauges"][name] = value
+        return result
+
+    def reset(self):
+        with self._lock:
+            histograms = list(self._histograms.values())
+        for h in histograms:
+            h.reset()
+
+    def to_prometheus(self, namespace: str = "visioncore") -> str:
+        """Prometheus 文本格式：直方图输出为 summary（秒），状态中的数值输出为 gauge"""
+        snap = self.snapshot()
+        lines = []
+        for name, stats in snap["histograms"].items():
+            if not stats.get("count"):
+                continue
+            metric = _prom_name(f"{namespace}_{name}_seconds")
+            lines.append(f"# TYPE {metric} summary")
+            for q in QUANTILES:
+                lines.append(f'{metric}{{quantile="{q}"}} {stats[f"p{int(q * 100)}"] / 1000.0:.6f}')
+            lines.append(f"{metric}_sum {stats['sum'] / 1000.0:.6f}")
+            lines.append(f"{metric}_count {stats['count']}")
+        for name, value in snap["gauges"].items():
+            for key, number in _flatten_numbers(name, value):
+                metric = _prom_name(f"{namespace}_{key}")
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {number}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsHttpServer:
+    """本地 HTTP 端点：GET /metrics 返回 Prometheus 文本格式"""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9108, logger: Optional[Any] = None):
+        self._registry = registry
+        self._host = host
+        self._port = int(port)
+        self._logger = logger
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1] if self._server is not None else self._port
+
+    def start(self) -> bool:
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self._registry
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((self._host, self._port), _Handler)
+            self._server.daemon_threads = True
+        except Exception as e:
+            if self._logger:
+                self._logger.warning(f"指标端口启动失败: {self._host}:{self._port} | {e}")
+            self._server = None
+            return False
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsHttp", daemon=True)
+        self._thread.start()
+        if self._logger:
+            self._logger.info(f"Prometheus指标端点: http://{self._host}:{self.port}/metrics")
+        return True
+
+    def stop(self):
+        server = self._server
+        self._server = None
+        if server is not None:
+            try:
+                server.shutdown()
+                server.server_close()
+            except Exception:
+                pass
+
+
+def _prom_name(name: str) -> str:
+    return "".join(c if c.isalnum() or c == "_" else "_" for c in name)
+
+
+def _flatten_numbers(prefix: str, value: Any):
+    if isinstance(value, bool):
+        yield prefix, int(value)
+    elif isinstance(value, (int, float)):
+        if math.isfinite(value):
+            yield prefix, value
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            yield from _flatten_numbers(f"{prefix}_{k}", v)
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """全局指标注册表"""
+    return _registry
@@ -0,0 +1,315 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+多级流水线（取图 → 推理 → 后处理/发布）
+- 每一级运行在独立线程中，级间用有界队列连接
+- 队列满时丢弃最旧的数据（只处理最新帧，不积压）
+- 统计每一级耗时与队列深度，用于定位限制帧率的瓶颈
+- BackgroundWorker：单线程后台任务执行器，把非关键耗时操作（渲染/编码/上传）移出响应路径
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class DropOldestQueue:
+    """有界队列：满时丢弃最旧元素，put 永不阻塞"""
+
+    def __init__(self, maxsize: int = 2, on_drop: Optional[Callable[[Any], None]] = None):
+        self._maxsize = max(1, int(maxsize))
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._dropped = 0
+        self._closed = False
+        self._on_drop = on_drop  # 被丢弃元素的回调（在锁外调用，可用于落盘等）
+
+    def put(self, item: Any) -> bool:
+        """
+        放入元素
+
+        Returns:
+            True表示有旧元素被丢弃
+        """
+        dropped = False
+        old = None
+        with self._cond:
+            if len(self._items) >= self._maxsize:
+                old = self._items.popleft()
+                self._dropped += 1
+                dropped = True
+            self._items.append(item)
+            self._cond.notify()
+        if dropped and self._on_drop is not None:
+            try:
+                self._on_drop(old)
+            except Exception:
+                pass
+        return dropped
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """取出最早的元素；超时或队列已关闭返回None"""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout=timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def get_batch(self, max_items: int, timeout: Optional[float] = None) -> List[Any]:
+        """取出最多max_items个元素（至少等待一个）；超时或队列已关闭返回空列表"""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout=timeout)
+            batch = []
+            while self._items and len(batch) < max(1, int(max_items)):
+                batch.append(self._items.popleft())
+            return batch
+
+    def drain(self) -> List[Any]:
+        """取出全部剩余元素（不等待）"""
+        with self._cond:
+            items = list(self._items)
+            self._items.clear()
+            return items
+
+    def close(self):
+        """关闭队列并唤醒所有等待者"""
+        with self._cond:
+            self._closed = True
+            self._items.clear()
+            self._cond.notify_all()
+
+    def qsize(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @property
+    def dropped(self) -> int:
+        with self._cond:
+            return self._dropped
+
+
+class StageStats:
+    """单级耗时统计（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._count = 0
+        self._total_ms = 0.0
+        self._last_ms = 0.0
+        self._max_ms = 0.0
+        self._errors = 0
+        self._first_ts = None
+        self._last_ts = None
+
+    def record(self, elapsed_ms: float):
+        now = time.perf_counter()
+        with self._lock:
+            self._count += 1
+            self._total_ms += elapsed_ms
+            self._last_ms = elapsed_ms
+            self._max_ms = max(self._max_ms, elapsed_ms)
+            if self._first_ts is None:
+                self._first_ts = now
+            self._last_ts = now
+
+    def record_error(self):
+        with self._lock:
+            self._errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            avg = self._total_ms / self._count if self._count else 0.0
+            fps = 0.0
+            if self._count > 1 and self._last_ts > self._first_ts:
+                fps = (self._count - 1) / (self._last_ts - self._first_ts)
+            return {
+                "count": self._count,
+                "avg_ms": round(avg, 2),
+                "last_ms": round(self._last_ms, 2),
+                "max_ms": round(self._max_ms, 2),
+                "fps": round(fps, 2),
+                "errors": self._errors,
+            }
+
+
+class StagePipeline:
+    """
+    线性多级流水线
+
+    stages 为 [(名称, 函数), ...]：
+    - 第一级为数据源：func() -> item，返回None表示本次无数据
+    - 中间级：func(item) -> item，返回None表示丢弃该数据
+    - 最后一级：func(item)，返回值忽略
+    """
+
+    def __init__(self, stages: List[Tuple[str, Callable]], queue_size: int = 2,
+                 stop_event: Optional[threading.Event] = None, logger=None,
+                 idle_sleep: float = 0.01, get_timeout: float = 0.2):
+        if len(stages) < 2:
+            raise ValueError("流水线至少需要两级")
+        self._stages = list(stages)
+        self._queues = [DropOldestQueue(queue_size) for _ in range(len(stages) - 1)]
+        self._stats = {name: StageStats() for name, _ in stages}
+        self._stop_event = stop_event or threading.Event()
+        self._logger = logger
+        self._idle_sleep = float(idle_sleep)
+        self._get_timeout = float(get_timeout)
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        for idx, (name, func) in enumerate(self._stages):
+            t = threading.Thread(target=self._stage_loop, args=(idx, name, func),
+                                 name=f"Pipeline-{name}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        if self._logger:
+            self._logger.info(f"流水线已启动 | 级数={len(self._stages)} | 队列容量={self._queues[0].maxsize}")
+
+    def stop(self, timeout: float = 2.0):
+        self._stop_event.set()
+        for q in self._queues:
+            q.close()
+        deadline = time.perf_counter() + max(0.0, timeout)
+        for t in self._threads:
+            t.join(timeout=max(0.0, deadline - time.perf_counter()))
+            if t.is_alive() and self._logger:
+                self._logger.warning(f"流水线线程未能及时退出: {t.name}")
+        self._threads = []
+
+    def is_alive(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def stats(self) -> Dict[str, Any]:
+        """各级耗时、队列深度与瓶颈级（平均耗时最大者）"""
+        stages = {name: self._stats[name].snapshot() for name, _ in self._stages}
+        queues = {}
+        for idx, q in enumerate(self._queues):
+            key = f"{self._stages[idx][0]}->{self._stages[idx + 1][0]}"
+            queues[key] = {"depth": q.qsize(), "maxsize": q.maxsize, "dropped": q.dropped}
+        bottleneck = None
+        if any(s["count"] for s in stages.values()):
+            bottleneck = max(stages, key=lambda n: stages[n]["avg_ms"])
+        return {"stages": stages, "queues": queues, "bottleneck": bottleneck}
+
+    def format_stats(self) -> str:
+        st = self.stats()
+        parts = [f"{n}={s['avg_ms']:.1f}ms/{s['fps']:.1f}fps" for n, s in st["stages"].items()]
+        parts += [f"Q[{n}]={q['depth']}/{q['maxsize']} 丢弃{q['dropped']}" for n, q in st["queues"].items()]
+        parts.append(f"瓶颈={st['bottleneck']}")
+        return " | ".join(parts)
+
+    # internal
+    def _stage_loop(self, idx: int, name: str, func: Callable):
+        in_q = self._queues[idx - 1] if idx > 0 else None
+        out_q = self._queues[idx] if idx < len(self._queues) else None
+        stats = self._stats[name]
+        while not self._stop_event.is_set():
+            item = None
+            if in_q is not None:
+                item = in_q.get(timeout=self._get_timeout)
+                if item is None:
+                    continue
+            t0 = time.perf_counter()
+            try:
+                out = func() if in_q is None else func(item)
+            except Exception as e:
+                stats.record_error()
+                if self._logger:
+                    self._logger.error(f"流水线[{name}]异常: {e}")
+                self._stop_event.wait(self._idle_sleep)
+                continue
+            stats.record((time.perf_counter() - t0) * 1000)
+            if out_q is not None:
+                if out is None:
+                    # 数据源无数据时稍作等待，避免空转
+                    if in_q is None:
+                        self._stop_event.wait(self._idle_sleep)
+                    continue
+                out_q.put(out)
+
+
+class BackgroundWorker:
+    """
+    单线程后台任务执行器
+
+    - submit(func, *args, **kwargs) 立即返回，任务在后台线程中按提交顺序执行
+    - 队列有界，积压时丢弃最旧的任务（只保证最新结果，不拖慢提交方）
+    - 首次提交时自动启动线程
+    """
+
+    def __init__(self, name: str = "worker", queue_size: int = 2, logger=None, get_timeout: float = 0.5):
+        self._name = name
+        self._queue = DropOldestQueue(queue_size)
+        self._logger = logger
+        self._get_timeout = float(get_timeout)
+        self._stats = StageStats()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, func: Callable, *args, **kwargs) -> bool:
+        """
+        提交任务
+
+        Returns:
+            True表示队列已满、最旧的任务被丢弃
+        """
+        self.start()
+        dropped = self._queue.put((func, args, kwargs))
+        if dropped and self._logger:
+            self._logger.warning(f"后台任务[{self._name}]积压，已丢弃最旧任务")
+        return dropped
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self._stop_event.is_set():
+                self._stop_event.clear()
+                self._queue = DropOldestQueue(self._queue.maxsize)
+            self._thread = threading.Thread(target=self._loop, name=f"Worker-{self._name}", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """停止线程（未执行的任务被丢弃）"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        self._stop_event.set()
+        self._queue.close()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+
+    def is_alive(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._stats.snapshot()
+        snapshot.update({"pending": self._queue.qsize(), "dropped": self._queue.dropped})
+        return snapshot
+
+    # internal
+    def _loop(self):
+        while not self._stop_event.is_set():
+            task = self._queue.get(timeout=self._get_timeout)
+            if task is None:
+                continue
+            func, args, kwargs = task
+            t0 = time.perf_counter()
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                self._stats.record_error()
+                if self._logger:
+                    self._logger.error(f"后台任务[{self._name}]异常: {e}")
+                continue
+            self._stats.record((time.perf_counter() - t0) * 1000)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+请求链路追踪
+- 每个请求一个 trace_id（TCP/MQTT 收到命令时分配），处理过程中的各阶段记为 span
+- 当前 span 保存在 contextvars 中，嵌套 span 自动挂到父 span 下；跨线程时用 capture/attach 传递
+- 结束的 span 写入内存环形缓冲区（满时覆盖最旧记录），记录开销为几次计时与一次 deque 追加
+- 可导出为 Chrome trace-event JSON（chrome://tracing 或 Perfetto 打开）
+"""
+
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# 当前 (trace_id, span_id)
+_current: contextvars.ContextVar = contextvars.ContextVar("vc_trace_span", default=None)
+
+# span记录：(trace_id, span_id, parent_id, name, start_ns, dur_ns, tid, args)
+SpanRecord = Tuple[str, int, int, str, int, int, int, Optional[Dict[str, Any]]]
+
+
+class _NullSpan:
+    """追踪关闭时返回的空 span"""
+
+    __slots__ = ()
+    trace_id = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """一个计时区间（用作上下文管理器）"""
+
+    __slots__ = ("_tracer", "name", "trace_id", "span_id", "parent_id", "args", "_start_ns", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_id: int, args: Optional[Dict[str, Any]]):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = next(tracer._span_ids)
+        self.parent_id = parent_id
+        self.args = args
+        self._start_ns = 0
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current.set((self.trace_id, self.span_id))
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        dur_ns = time.perf_counter_ns() - self._start_ns
+        try:
+            _current.reset(self._token)
+        except ValueError:
+            # 在其他上下文中结束（不应发生），仅恢复为无 span
+            _current.set(None)
+        if exc_type is not None:
+            self.set(error=exc_type.__name__)
+        self._tracer._finish((
+            self.trace_id, self.span_id, self.parent_id, self.name,
+            self._start_ns, dur_ns, threading.get_ident(), self.args,
+        ))
+        return False
+
+    def set(self, **args):
+        """附加参数（导出到 Chrome trace 的 args 中）"""
+        if self.args is None:
+            self.args = {}
+        self.args.update(args)
+
+
+class Tracer:
+    """
+    链路追踪器
+
+    使用方式：
+        tracer = get_tracer()
+        with tracer.trace("tcp.catch", client="robot"):   # 新建 trace
+            with tracer.span("catch.camera"):            # 挂到当前 span 下
+                ...
+
+        # 跨线程：提交任务时 capture，后台线程中 attach
+        parent = tracer.capture()
+        with tracer.attach(parent), tracer.span("catch.render"):
+            ...
+
+        tracer.to_chrome(min_duration_ms=50)             # 导出慢请求
+    """
+
+    def __init__(self, enabled: bool = True, capacity: int = 8192):
+        self._enabled = bool(enabled)
+        self._records: deque = deque(maxlen=max(1, int(capacity)))
+        self._span_ids = itertools.count(1)
+        self._thread_names: Dict[int, str] = {}
+        self._epoch_ns = time.perf_counter_ns()
+        self._epoch_wall = time.time()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def configure(self, enable: Optional[bool] = None, capacity: Optional[int] = None):
+        """更新开关与缓冲区容量（调整容量时保留最新的记录）"""
+        if enable is not None:
+            self._enabled = bool(enable)
+        if capacity is not None and int(capacity) != self._records.maxlen:
+            self._records = deque(self._records, maxlen=max(1, int(capacity)))
+
+    # ---- 记录 ----
+    def trace(self, name: str, **args):
+        """新建 trace（根 span），与当前上下文无关"""
+        if not self._enabled:
+            return _NULL_SPAN
+        return Span(self, name, os.urandom(8).hex(), 0, args or None)
+
+    def span(self, name: str, **args):
+        """在当前 trace 下新建 span；没有当前 trace 时新建一个"""
+        if not self._enabled:
+            return _NULL_SPAN
+        cur = _current.get()
+        if cur is None:
+            return Span(self, name, os.urandom(8).hex(), 0, args or None)
+        return Span(self, name, cur[0], cur[1], args or None)
+
+    def complete(self, name: str, elapsed_ms: float, **args):
+        """记录一个刚结束的阶段（已有耗时统计的代码段，无需改为 with 结构）"""
+        if not self._enabled:
+            return
+        cur = _current.get()
+        end_ns = time.perf_counter_ns()
+        dur_ns = max(0, int(float(elapsed_ms) * 1e6))
+        trace_id, parent_id = cur if cur is not None else (os.urandom(8).hex(), 0)
+        self._finish((trace_id, next(self._span_ids), parent_id, name,
+                      end_ns - dur_ns, dur_ns, threading.get_ident(), args or None))
+
+    def current_trace_id(self) -> Optional[str]:
+        cur = _current.get()
+        return cur[0] if cur is not None else None
+
+    def capture(self) -> Optional[Tuple[str, int]]:
+        """当前 (trace_id, span_id)，用于传递给后台线程"""
+        return _current.get() if self._enabled else None
+
+    def attach(self, parent: Optional[Tuple[str, int]]):
+        """在当前线程中恢复 capture 得到的父 span（之后的 span 挂到其下）"""
+        return _Attach(parent)
+
+    def _finish(self, record: SpanRecord):
+        tid = record[6]
+        if tid not in self._thread_names:
+            self._thread_names[tid] = threading.current_thread().name
+        self._records.append(record)
+
+    # ---- 查询与导出 ----
+    def records(self, trace_id: Optional[str] = None, min_duration_ms: float = 0.0,
+                last: Optional[int] = None) -> List[SpanRecord]:
+        """
+        筛选span记录
+
+        Args:
+            trace_id: 只返回该 trace
+            min_duration_ms: 只返回根 span 耗时不小于该值的 trace
+            last: 只返回最近的 N 个 trace
+        """
+        records = list(self._records)
+        if trace_id:
+            return [r for r in records if r[0] == trace_id]
+        if min_duration_ms > 0 or last:
+            threshold_ns = int(float(min_duration_ms) * 1e6)
+            keep: Dict[str, int] = {}
+            for r in records:
+                if r[2] == 0 and r[5] >= threshold_ns:
+                    keep[r[0]] = r[4]
+            if last:
+                keep = dict(sorted(keep.items(), key=lambda kv: kv[1])[-int(last):])
+            records = [r for r in records if r[0] in keep]
+        return records
+
+    def to_chrome(self, trace_id: Optional[str] = None, min_duration_ms: float = 0.0,
+                  last: Optional[int] = None) -> Dict[str, Any]:
+        """导出为 Chrome trace-event 格式（时间单位微秒，按线程分行）"""
+        pid = os.getpid()
+        events = []
+        tids = set()
+        for tr_id, span_id, parent_id, name, start_ns, dur_ns, tid, args in self.records(trace_id, min_duration_ms, last):
+            tids.add(tid)
+            event_args = {"trace_id": tr_id, "span_id": span_id}
+            if parent_id:
+                event_args["parent_id"] = parent_id
+            if args:
+                event_args.update(args)
+            events.append({
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "X",
+                "ts": (start_ns - self._epoch_ns) / 1000.0,
+                "dur": dur_ns / 1000.0,
+                "pid": pid,
+                "tid": tid,
+                "args": event_args,
+            })
+        for tid in sorted(tids):
+            events.append({
+                "name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                "args": {"name": self._thread_names.get(tid, str(tid))},
+            })
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"epoch_unix_s": round(self._epoch_wall, 6)},
+        }
+
+    def dump(self, path: str, **filters) -> int:
+        """写入 Chrome trace JSON 文件，返回事件数（不含线程名元数据）"""
+        doc = self.to_chrome(**filters)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(doc, f, ensure_ascii=False)
+        return sum(1 for e in doc["traceEvents"] if e["ph"] == "X")
+
+    def stats(self) -> Dict[str, Any]:
+        records = list(self._records)
+        return {
+            "enabled": self._enabled,
+            "spans": len(records),
+            "traces": len({r[0] for r in records}),
+            "capacity": self._records.maxlen,
+        }
+
+    def clear(self):
+        self._records.clear()
+
+
+class _Attach:
+    __slots__ = ("_parent", "_token")
+
+    def __init__(self, parent: Optional[Tuple[str, int]]):
+        self._parent = parent
+        self._token = None
+
+    def __enter__(self):
+        if self._parent is not None:
+            self._token = _current.set(self._parent)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._token is not None:
+            _current.reset(self._token)
+        return False
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """全局链路追踪器"""
+    return _tracer
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+性能基准工具测试（无需硬件）
+以极少的迭代次数跑通 tools/benchmark.py 的端到端与微基准，验证结果结构与检测结果回放
+"""
+
+import json
+import os
+import sys
+
+import yaml
+
+# 添加项目根目录与 tools 目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "tools"))
+
+import benchmark  # noqa: E402
+
+
+def _config():
+    with open(os.path.join(project_root, "configs", "config.yaml"), "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def test_stub_detector_roundtrip(tmp_path):
+    """检测结果保存后回放：框、类别与mask面积保持一致，按帧循环返回"""
+    stub = benchmark.StubDetector.synthetic(320, 240, frames=2, per_frame=3, seed=1)
+    frames = [stub.detect(None), stub.detect(None)]
+    path = str(tmp_path / "dets.json")
+    benchmark.StubDetector.save(path, frames)
+
+    loaded = benchmark.StubDetector.from_file(path)
+    for expected in frames + frames[:1]:
+        got = loaded.detect(None)
+        assert [(d.class_id, d.xmin, d.ymin, d.xmax, d.ymax) for d in got] == \
+               [(d.class_id, d.xmin, d.ymin, d.xmax, d.ymax) for d in expected]
+        for a, b in zip(got, expected):
+            assert abs(a.mask_area - b.mask_area) <= 0.1 * b.mask_area
+
+    # 每次 detect 返回新对象：轮廓缓存不跨帧复用
+    stub = benchmark.StubDetector.synthetic(320, 240, frames=1, per_frame=2)
+    first = stub.detect(None)
+    _ = [d.contour for d in first]
+    second = stub.detect(None)
+    assert all(a is not b for a, b in zip(first, second))
+    assert all("contour" not in d._mask_cache for d in second)
+
+
+def test_run_benchmarks_smoke(tmp_path):
+    """合成录制 + 合成检测结果跑通全部基准，结果可写为JSON并对比"""
+    recording = benchmark.synthetic_recording(str(tmp_path / "bench.vcrec"), 4, 320, 240)
+    detector = benchmark.StubDetector.synthetic(320, 240, frames=4, per_frame=6)
+    results = benchmark.run_benchmarks(
+        _config(), recording, detector, iterations=3, loop_frames=3, micro_iterations=3,
+    )
+
+    assert results["inputs"]["frames"] == 4 and results["inputs"]["frame_shape"] == [240, 320]
+    for mode in ("inline", "deferred"):
+        catch = results["catch"][mode]
+        assert catch["count"] == 3 and catch["failures"] == 0
+        assert catch["stages"]["total"]["count"] == 3
+    for mode in ("sequential", "pipeline"):
+        assert results["loop"][mode]["frames"] >= 3
+    assert results["micro"]["parser"]["read_numpy"]["count"] == 3
+    assert results["micro"]["postprocess_boxes"]["candidates"] > 0
+    assert results["micro"]["target_selector"]["detections"] == 6
+
+    path = tmp_path / "bench.json"
+    path.write_text(json.dumps(results), encoding="utf-8")
+    lines = benchmark.compare(results, json.loads(path.read_text(encoding="utf-8")))
+    assert any(line.startswith("catch.inline.p50") and "+0.0%" in line for line in lines)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+标定变换缓存测试（无需硬件）
+验证批量变换、文件变化重新加载与显式失效
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from services.shared import calibration_utils  # noqa: E402
+from services.shared.calibration_utils import (  # noqa: E402
+    invalidate_calibration_cache,
+    world_to_robot_batch,
+    world_to_robot_using_calib,
+)
+
+
+def _write_calib(root, data):
+    os.makedirs(os.path.join(root, "configs"), exist_ok=True)
+    with open(os.path.join(root, "configs", "transformation_matrix.json"), "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def test_batch_matches_single_point(tmp_path):
+    """批量变换与逐点变换结果一致，Z轴下限生效"""
+    root = str(tmp_path)
+    _write_calib(root, {"matrix_xy": [[0.9, 0.1, 5.0], [-0.1, 1.1, -3.0]], "z_mapping": {"alpha": -1.0, "beta": 100.0}})
+    invalidate_calibration_cache(root)
+
+    points = np.array([[10.0, 20.0, 30.0], [-5.0, 7.5, 400.0]])
+    batch = world_to_robot_batch(points, root)
+    for i, p in enumerate(points):
+        assert world_to_robot_using_calib(p, root) == batch[i].tolist()
+    assert batch[1, 2] == -85.0
+
+
+def test_cache_reloads_on_invalidate_and_file_change(tmp_path):
+    """显式失效或文件变化后重新加载；文件不存在返回None"""
+    root = str(tmp_path)
+    assert world_to_robot_using_calib([0, 0, 0], root) is None
+
+    _write_calib(root, {"matrix": [[1, 0, 0, 7], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]})
+    invalidate_calibration_cache(root)
+    assert world_to_robot_using_calib([0, 0, 0], root) == [7.0, 0.0, 0.0]
+
+    # 间隔内不检查文件；超过检查间隔后按 mtime/大小 发现变化
+    _write_calib(root, {"matrix": [[1, 0, 0, 12.5], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]})
+    assert world_to_robot_using_calib([0, 0, 0], root) == [7.0, 0.0, 0.0]
+    calibration_utils._cache[calibration_utils._calib_path(root)]["checked_at"] -= 10.0
+    assert world_to_robot_using_calib([0, 0, 0], root) == [12.5, 0.0, 0.0]
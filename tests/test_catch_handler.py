@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+catch 命令处理测试（无需硬件）
+回放相机 + 回放检测结果驱动 handle_catch，验证同步/后台可视化两种模式下的响应字段
+"""
+
+import copy
+import logging
+import os
+import sys
+import threading
+
+import yaml
+
+# 添加项目根目录与 tools 目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "tools"))
+
+import benchmark  # noqa: E402
+from domain.enums.commands import MessageType, VisionCoreCommands  # noqa: E402
+from domain.models.mqtt import MQTTResponse  # noqa: E402
+from handlers import detection as h_detection  # noqa: E402
+from services.camera.replay_camera import ReplayCamera  # noqa: E402
+
+
+class _FakeUploader:
+    """记录提交的上传路径（代替 SftpUploadQueue）"""
+
+    def __init__(self):
+        self.submitted = []
+        self.done = threading.Event()
+
+    def submit(self, data, remote_rel_path):
+        self.submitted.append((remote_rel_path, len(data)))
+        self.done.set()
+        return True
+
+
+def _catch(tmp_path, deferred, sftp=None, uploader=None):
+    with open(os.path.join(project_root, "configs", "config.yaml"), "r", encoding="utf-8") as f:
+        config = copy.deepcopy(yaml.safe_load(f))
+    config.setdefault("visualization", {})["deferred"] = deferred
+    recording = benchmark.synthetic_recording(str(tmp_path / "catch.vcrec"), 2, 320, 240)
+    camera = ReplayCamera(recording, speed=0)
+    assert camera.connect()
+    logger = logging.getLogger("test_catch")
+    ctx = benchmark.make_context(config, camera, benchmark.StubDetector.synthetic(320, 240, per_frame=6), logger)
+    ctx.sftp, ctx.uploader = sftp, uploader
+    req = MQTTResponse(command=VisionCoreCommands.CATCH.value, component="test",
+                       messageType=MessageType.INFO, message="", data={})
+    result = h_detection.handle_catch(req, ctx)
+    assert result.messageType == MessageType.SUCCESS
+    return result.data
+
+
+def test_deferred_catch_does_not_claim_image_shape(tmp_path):
+    """后台渲染时图像尚未生成，响应不给出 image_shape（由 image_ready 返回实际尺寸）"""
+    data = _catch(tmp_path, deferred=True)
+    assert data["image_pending"] is True
+    assert data["image_shape"] is None
+
+
+def test_inline_catch_reports_rendered_shape(tmp_path):
+    """同步渲染时 image_shape 为实际渲染图像的尺寸"""
+    data = _catch(tmp_path, deferred=False)
+    assert data["image_pending"] is False
+    assert data["image_shape"][:2] == [240, 320]
+
+
+def test_deferred_catch_reports_planned_upload_path(tmp_path):
+    """后台渲染时响应即给出上传路径（file_size 待定），后台上传到同一路径"""
+    uploader = _FakeUploader()
+    data = _catch(tmp_path, deferred=True, sftp=object(), uploader=uploader)
+    assert data["image_pending"] is True
+    assert data["filename"] and data["remote_rel_path"] and data["remote_full_path"]
+    assert data["file_size"] is None
+    assert uploader.done.wait(timeout=10)
+    rel, size = uploader.submitted[0]
+    assert rel == data["remote_rel_path"]
+    assert size > 0
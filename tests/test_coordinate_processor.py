@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+坐标计算测试（无需硬件）
+验证批量3D反投影与逐点计算结果一致
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from services.detection.base import DetectionBox  # noqa: E402
+from services.detection.coordinate_processor import CoordinateProcessor  # noqa: E402
+
+
+def _camera_params(width=160, height=120):
+    return SimpleNamespace(
+        width=width, height=height, cx=width / 2.0, cy=height / 2.0, fx=150.0, fy=152.0,
+        k1=0.05, k2=0.01, f2rc=3.0,
+        cam2worldMatrix=[0, 1, 0, 10, 1, 0, 0, -5, 0, 0, -1, 900, 0, 0, 0, 1],
+    )
+
+
+def test_world_points_match_single_detection():
+    """批量计算与逐个 calculate_coordinate_for_detection 的世界坐标一致"""
+    rng = np.random.default_rng(0)
+    params = _camera_params()
+    depth = rng.uniform(300, 800, 160 * 120).astype(np.float32)
+    depth[rng.random(depth.size) < 0.4] = 0
+
+    boxes = []
+    for _ in range(40):
+        x, y = int(rng.integers(-5, 160)), int(rng.integers(-5, 120))
+        boxes.append(DetectionBox(0, 0.9, x, y, x + int(rng.integers(1, 30)), y + int(rng.integers(1, 30))))
+    centers = [[0.5 * (b.xmin + b.xmax), 0.5 * (b.ymin + b.ymax)] for b in boxes]
+
+    result = CoordinateProcessor.calculate_world_points(centers, depth, params)
+    for i, box in enumerate(boxes):
+        single = CoordinateProcessor.calculate_coordinate_for_detection(box, depth, params)
+        assert bool(result["valid"][i]) == (single is not None)
+        if single is not None:
+            np.testing.assert_allclose(result["world"][i], single["camera_3d"], rtol=1e-6)
+            assert abs(result["depth"][i] - single["depth"]) < 1e-3
+
+
+def test_world_points_empty_and_invalid_input():
+    """空输入返回空数组；缺少深度或相机参数返回None"""
+    params = _camera_params()
+    result = CoordinateProcessor.calculate_world_points(np.empty((0, 2)), np.zeros(160 * 120), params)
+    assert result["world"].shape == (0, 3) and result["valid"].size == 0
+    assert CoordinateProcessor.calculate_world_points([[1, 1]], None, params) is None
+    assert CoordinateProcessor.calculate_world_points([[1, 1]], np.zeros(10), None) is None
+
+
+def test_ray_table_cached_and_frame_points_match_formula():
+    """射线表按相机参数缓存；整帧点云与逐点公式一致"""
+    rng = np.random.default_rng(1)
+    params = _camera_params()
+    table = CoordinateProcessor.get_ray_table(params)
+    assert table.shape == (120, 160, 3) and table.dtype == np.float32
+    assert CoordinateProcessor.get_ray_table(_camera_params()) is table
+    assert CoordinateProcessor.get_ray_table(_camera_params(width=80)) is not table
+
+    depth = rng.uniform(300, 800, 160 * 120).astype(np.float32)
+    cloud = CoordinateProcessor.calculate_frame_points(depth, params)
+    ys, xs = np.mgrid[0:120, 0:160]
+    m_c2w = np.array(params.cam2worldMatrix, dtype=np.float64).reshape(4, 4)
+    expected = CoordinateProcessor._calculate_3d_batch(
+        xs.ravel(), ys.ravel(), depth, params.cx, params.cy, params.fx, params.fy,
+        params.k1, params.k2, params.f2rc, m_c2w,
+    )
+    np.testing.assert_allclose(cloud.reshape(-1, 3), expected, rtol=1e-5, atol=1e-3)
+
+
+def test_mask_depth_ignores_edges_and_holes():
+    """基于mask的深度估计只统计mask内有效深度，不受中心点落在褶皱/空洞上的影响"""
+    params = _camera_params()
+    depth = np.full((120, 160), 900.0, dtype=np.float32)
+    depth[40:60, 50:80] = 500.0
+    depth[48:53, 63:68] = 0.0      # 中心空洞
+    depth[40:42, 50:80] = 650.0    # 边缘翘起
+    mask = np.ones((20, 30), dtype=np.uint8)
+    box = DetectionBox(0, 0.9, 50, 40, 80, 60, seg_mask=mask, mask_offset=(50, 40))
+
+    center = CoordinateProcessor.calculate_coordinate_for_detection(box, depth.ravel(), params)
+    median = CoordinateProcessor.calculate_coordinate_for_detection(box, depth, params, depth_cfg={"method": "median"})
+    trimmed = CoordinateProcessor.calculate_coordinate_for_detection(
+        box, depth, params, depth_cfg={"method": "trimmed_mean", "trim": 0.15})
+    top = CoordinateProcessor.calculate_coordinate_for_detection(
+        box, depth, params, depth_cfg={"method": "percentile", "percentile": 5})
+
+    assert center is None          # 中心邻域全部落在空洞上
+    assert median["depth"] == 500.0 and trimmed["depth"] == 500.0 and top["depth"] == 500.0
+    depth[48:53, 63:68] = 500.0
+    depth[50, 65] = 700.0          # 中心点落在褶皱上：中心邻域受影响，mask中位数不变
+    assert CoordinateProcessor.calculate_coordinate_for_detection(box, depth, params)["depth"] > 500.0
+    assert CoordinateProcessor.calculate_coordinate_for_detection(
+        box, depth, params, depth_cfg={"method": "median"})["depth"] == 500.0
+
+
+def test_mask_depth_falls_back_to_center_without_mask():
+    """无mask时回退到中心邻域平均"""
+    params = _camera_params()
+    depth = np.full(160 * 120, 600.0, dtype=np.float32)
+    box = DetectionBox(0, 0.9, 10, 10, 20, 20)
+    result = CoordinateProcessor.calculate_coordinate_for_detection(box, depth, params, depth_cfg={"method": "median"})
+    assert result["depth"] == 600.0
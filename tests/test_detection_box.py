@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+DetectionBox mask 测试（无需硬件）
+验证框内局部mask与整幅图mask之间的换算
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from services.detection.base import DetectionBox  # noqa: E402
+
+
+def test_full_mask_places_local_mask_at_offset():
+    """局部mask按偏移放回整幅图，越界部分裁掉"""
+    local = np.ones((4, 6), dtype=np.uint8)
+    box = DetectionBox(0, 0.9, 17, 8, 23, 12, seg_mask=local, mask_offset=(17, 8))
+    full = box.full_mask(10, 20)
+    assert full.shape == (10, 20)
+    assert int(full.sum()) == 2 * 3
+    assert full[8:10, 17:20].all()
+
+
+def test_full_mask_passthrough_for_full_frame_mask():
+    """没有偏移时mask本身就是整幅图尺寸，直接返回"""
+    mask = np.zeros((10, 20), dtype=np.uint8)
+    box = DetectionBox(0, 0.9, 0, 0, 5, 5, seg_mask=mask)
+    assert box.full_mask(10, 20) is mask
+    assert DetectionBox(0, 0.9, 0, 0, 5, 5).full_mask(10, 20) is None
+
+
+def test_compact_crops_full_frame_mask_and_caches_stats():
+    """整幅图mask压缩为局部mask，面积/质心/轮廓与整幅图计算一致"""
+    full = np.zeros((40, 60), dtype=np.uint8)
+    full[10:20, 30:50] = 1
+    box = DetectionBox(0, 0.9, 30, 10, 50, 20, seg_mask=full.copy()).compact()
+    assert box.mask_offset == (30, 10)
+    assert box.seg_mask.shape == (10, 20)
+    assert box.mask_area == 200.0
+    assert box.mask_centroid == (39.5, 14.5)
+    np.testing.assert_array_equal(box.full_mask(40, 60), full)
+    xs, ys = box.contour[:, 0, 0], box.contour[:, 0, 1]
+    assert (xs.min(), ys.min(), xs.max(), ys.max()) == (30, 10, 49, 19)
+
+
+def test_detection_batch_list_compat_and_filters():
+    """DetectionBatch 兼容列表用法，过滤保留原对象"""
+    from services.detection.batch import DetectionBatch
+
+    dets = [
+        DetectionBox(0, 0.9, 0, 0, 10, 10, seg_mask=np.ones((10, 10), np.uint8), mask_offset=(0, 0)),
+        DetectionBox(1, 0.8, 20, 20, 30, 30, seg_mask=np.ones((10, 10), np.uint8), mask_offset=(20, 20)),
+        DetectionBox(0, 0.95, 40, 0, 44, 4, seg_mask=np.ones((4, 4), np.uint8), mask_offset=(40, 0)),
+        DetectionBox(0, 0.7, 50, 0, 60, 10),
+    ]
+    batch = DetectionBatch.from_detections(dets)
+    assert len(batch) == 4 and batch
+    assert batch[1] is dets[1] and list(batch) == dets
+    np.testing.assert_array_equal(batch.centers()[0], [5.0, 5.0])
+
+    seasoning = batch.select_class(0).filter_area(50)
+    assert list(seasoning) == [dets[0]]
+    assert [d.score for d in batch.sorted_by_score()] == [0.95, 0.9, 0.8, 0.7]
+    assert not DetectionBatch()
+
+
+def test_detection_batch_builds_boxes_from_arrays():
+    """由数组直接构造时按需生成 DetectionBox，面积沿用批内结果"""
+    from services.detection.batch import DetectionBatch
+
+    masks = [np.ones((2, 3), np.uint8), None]
+    batch = DetectionBatch(
+        boxes=[[1, 2, 4, 4], [5, 5, 9, 9]], scores=[0.9, 0.6], class_ids=[0, 1],
+        masks=masks, mask_offsets=[[1, 2], [5, 5]],
+    )
+    box = batch[0]
+    assert box is batch[0]
+    assert (box.xmin, box.ymax, box.mask_offset, box.mask_area) == (1, 4, (1, 2), 6.0)
+    assert batch[1].seg_mask is None and batch[1].mask_offset is None
+    assert np.isnan(batch.areas[1])
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+磁盘暂存测试（无需硬件）
+验证追加写入、按序读取与确认、分段、重启恢复与淘汰
+"""
+
+import os
+import sys
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from services.sftp.spool import DiskSpool  # noqa: E402
+
+
+def test_append_peek_ack_in_order(tmp_path):
+    """按写入顺序读取；确认后的记录不再返回，全部确认的段被删除"""
+    spool = DiskSpool(str(tmp_path), segment_bytes=10)
+    for i in range(5):
+        assert spool.append(bytes([i]) * 4, f"images/{i}.jpg")
+    assert spool.stats()["segments"] == 3  # 每段最多容纳两条4字节记录
+
+    records = spool.peek(3)
+    assert [r[1] for r in records] == ["images/0.jpg", "images/1.jpg", "images/2.jpg"]
+    assert records[2][2] == b"\x02" * 4
+    spool.ack(records[-1][0])
+    assert spool.pending() == 2
+    assert spool.stats()["segments"] == 2
+    assert [r[1] for r in spool.peek(10)] == ["images/3.jpg", "images/4.jpg"]
+
+
+def test_recovers_after_restart_and_ignores_torn_tail(tmp_path):
+    """重启后从游标继续；段尾残缺的记录被忽略"""
+    spool = DiskSpool(str(tmp_path))
+    for i in range(3):
+        spool.append(b"x" * 8, f"images/{i}.jpg")
+    spool.ack(spool.peek(1)[0][0])
+    spool.close()
+
+    seg = sorted(p for p in os.listdir(tmp_path) if p.endswith(".seg"))[0]
+    with open(os.path.join(tmp_path, seg), "r+b") as f:
+        f.truncate(20)  # 最后一条记录只写入一半
+
+    reopened = DiskSpool(str(tmp_path))
+    assert [r[1] for r in reopened.peek(10)] == ["images/1.jpg"]
+    reopened.append(b"y", "images/3.jpg")
+    assert [r[1] for r in reopened.peek(10)] == ["images/1.jpg", "images/3.jpg"]
+
+
+def test_evicts_oldest_segments_over_size_limit(tmp_path):
+    """总大小超出上限时淘汰最旧的段，并计入淘汰数"""
+    spool = DiskSpool(str(tmp_path), max_bytes=25, segment_bytes=10)
+    for i in range(6):
+        spool.append(b"z" * 5, f"images/{i}.jpg")
+    stats = spool.stats()
+    assert stats["bytes"] <= 25
+    assert stats["evicted"] == 2
+    assert [r[1] for r in spool.peek(10)] == [f"images/{i}.jpg" for i in range(2, 6)]
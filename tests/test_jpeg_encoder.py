@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+JPEG编码服务测试（无需硬件）
+验证按命令的编码策略、缩放、灰度编码与 memoryview 输出
+"""
+
+import os
+import sys
+
+import cv2
+import numpy as np
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from services.shared.jpeg_encoder import JpegEncoder  # noqa: E402
+
+
+def test_policy_command_overrides_defaults():
+    """命令配置覆盖 jpeg 默认值；缺省时使用内置默认值"""
+    cfg = {"jpeg": {"quality": 90, "max_width": 800, "commands": {"catch": {"quality": 70}}}}
+    assert JpegEncoder.policy_for(cfg, "catch") == {"backend": "auto", "quality": 70, "max_width": 800}
+    assert JpegEncoder.policy_for(cfg, "get_image")["quality"] == 90
+    assert JpegEncoder.policy_for({}, "catch") == {"backend": "auto", "quality": 95, "max_width": 0}
+
+
+def test_encode_returns_memoryview_with_downscale_and_gray():
+    """输出为可直接解码的 memoryview；超宽图像等比缩小，灰度图按单通道编码"""
+    encoder = JpegEncoder("opencv")
+    bgr = np.zeros((100, 200, 3), dtype=np.uint8)
+    bgr[20:80, 40:160] = (0, 200, 255)
+
+    jpg = encoder.encode(bgr, quality=80, max_width=100)
+    assert isinstance(jpg, memoryview)
+    decoded = cv2.imdecode(np.frombuffer(jpg, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    assert decoded.shape == (50, 100, 3)
+
+    gray = encoder.encode(np.full((40, 60, 1), 128, dtype=np.uint8))
+    decoded = cv2.imdecode(np.frombuffer(gray, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    assert decoded.shape == (40, 60)
+    assert encoder.encode(None) is None
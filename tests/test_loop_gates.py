@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+连续检测后处理门控测试（无需硬件）
+验证流水线中积压的过时帧（取于停带稳定/抓取完成之前）不会触发停带或发送坐标
+"""
+
+import os
+import sys
+import time
+import types
+
+import numpy as np
+import pytest
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from handlers import system as h_system  # noqa: E402
+from services.detection.base import DetectionBox  # noqa: E402
+
+WIDTH, HEIGHT = 320, 240
+
+
+class _FakeGpio:
+    def __init__(self):
+        self.level = None
+
+    def get(self):
+        return self.level
+
+    def high(self):
+        self.level = 1
+
+    def low(self):
+        self.level = 0
+
+
+class _FakeComm:
+    def __init__(self):
+        self.sent = []
+
+    def broadcast(self, text):
+        self.sent.append(text)
+
+
+@pytest.fixture
+def loop_env(monkeypatch):
+    gpio = _FakeGpio()
+    comm = _FakeComm()
+    config = {"roi": {
+        "minArea": 100,
+        "stabilityWaitTime": 0.05,
+        "regions": [{"name": "belt", "width": WIDTH, "height": HEIGHT, "offsetx": 0, "offsety": 0, "priority": 1}],
+    }}
+    ctx = types.SimpleNamespace(
+        config=config, project_root=project_root, initializer=types.SimpleNamespace(comm=comm),
+    )
+    monkeypatch.setattr(h_system, "_gpio_resources", {"belt": gpio})
+    monkeypatch.setattr(h_system, "_target_client_id", None)
+    monkeypatch.setattr(h_system.CoordinateProcessor, "calculate_coordinate_for_detection",
+                        staticmethod(lambda *a, **k: {"camera_3d": [1.0, 2.0, 3.0]}))
+    monkeypatch.setattr(h_system, "world_to_robot_using_calib", lambda *a, **k: None)
+    with h_system._robot_state["lock"]:
+        h_system._robot_state.update(is_picking=False, picking_roi=None, last_send_time=0, complete_time=0)
+    yield ctx, gpio, comm, h_system._new_stability_state(ctx)
+    with h_system._robot_state["lock"]:
+        h_system._robot_state.update(is_picking=False, picking_roi=None, last_send_time=0, complete_time=0)
+
+
+def _frame(loop_start, with_item, seq=1):
+    dets = []
+    if with_item:
+        mask = np.ones((40, 40), dtype=np.uint8)
+        dets.append(DetectionBox(0, 0.9, 100, 100, 140, 140, seg_mask=mask, mask_offset=(100, 100)).compact())
+    return {
+        "seq": seq, "loop_start": loop_start, "img": np.zeros((HEIGHT, WIDTH), dtype=np.uint8),
+        "depth_data": np.ones((HEIGHT, WIDTH), dtype=np.float32), "camera_params": object(),
+        "capture_time": 0.0, "extract_time": 0.0, "dets": dets, "detect_time": 0.0,
+    }
+
+
+def test_frames_grabbed_before_belt_settled_are_not_sent(loop_env):
+    """停带后稳定时间点之前取到的帧（含停带前已在流水线中的帧）不发送坐标"""
+    ctx, gpio, comm, state = loop_env
+    post = h_system._postprocess_stage
+
+    post(ctx, _frame(time.perf_counter(), False), state, None)
+    assert gpio.level == 1
+    in_flight = time.perf_counter()  # 停带前已取到、尚在队列中的帧
+    post(ctx, _frame(time.perf_counter(), True), state, None)
+    assert gpio.level == 0 and comm.sent == []
+
+    time.sleep(0.06)  # 后处理时已超过稳定等待，但帧本身取于稳定之前
+    post(ctx, _frame(in_flight, True), state, None)
+    assert comm.sent == []
+    post(ctx, _frame(time.perf_counter(), True), state, None)
+    assert comm.sent == ["1.00,2.00,3.00"]
+    assert h_system._robot_state["is_picking"]
+
+
+def test_frames_grabbed_before_complete_are_ignored(loop_env):
+    """complete 之前取到的帧不触发停带、不再次发送已被抓走的目标"""
+    ctx, gpio, comm, state = loop_env
+    post = h_system._postprocess_stage
+    with h_system._robot_state["lock"]:
+        h_system._robot_state.update(is_picking=True, picking_roi="belt", last_send_time=time.perf_counter())
+
+    before_complete = time.perf_counter()
+    assert h_system.handle_robot_complete("complete", ctx)
+    post(ctx, _frame(time.perf_counter(), False), state, None)
+    assert gpio.level == 1
+
+    post(ctx, _frame(before_complete, True), state, None)
+    assert gpio.level == 1 and comm.sent == []
+    assert state["last_gpio_state"]["belt"] == 1
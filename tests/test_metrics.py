@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+耗时指标测试（无需硬件）
+验证直方图分位数精度、注册表查询与 Prometheus 输出
+"""
+
+import os
+import sys
+import urllib.request
+
+import numpy as np
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from services.system.metrics import Histogram, MetricsHttpServer, MetricsRegistry  # noqa: E402
+
+
+def test_histogram_quantiles_within_bucket_precision():
+    """分位数与精确值的相对误差在分桶精度以内"""
+    values = np.random.default_rng(0).lognormal(mean=3.0, sigma=0.6, size=5000)
+    hist = Histogram()
+    for v in values:
+        hist.record(v)
+    snap = hist.snapshot()
+    assert snap["count"] == 5000
+    for key, q in (("p50", 50), ("p95", 95), ("p99", 99)):
+        exact = float(np.percentile(values, q))
+        assert abs(snap[key] - exact) / exact < 0.05
+    assert snap["min"] <= snap["p50"] <= snap["p99"] <= snap["max"]
+    hist.record(float("nan"))
+    assert hist.snapshot()["count"] == 5000
+
+
+def test_registry_snapshot_gauges_and_reset():
+    """按前缀批量记录；状态提供者的结果随查询返回；reset 清零直方图"""
+    registry = MetricsRegistry()
+    registry.record_many("catch", {"camera": 12.0, "detection": 30.0})
+    registry.record("catch.camera", 14.0)
+    registry.register_gauge("queue", lambda: {"pending": 3, "offline": False})
+    registry.register_gauge("broken", lambda: 1 / 0)
+
+    snap = registry.snapshot()
+    assert snap["histograms"]["catch.camera"]["count"] == 2
+    assert snap["histograms"]["catch.detection"]["p50"] == 30.0
+    assert snap["gauges"] == {"queue": {"pending": 3, "offline": False}}
+
+    registry.reset()
+    assert registry.snapshot()["histograms"]["catch.camera"] == {"count": 0}
+
+
+def test_prometheus_text_and_http_endpoint():
+    """Prometheus 输出为 summary（秒）与 gauge，可通过本地 /metrics 抓取"""
+    registry = MetricsRegistry()
+    registry.record("loop.total", 50.0)
+    registry.register_gauge("sftp_uploader", lambda: {"pending": 2})
+    text = registry.to_prometheus()
+    assert '# TYPE visioncore_loop_total_seconds summary' in text
+    assert 'visioncore_loop_total_seconds{quantile="0.5"} 0.050000' in text
+    assert 'visioncore_loop_total_seconds_count 1' in text
+    assert 'visioncore_sftp_uploader_pending 2' in text
+
+    server = MetricsHttpServer(registry, port=0)
+    assert server.start()
+    try:
+        body = urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=2).read().decode()
+        assert body == registry.to_prometheus()
+    finally:
+        server.stop()
+
+
+def test_tcp_server_records_reply_send_time():
+    """TCP服务器回写回复时记录 tcp.reply_send 耗时"""
+    import socket
+    import time
+
+    from services.comm.tcp_server import TcpServer
+    from services.system.metrics import get_metrics
+
+    server = TcpServer({"host": "127.0.0.1", "port": 0})
+    server.set_message_callback(lambda cid, line: f"echo:{line}")
+    assert server.start()
+    hist = get_metrics().histogram("tcp.reply_send")
+    before = hist.snapshot().get("count", 0)
+    try:
+        with socket.create_connection(server._server_sock.getsockname(), timeout=2.0) as client:
+            client.sendall(b"ping\n")
+            assert client.recv(64).startswith(b"echo:ping")
+        deadline = time.time() + 2.0
+        while time.time() < deadline and hist.snapshot().get("count", 0) == before:
+            time.sleep(0.01)
+        assert hist.snapshot()["count"] == before + 1
+    finally:
+        server.stop()
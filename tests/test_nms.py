@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+NMS测试（无需硬件）
+验证向量化NMS与逐对比较的参考实现结果一致
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from services.detection.nms_processor import NmsProcessor  # noqa: E402
+
+
+def _iou(a, b):
+    iw = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    ih = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = iw * ih
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _reference_nms(boxes, scores, classes, thr):
+    idxs = sorted(range(len(boxes)), key=lambda i: scores[i], reverse=True)
+    kept = []
+    while idxs:
+        i = idxs.pop(0)
+        kept.append(i)
+        idxs = [j for j in idxs if classes[j] != classes[i] or _iou(boxes[i], boxes[j]) <= thr]
+    return kept
+
+
+def _random_boxes(n, seed=0):
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, 200, (n, 2))
+    wh = rng.uniform(10, 60, (n, 2))
+    boxes = np.concatenate([xy, xy + wh], axis=1).astype(np.float32)
+    scores = rng.uniform(0.5, 1.0, n).astype(np.float32)
+    classes = rng.integers(0, 2, n)
+    return boxes, scores, classes
+
+
+def test_nms_matches_reference():
+    """按类别NMS与参考实现保留相同的索引"""
+    boxes, scores, classes = _random_boxes(300)
+    keep = NmsProcessor.nms(boxes, scores, classes, iou_threshold=0.5)
+    assert list(keep) == _reference_nms(boxes.tolist(), scores.tolist(), classes.tolist(), 0.5)
+
+
+def test_nms_top_k_and_empty():
+    """top-k只保留最高分候选；空输入返回空数组"""
+    boxes, scores, classes = _random_boxes(50, seed=1)
+    keep = NmsProcessor.nms(boxes, scores, classes, iou_threshold=0.5, top_k=5)
+    top5 = set(np.argsort(-scores)[:5].tolist())
+    assert set(keep.tolist()) <= top5
+    assert NmsProcessor.nms(np.empty((0, 4)), np.empty((0,))).size == 0
+
+
+def test_mask_iou_keeps_touching_objects():
+    """框大量重叠但mask不重叠时，mask-IoU模式不抑制"""
+    boxes = np.array([[0, 0, 20, 20], [2, 2, 22, 22]], dtype=np.float32)
+    scores = np.array([0.9, 0.8], dtype=np.float32)
+    masks = np.zeros((2, 24, 24), dtype=bool)
+    masks[0, 0:10, 0:20] = True
+    masks[1, 12:22, 2:22] = True
+    assert len(NmsProcessor.nms(boxes, scores, iou_threshold=0.5)) == 1
+    assert len(NmsProcessor.nms(boxes, scores, iou_threshold=0.5, masks=masks)) == 2
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+流水线测试（无需硬件）
+验证丢弃最旧队列语义、多级并发执行与统计输出
+"""
+
+import os
+import sys
+import threading
+import time
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from services.system.pipeline import BackgroundWorker, DropOldestQueue, StagePipeline  # noqa: E402
+
+
+def test_drop_oldest_queue_keeps_newest():
+    """队列满时丢弃最旧元素，put 不阻塞"""
+    q = DropOldestQueue(maxsize=2)
+    assert q.put(1) is False
+    assert q.put(2) is False
+    assert q.put(3) is True
+    assert q.qsize() == 2
+    assert q.dropped == 1
+    assert q.get(timeout=0.1) == 2
+    assert q.get(timeout=0.1) == 3
+    assert q.get(timeout=0.01) is None
+
+
+def test_pipeline_runs_stages_concurrently():
+    """三级流水线：输出保序，统计包含各级耗时与队列深度"""
+    stop = threading.Event()
+    results = []
+    counter = {"n": 0}
+
+    def grab():
+        counter["n"] += 1
+        time.sleep(0.005)
+        return counter["n"]
+
+    def infer(item):
+        time.sleep(0.02)
+        return item * 10
+
+    def post(item):
+        results.append(item)
+
+    pipeline = StagePipeline([("grab", grab), ("infer", infer), ("post", post)],
+                             queue_size=1, stop_event=stop)
+    pipeline.start()
+    time.sleep(0.3)
+    pipeline.stop(timeout=1.0)
+
+    assert not pipeline.is_alive()
+    assert results and results == sorted(results)
+    stats = pipeline.stats()
+    assert set(stats["stages"]) == {"grab", "infer", "post"}
+    assert stats["bottleneck"] == "infer"
+    # 推理慢于取图，取图→推理队列必然有丢帧
+    assert stats["queues"]["grab->infer"]["dropped"] > 0
+    assert "瓶颈=infer" in pipeline.format_stats()
+
+
+def test_background_worker_runs_tasks_and_drops_backlog():
+    """后台任务按顺序执行；积压时丢弃最旧任务，提交方不阻塞"""
+    gate = threading.Event()
+    done = []
+
+    def task(i):
+        gate.wait(1.0)
+        done.append(i)
+
+    worker = BackgroundWorker("test", queue_size=2)
+    worker.submit(task, 0)
+    time.sleep(0.05)  # 任务0已被取出执行，阻塞在gate上
+    dropped = [worker.submit(task, i) for i in (1, 2, 3)]
+    assert dropped == [False, False, True]
+    gate.set()
+
+    deadline = time.time() + 2.0
+    while len(done) < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    worker.stop()
+    assert done == [0, 2, 3]
+    assert worker.stats()["count"] == 3 and worker.stats()["dropped"] == 1
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+点云生成测试（无需硬件）
+验证整帧反投影、无效像素过滤与降采样
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from services.camera.pointcloud import build_point_cloud  # noqa: E402
+from services.detection.coordinate_processor import CoordinateProcessor  # noqa: E402
+
+
+WIDTH = 32
+HEIGHT = 24
+
+
+def _camera_params():
+    return SimpleNamespace(
+        width=WIDTH, height=HEIGHT, cx=15.5, cy=11.5, fx=40.0, fy=40.0, k1=0.1, k2=0.01, f2rc=0.0,
+        cam2worldMatrix=[1, 0, 0, 0, 0, -1, 0, 0, 0, 0, -1, 1000, 0, 0, 0, 1],
+    )
+
+
+def test_point_cloud_matches_single_pixel_projection():
+    """点云各像素与逐点公式结果一致，深度为0与置信度不足的像素为NaN"""
+    rng = np.random.default_rng(0)
+    params = _camera_params()
+    depth = rng.uniform(400, 900, WIDTH * HEIGHT).astype(np.float32)
+    depth[5] = 0
+    confidence = np.full(WIDTH * HEIGHT, 100, dtype=np.uint16)
+    confidence[7] = 10
+
+    cloud = build_point_cloud(depth, params, confidence=confidence, min_confidence=50)
+    assert cloud.shape == (HEIGHT, WIDTH, 3) and cloud.dtype == np.float32
+    assert np.isnan(cloud[0, 5]).all() and np.isnan(cloud[0, 7]).all()
+    assert np.isfinite(cloud).all(axis=2).sum() == WIDTH * HEIGHT - 2
+
+    m_c2w = np.array(params.cam2worldMatrix, dtype=np.float64).reshape(4, 4)
+    for x, y in [(0, 0), (31, 23), (12, 9)]:
+        ok, expected = CoordinateProcessor._calculate_3d_fast(
+            x, y, float(depth[y * WIDTH + x]), params.cx, params.cy, params.fx, params.fy,
+            params.k1, params.k2, params.f2rc, m_c2w,
+        )
+        assert ok
+        np.testing.assert_allclose(cloud[y, x], expected, rtol=1e-5)
+
+
+def test_point_cloud_downsampling_and_invalid_input():
+    """降采样取每隔step个像素；缺少深度或参数时返回None"""
+    params = _camera_params()
+    depth = np.full((HEIGHT, WIDTH), 500.0, dtype=np.float32)
+    full = build_point_cloud(depth, params)
+    half = build_point_cloud(depth, params, step=2)
+    assert half.shape == (HEIGHT // 2, WIDTH // 2, 3)
+    np.testing.assert_array_equal(half, full[::2, ::2])
+    assert build_point_cloud(None, params) is None
+    assert build_point_cloud(depth, None) is None
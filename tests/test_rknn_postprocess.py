@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+RKNN 后处理测试（无需 RKNN 运行时）
+以逐网格逐类别的参考实现核对向量化的检测框解码与框内局部mask解码
+"""
+
+import math
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+# 添加项目根目录与 tools 目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "tools"))
+
+from benchmark import rknn_postprocess_inputs  # noqa: E402
+
+IMG_W, IMG_H = 320, 240
+
+
+def _reference_boxes(det, outputs, img_h, img_w):
+    """逐网格逐类别解码（向量化之前的实现）"""
+    scale_h = img_h / float(det._input_size[1])
+    scale_w = img_w / float(det._input_size[0])
+    boxes, scores, classes, coeffs = [], [], [], []
+    for head in range(det._head_num):
+        h, w = det._map_sizes[head]
+        stride = det._strides[head]
+        reg = outputs[head * 2].reshape(-1)
+        cls = outputs[head * 2 + 1].reshape(-1)
+        msk = outputs[6 + head].reshape(-1)
+        for i in range(h):
+            for j in range(w):
+                base = i * w + j
+                for class_id in range(det._class_num):
+                    score = 1.0 / (1.0 + math.exp(-float(cls[class_id * h * w + base])))
+                    if score <= det._conf:
+                        continue
+                    gx, gy = j + 0.5, i + 0.5
+                    xmin = max(0.0, (gx - reg[base]) * stride * scale_w)
+                    ymin = max(0.0, (gy - reg[h * w + base]) * stride * scale_h)
+                    xmax = min(float(img_w), (gx + reg[2 * h * w + base]) * stride * scale_w)
+                    ymax = min(float(img_h), (gy + reg[3 * h * w + base]) * stride * scale_h)
+                    if xmax <= xmin or ymax <= ymin:
+                        continue
+                    boxes.append((xmin, ymin, xmax, ymax))
+                    scores.append(score)
+                    classes.append(class_id)
+                    coeffs.append([msk[m * h * w + base] for m in range(det._mask_num)])
+    return np.array(boxes), np.array(scores), np.array(classes), np.array(coeffs, dtype=np.float32)
+
+
+def _reference_mask(proto, coeffs, box, img_h, img_w):
+    """整图上采样后裁剪到检测框（先裁剪后上采样之前的实现）"""
+    c, mh, mw = proto.shape
+    low = 1.0 / (1.0 + np.exp(-(coeffs.reshape(1, -1) @ proto.reshape(c, -1))))
+    full = (cv2.resize(low.reshape(mh, mw), (img_w, img_h), interpolation=cv2.INTER_LINEAR) > 0.5).astype(np.uint8)
+    xmin, ymin = max(0, int(box[0])), max(0, int(box[1]))
+    xmax, ymax = min(img_w, int(box[2])), min(img_h, int(box[3]))
+    out = np.zeros((img_h, img_w), dtype=np.uint8)
+    out[ymin:ymax, xmin:xmax] = full[ymin:ymax, xmin:xmax]
+    return out
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_vectorized_decode_matches_reference_loop(seed):
+    """检测框/分数/类别/mask系数与参考实现一致（同序），框内局部mask与整图mask仅在插值边界处相差个别像素"""
+    det, outputs = rknn_postprocess_inputs(candidates=60, seed=seed)
+    boxes, scores, classes, coeffs = det._postprocess_boxes(outputs, IMG_H, IMG_W)
+    ref_boxes, ref_scores, ref_classes, ref_coeffs = _reference_boxes(det, outputs, IMG_H, IMG_W)
+
+    assert len(boxes) == len(ref_boxes) > 0
+    assert set(classes.tolist()) == {0, 1}
+    np.testing.assert_allclose(boxes, ref_boxes, atol=1e-3)
+    np.testing.assert_allclose(scores, ref_scores, rtol=1e-5)
+    np.testing.assert_array_equal(classes, ref_classes)
+    np.testing.assert_allclose(coeffs, ref_coeffs, rtol=1e-6)
+    assert coeffs.shape == (len(boxes), det._mask_num) and coeffs.flags.c_contiguous
+
+    masks = det._decode_masks(outputs[9], coeffs, boxes, IMG_H, IMG_W)
+    assert len(masks) == len(boxes)
+    proto = outputs[9][0]
+    for (local, (x0, y0)), box, vec in zip(masks, boxes, coeffs):
+        x1, y1 = min(IMG_W, int(box[2])), min(IMG_H, int(box[3]))
+        assert (x0, y0) == (max(0, int(box[0])), max(0, int(box[1])))
+        assert local.shape == (y1 - y0, x1 - x0) and local.dtype == np.uint8
+
+        full = np.zeros((IMG_H, IMG_W), dtype=np.uint8)
+        full[y0:y1, x0:x1] = local
+        reference = _reference_mask(proto, vec, box, IMG_H, IMG_W)
+        # 浮点舍入只会让恰在0.5阈值上的像素翻转
+        assert np.count_nonzero(full != reference) <= 1
+
+
+def test_decode_handles_empty_and_degenerate_boxes():
+    """无候选时返回空数组；零面积框得到空的局部mask"""
+    det, outputs = rknn_postprocess_inputs(candidates=10)
+    quiet = list(outputs)
+    for head in range(det._head_num):
+        quiet[head * 2 + 1] = np.full_like(outputs[head * 2 + 1], -8.0)
+    boxes, scores, classes, coeffs = det._postprocess_boxes(quiet, IMG_H, IMG_W)
+    assert boxes.shape == (0, 4) and scores.shape == (0,) and coeffs.shape == (0, det._mask_num)
+    assert det._decode_masks(outputs[9], coeffs, boxes, IMG_H, IMG_W) == []
+
+    masks = det._decode_masks(outputs[9], np.ones((1, det._mask_num), np.float32),
+                              np.array([[50.0, 60.0, 50.5, 80.0]]), IMG_H, IMG_W)
+    assert masks[0][0].shape == (20, 0) and masks[0][1] == (50, 60)
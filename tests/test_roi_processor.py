@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ROI 判定测试（无需硬件）
+验证向量化 ROI 归属、计数与目标选择
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from services.detection.base import DetectionBox  # noqa: E402
+from services.detection.batch import DetectionBatch  # noqa: E402
+from services.detection.roi_processor import RoiProcessor  # noqa: E402
+from services.detection.target_selector import TargetSelector  # noqa: E402
+
+
+REGIONS = [
+    {"name": "backup_area", "width": 100, "height": 100, "offsetx": 50, "offsety": 0, "priority": 2},
+    {"name": "main_work_area", "width": 100, "height": 100, "offsetx": 0, "offsety": 0, "priority": 1},
+]
+
+
+def _box(cx, cy, size=10, area=None):
+    side = size if area is None else int(np.sqrt(area))
+    mask = np.ones((side, side), dtype=np.uint8)
+    return DetectionBox(0, 0.9, cx - size // 2, cy - size // 2, cx + size // 2, cy + size // 2,
+                        seg_mask=mask, mask_offset=(cx - size // 2, cy - size // 2))
+
+
+def test_build_roi_list_clamps_to_image():
+    """ROI 限制在图像范围内，保持配置顺序"""
+    rois = RoiProcessor.build_roi_list(REGIONS, width=120, height=80)
+    assert [r["name"] for r in rois] == ["backup_area", "main_work_area"]
+    assert (rois[0]["x1"], rois[0]["x2"], rois[0]["y2"]) == (50, 120, 80)
+
+
+def test_assign_rois_membership_and_priority():
+    """重叠区域内的目标两个ROI都计数，但只归属优先级最高的ROI"""
+    roi_set = RoiProcessor.compile_rois(RoiProcessor.build_roi_list(REGIONS, 640, 480))
+    centers = np.array([[20, 20], [75, 20], [130, 20], [300, 300]], dtype=np.float32)
+    result = RoiProcessor.assign_rois(centers, roi_set)
+
+    assert result.counts.tolist() == [2, 2]
+    assert result.assigned.tolist() == [1, 1, 0, -1]
+    assert result.assigned_counts.tolist() == [1, 2]
+    assert result.assigned_count_by_priority(roi_set, 1) == 2
+    assert result.assigned_count_by_priority(roi_set, 2) == 1
+
+
+def test_target_selector_prefers_priority_then_area():
+    """先选优先级最高的ROI，再在其中选面积最大的目标；面积不足的被过滤"""
+    dets = [_box(130, 20, area=400), _box(20, 20, area=100), _box(40, 40, area=225), _box(60, 60, size=4)]
+    rois = RoiProcessor.build_roi_list(REGIONS, 640, 480)
+
+    best = TargetSelector.select_by_multi_roi_priority(dets, rois, min_area=50)
+    assert best["detection"] is dets[2]
+    assert best["roi_name"] == "main_work_area" and best["roi_priority"] == 1
+    assert best["target_id"] == 3
+
+    batch = DetectionBatch.from_detections(dets)
+    roi_set = RoiProcessor.compile_rois(rois)
+    assignment = RoiProcessor.assign_rois(batch.centers(), roi_set)
+    in_backup = TargetSelector.select_from_assignment(batch, roi_set, assignment, min_area=50, roi_index=0)
+    assert in_backup["detection"] is dets[0]
+
+
+def test_get_compiled_rois_is_cached_per_config_and_size():
+    """同一配置与图像尺寸复用编译结果，尺寸变化时重新编译"""
+    roi_cfg = {"regions": list(REGIONS)}
+    a = RoiProcessor.get_compiled_rois(roi_cfg, 640, 480)
+    assert RoiProcessor.get_compiled_rois(roi_cfg, 640, 480) is a
+    assert RoiProcessor.get_compiled_rois(roi_cfg, 320, 240) is not a
+
+
+def test_invalidate_compiled_rois_forces_recompile():
+    """ROI配置热更新后重新编译，GPIO绑定按ROI顺序解析"""
+    regions = [dict(REGIONS[0], gpio={"enable": True, "chip": "dev/gpiochip1", "pin": "5"}), REGIONS[1]]
+    roi_cfg = {"regions": regions}
+    a = RoiProcessor.get_compiled_rois(roi_cfg, 640, 480)
+    RoiProcessor.invalidate_compiled_rois()
+    b = RoiProcessor.get_compiled_rois(roi_cfg, 640, 480)
+    assert b is not a
+    assert b.rois[0]["gpio"] == {"chip": "/dev/gpiochip1", "pin": 5} and b.rois[1]["gpio"] is None
+
+    resources = {"main_work_area": object()}
+    slots = b.bind_gpio(resources)
+    assert slots == [None, resources["main_work_area"]]
+    assert b.bind_gpio(resources) is slots
+
+
+def test_roi_overlay_matches_draw_roi():
+    """预绘制叠加层与逐个 draw_roi 绘制结果逐像素一致"""
+    from services.detection.visualizer import DetectionVisualizer
+
+    regions = REGIONS + [{"name": "other", "width": 60, "height": 30, "offsetx": 20, "offsety": 90, "priority": 5}]
+    roi_set = RoiProcessor.compile_rois(RoiProcessor.build_roi_list(regions, 160, 120), 160, 120)
+    img = np.random.default_rng(0).integers(0, 255, (120, 160), dtype=np.uint8)
+
+    expected = img
+    for roi in roi_set.rois:
+        color = DetectionVisualizer.ROI_PRIORITY_COLORS.get(roi["priority"], DetectionVisualizer.ROI_DEFAULT_COLOR)
+        expected = DetectionVisualizer.draw_roi(expected, roi, color=color, thickness=2)
+    result = DetectionVisualizer.apply_roi_overlay(img, roi_set.overlay())
+    np.testing.assert_array_equal(result, expected)
+    assert roi_set.overlay() is roi_set.overlay()
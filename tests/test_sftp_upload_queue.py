@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SFTP异步上传队列测试（无需SFTP服务器）
+验证预测路径立即返回、后台上传、失败暂存与补传、积压处理
+"""
+
+import os
+import sys
+import threading
+import time
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from services.sftp.spool import DiskSpool  # noqa: E402
+from services.sftp.upload_queue import SftpUploadQueue  # noqa: E402
+from services.shared.sftp_helper import SftpHelper  # noqa: E402
+
+
+class _FakeClient:
+    def __init__(self, ok=True, gate=None):
+        self.ok = ok
+        self.gate = gate
+        self.files = {}
+
+    def upload_bytes(self, data, remote_rel_path):
+        if self.gate is not None:
+            self.gate.wait(2.0)
+        if self.ok:
+            self.files[remote_rel_path] = data
+        return self.ok
+
+
+def _wait(cond, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline and not cond():
+        time.sleep(0.01)
+    return cond()
+
+
+def test_submit_returns_predicted_path_and_uploads_in_background():
+    """入队后立即返回与同步上传相同格式的路径信息，后台线程完成上传"""
+    client = _FakeClient()
+    uploader = SftpUploadQueue(client)
+    try:
+        info = SftpHelper.submit_image_bytes(uploader, client, b"jpeg", prefix="catch")
+        assert info["filename"].startswith("catch_") and info["file_size"] == 4
+        assert info["remote_rel_path"] == f"images/{info['filename']}"
+        assert info["remote_file"] == f"/images/{info['filename']}"
+        assert _wait(lambda: info["remote_rel_path"] in client.files)
+        assert uploader.stats()["uploaded"] == 1
+    finally:
+        uploader.stop()
+
+
+def test_failed_upload_spills_and_drains_after_reconnect(tmp_path):
+    """上传失败的任务写入暂存，离线期间不再尝试连接；恢复后按顺序补传"""
+    client = _FakeClient(ok=False)
+    spool = DiskSpool(str(tmp_path))
+    uploader = SftpUploadQueue(client, overflow="spill", spool=spool, retry_interval=60)
+    try:
+        assert uploader.submit(b"abc", "images/a.jpg")
+        assert _wait(lambda: spool.pending() == 1)
+        uploader.submit(b"def", "images/b.jpg")
+        assert _wait(lambda: spool.pending() == 2)
+        stats = uploader.stats()
+        assert stats["failed"] == 1 and stats["spilled"] == 2 and stats["offline"]
+
+        client.ok = True
+        uploader.set_client(client)
+        assert _wait(lambda: spool.pending() == 0)
+        assert client.files == {"images/a.jpg": b"abc", "images/b.jpg": b"def"}
+        assert uploader.stats()["drained"] == 2
+    finally:
+        uploader.stop()
+
+
+def test_backlog_drops_oldest_without_blocking():
+    """服务器缓慢时队列积压，挤出最旧任务，提交方不阻塞"""
+    gate = threading.Event()
+    client = _FakeClient(gate=gate)
+    uploader = SftpUploadQueue(client, queue_size=2, batch_size=1)
+    try:
+        uploader.submit(b"0", "images/0.jpg")
+        assert _wait(lambda: uploader.stats()["pending"] == 0)  # 第一个任务已被取走并阻塞在上传中
+        t0 = time.perf_counter()
+        for i in range(1, 5):
+            uploader.submit(str(i).encode(), f"images/{i}.jpg")
+        assert time.perf_counter() - t0 < 0.5
+        gate.set()
+        assert _wait(lambda: len(client.files) == 3)
+        assert sorted(client.files) == ["images/0.jpg", "images/3.jpg", "images/4.jpg"]
+        assert uploader.stats()["discarded"] == 2
+    finally:
+        uploader.stop()
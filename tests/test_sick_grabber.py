@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SICK 后台采集线程测试（无需硬件）
+以脚本化的假数据流驱动采集线程，验证最新帧邮箱的取帧、超时、断线唤醒与线程退出
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+
+# 添加项目根目录与官方 SDK 顶层包 'common' 到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "infrastructure", "sick"))
+
+from common.Streaming.Data import Data  # noqa: E402
+from services.camera.sick_camera import SickCamera  # noqa: E402
+from test_sick_parser import HEIGHT, WIDTH, build_blob_frame  # noqa: E402
+
+
+class _FakeStream:
+    """按脚本返回帧：队列中为 bytes 时作为一帧，为异常时抛出；队列为空时阻塞（模拟等待相机数据）"""
+
+    def __init__(self, closed: threading.Event):
+        self._items = queue.Queue()
+        self._closed = closed
+        self.frame = None
+        self.frame_acq_time_s = None
+
+    def push(self, item):
+        self._items.put(item)
+
+    def getFrame(self):
+        while True:
+            try:
+                item = self._items.get(timeout=0.01)
+                break
+            except queue.Empty:
+                if self._closed.is_set():
+                    raise ConnectionError("stream closed")  # 关闭数据流后阻塞的 recv 立即返回
+        if isinstance(item, Exception):
+            raise item
+        self.frame = item
+        self.frame_acq_time_s = time.time()
+
+
+def _blob(frame_number):
+    n = WIDTH * HEIGHT
+    return build_blob_frame(np.full(n, 5000), np.full(n, 1000), np.full(n, 60000), frame_number=frame_number)
+
+
+def _camera(grab_timeout=0.2):
+    cam = SickCamera("127.0.0.1", use_single_step=False, grabber=True, grab_timeout=grab_timeout)
+    stream = _FakeStream(cam._grab_stop)
+    cam._ctrl = object()
+    cam._stream = stream
+    cam._parser = Data()
+    cam.is_connected = True
+    cam._start_grabber()
+    return cam, stream
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline and not predicate():
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_mailbox_returns_each_frame_once_and_times_out():
+    """同一帧不会被返回两次；邮箱无新帧时等待 grab_timeout 后返回None；积压时只取最新帧"""
+    cam, stream = _camera(grab_timeout=0.2)
+    try:
+        stream.push(_blob(1))
+        assert cam.get_frame()["frame_num"] == 1
+
+        t0 = time.perf_counter()
+        assert cam.get_frame() is None
+        assert 0.15 <= time.perf_counter() - t0 < 1.0
+
+        for i in (2, 3, 4):
+            stream.push(_blob(i))
+        assert _wait_for(lambda: cam._mailbox_seq == 4)
+        frame = cam.get_frame(depth=False, intensity=True, camera_params=False)
+        assert frame["frame_num"] == 4 and frame["depthmap"] is None and frame["confidence"] is None
+        assert cam.get_frame() is None
+    finally:
+        cam._stop_grabber()
+
+
+def test_blocked_consumer_wakes_on_new_frame():
+    """阻塞中的取帧在新帧到达时立即返回"""
+    cam, stream = _camera(grab_timeout=5.0)
+    try:
+        result = {}
+        consumer = threading.Thread(target=lambda: result.setdefault("frame", cam.get_frame()))
+        consumer.start()
+        time.sleep(0.05)
+        stream.push(_blob(7))
+        consumer.join(timeout=1.0)
+        assert not consumer.is_alive() and result["frame"]["frame_num"] == 7
+    finally:
+        cam._stop_grabber()
+
+
+def test_repeated_failures_disconnect_and_wake_consumer():
+    """连续读取失败达到上限：标记断开、唤醒阻塞中的取帧（不等满超时）、采集线程退出"""
+    cam, stream = _camera(grab_timeout=5.0)
+    cam._GRAB_MAX_FAILURES = 3
+    result = {}
+    consumer = threading.Thread(target=lambda: result.setdefault("frame", cam.get_frame()))
+    consumer.start()
+    time.sleep(0.05)
+    t0 = time.perf_counter()
+    for _ in range(3):
+        stream.push(OSError("recv failed"))
+    consumer.join(timeout=2.0)
+    assert not consumer.is_alive() and result["frame"] is None
+    assert time.perf_counter() - t0 < 2.0
+    assert cam.is_connected is False
+    assert _wait_for(lambda: not cam._grab_thread.is_alive())
+    assert cam.healthy is False
+    cam._stop_grabber()
+
+
+def test_stop_grabber_joins_thread():
+    """_stop_grabber 通知并等待采集线程退出（含阻塞在数据流读取中的情况）"""
+    cam, stream = _camera()
+    stream.push(_blob(1))
+    assert _wait_for(lambda: cam._mailbox_seq == 1)
+    thread = cam._grab_thread
+    assert thread.is_alive()
+
+    t0 = time.perf_counter()
+    cam._stop_grabber()
+    assert not thread.is_alive() and cam._grab_thread is None
+    assert time.perf_counter() - t0 < 1.0
+
+    # 重新启动时邮箱清空，旧帧不会被取到
+    cam._start_grabber()
+    try:
+        assert cam.get_frame() is None
+    finally:
+        cam._stop_grabber()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SICK BLOB 解析测试（无需硬件）
+用合成的 BLOB 帧验证 numpy 视图解析与 struct 元组解析结果一致
+"""
+
+import os
+import socket
+import struct
+import sys
+
+import numpy as np
+
+# 添加项目根目录与官方 SDK 顶层包 'common' 到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "infrastructure", "sick"))
+
+from common.Stream import Streaming  # noqa: E402
+from common.Streaming.Data import Data  # noqa: E402
+
+
+WIDTH = 16
+HEIGHT = 12
+
+_XML_TEMPLATE = (
+    "<SickRecord><DataSets><DataSetDepthMap datacount=\"1\">"
+    "<DataLink><FileName>data.bin</FileName></DataLink>"
+    "<DeviceDescription><Ident>Visionary-S CX</Ident></DeviceDescription>"
+    "<FormatDescriptionDepthMap>"
+    "<TimestampUTC/><Version>uint16</Version>"
+    "<DataStream>"
+    "<Width>{w}</Width><Height>{h}</Height>"
+    "<CameraToWorldTransform>{c2w}</CameraToWorldTransform>"
+    "<CameraMatrix><FX>146.5</FX><FY>146.5</FY><CX>{cx}</CX><CY>{cy}</CY></CameraMatrix>"
+    "<CameraDistortionParams><K1>0.1</K1><K2>0.01</K2></CameraDistortionParams>"
+    "<FrameNumber>uint32</FrameNumber><Quality>uint8</Quality><Status>uint8</Status>"
+    "<Distance decimalexponent=\"-1\">uint16</Distance>"
+    "<Intensity>uint16</Intensity><Confidence>uint16</Confidence>"
+    "</DataStream></FormatDescriptionDepthMap>"
+    "</DataSetDepthMap></DataSets></SickRecord>"
+)
+
+
+def build_blob_frame(distance, intensity, confidence, frame_number=1, width=WIDTH, height=HEIGHT):
+    """按 Visionary BLOB 协议拼装一帧（头 + XML段 + 二进制段 + overlay段 + 校验字节）"""
+    c2w = "".join(f"<value>{v}</value>" for v in [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1])
+    xml = _XML_TEMPLATE.format(w=width, h=height, c2w=c2w, cx=width / 2.0, cy=height / 2.0).encode("utf-8")
+
+    planes = (
+        np.asarray(distance, dtype="<u2").tobytes()
+        + np.asarray(intensity, dtype="<u2").tobytes()
+        + np.asarray(confidence, dtype="<u2").tobytes()
+    )
+    body = struct.pack("<IBB", frame_number, 0, 0) + planes
+    length_at_start = struct.calcsize("<IQH") + len(body)
+    binary = struct.pack("<IQH", length_at_start, 0, 2) + body + struct.pack("<II", 0, length_at_start)
+    overlay = b"<overlay/>"
+
+    num_segments = 3
+    table_len = 4 + num_segments * 8
+    off0 = table_len  # 相对偏移（Data.read 会 +11）
+    off1 = off0 + len(xml)
+    off2 = off1 + len(binary)
+    segments = struct.pack(">HH", 1, num_segments)
+    for off in (off0, off1, off2):
+        segments += struct.pack(">II", off, 1)
+    payload = segments + xml + binary + overlay
+
+    # 总长 = 11字节头 + payload + 1字节校验 = pkgLength + 9
+    pkg_length = len(payload) + 3
+    header = struct.pack(">IIHB", 0x02020202, pkg_length, 1, 0x62)
+    return bytearray(header + payload + b"E")
+
+
+def _sample_planes():
+    rng = np.random.default_rng(0)
+    n = WIDTH * HEIGHT
+    return (
+        rng.integers(0, 65535, n, dtype=np.uint16),
+        rng.integers(0, 65535, n, dtype=np.uint16),
+        rng.integers(0, 65535, n, dtype=np.uint16),
+    )
+
+
+def test_numpy_parser_matches_struct_parser():
+    """numpy 视图解析与 struct 元组解析结果一致"""
+    distance, intensity, confidence = _sample_planes()
+    frame = build_blob_frame(distance, intensity, confidence, frame_number=42)
+
+    legacy = Data()
+    legacy.read(bytes(frame), convertToMM=True)
+    fast = Data()
+    fast.read(frame, convertToMM=True, useNumpy=True)
+
+    assert fast.hasDepthMap and legacy.hasDepthMap
+    assert not fast.corrupted
+    assert fast.depthmap.frameNumber == 42
+    assert isinstance(fast.depthmap.intensity, np.ndarray)
+    assert fast.depthmap.intensity.dtype == np.dtype("<u2")
+    np.testing.assert_array_equal(fast.depthmap.intensity, np.asarray(legacy.depthmap.intensity))
+    np.testing.assert_array_equal(fast.depthmap.confidence, np.asarray(legacy.depthmap.confidence))
+    np.testing.assert_allclose(fast.depthmap.distance, legacy.depthmap.distance)
+    np.testing.assert_allclose(fast.depthmap.distance, distance * 0.1)
+
+
+def test_numpy_parser_views_frame_buffer():
+    """numpy 模式下强度/置信度是帧缓冲区上的视图（零拷贝）"""
+    distance, intensity, confidence = _sample_planes()
+    frame = build_blob_frame(distance, intensity, confidence)
+
+    data = Data()
+    data.read(frame, useNumpy=True)
+
+    assert np.shares_memory(data.depthmap.intensity, np.frombuffer(frame, dtype=np.uint8))
+    assert np.shares_memory(data.depthmap.confidence, np.frombuffer(frame, dtype=np.uint8))
+
+
+def test_frame_dict_does_not_alias_frame_buffer():
+    """帧字典中的数组均与接收缓冲区无关：缓冲区被下一帧覆盖后返回的帧不变"""
+    from services.camera.sick_camera import SickCamera
+
+    distance, intensity, confidence = _sample_planes()
+    frame = build_blob_frame(distance, intensity, confidence)
+    data = Data()
+    data.read(frame, convertToMM=True, useNumpy=True)
+    result = SickCamera.frame_from_parser(data, True, True, True)
+    snapshot = {k: np.array(result[k], copy=True) for k in ("depthmap", "intensity_image", "confidence")}
+
+    frame[11:] = b"\xff" * (len(frame) - 11)  # 环形缓冲槽位被后续帧复用
+    for key, expected in snapshot.items():
+        assert not np.shares_memory(result[key], np.frombuffer(frame, dtype=np.uint8)), key
+        np.testing.assert_array_equal(result[key], expected)
+
+
+def test_streaming_ring_reuses_buffers():
+    """环形接收缓冲：按槽位轮转复用，交给 Data.read 的是 memoryview"""
+    distance, intensity, confidence = _sample_planes()
+    frames = [build_blob_frame(distance, intensity, confidence, frame_number=i + 1) for i in range(4)]
+
+    server, client = socket.socketpair()
+    try:
+        for frame in frames:
+            server.sendall(frame)
+        stream = Streaming(ringSlots=2)
+        stream.sock_stream = client
+
+        data = Data()
+        seen = []
+        for i in range(4):
+            stream.getFrame()
+            assert isinstance(stream.frame, memoryview)
+            assert len(stream.frame) == len(frames[i])
+            seen.append(stream.frame.obj)
+            data.read(stream.frame, useNumpy=True)
+            assert data.depthmap.frameNumber == i + 1
+            np.testing.assert_array_equal(data.depthmap.intensity, intensity)
+
+        assert seen[0] is seen[2] and seen[1] is seen[3]
+        assert seen[0] is not seen[1]
+    finally:
+        server.close()
+        client.close()
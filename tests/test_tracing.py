@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+链路追踪测试（无需硬件）
+验证 span 嵌套、跨线程传递、环形缓冲区、慢请求筛选与 Chrome trace 导出
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from services.system.tracing import Tracer  # noqa: E402
+
+
+def test_nested_spans_share_trace_and_cross_threads():
+    """嵌套 span 挂到父 span 下；capture/attach 后后台线程的 span 属于同一 trace"""
+    tracer = Tracer()
+    with tracer.trace("tcp.catch", client="robot") as root:
+        with tracer.span("camera.get_frame"):
+            pass
+        with tracer.span("detector.detect") as det:
+            det.set(count=3)
+        tracer.complete("catch.coordinate_calc", 1.5)
+        parent = tracer.capture()
+
+        def _worker():
+            with tracer.attach(parent), tracer.span("catch.render"):
+                pass
+
+        t = threading.Thread(target=_worker, name="render")
+        t.start()
+        t.join()
+    assert tracer.current_trace_id() is None
+
+    records = {r[3]: r for r in tracer.records()}
+    assert len(records) == 5
+    assert {r[0] for r in records.values()} == {root.trace_id}
+    assert records["tcp.catch"][2] == 0
+    for name in ("camera.get_frame", "detector.detect", "catch.coordinate_calc", "catch.render"):
+        assert records[name][2] == root.span_id
+    assert records["detector.detect"][7] == {"count": 3}
+    assert abs(records["catch.coordinate_calc"][5] - 1_500_000) < 1000
+
+    # 新的 trace 与上一个无关
+    with tracer.trace("tcp.catch") as other:
+        pass
+    assert other.trace_id != root.trace_id
+
+
+def test_ring_buffer_filters_and_disable():
+    """缓冲区满时覆盖最旧记录；按根 span 耗时与最近 N 个筛选；关闭后不记录"""
+    tracer = Tracer(capacity=6)
+    ids = []
+    for delay in (0.0, 0.02, 0.0, 0.0):
+        with tracer.trace("tcp.catch") as root:
+            with tracer.span("detector.detect"):
+                time.sleep(delay)
+        ids.append(root.trace_id)
+    assert tracer.stats()["spans"] == 6
+    assert {r[0] for r in tracer.records()} == set(ids[1:])
+
+    slow = tracer.records(min_duration_ms=15)
+    assert {r[0] for r in slow} == {ids[1]} and len(slow) == 2
+    assert {r[0] for r in tracer.records(last=1)} == {ids[3]}
+    assert len(tracer.records(trace_id=ids[2])) == 2
+
+    tracer.configure(enable=False)
+    with tracer.trace("tcp.catch") as root:
+        with tracer.span("detector.detect"):
+            pass
+    assert root.trace_id is None
+    assert tracer.stats()["spans"] == 6
+
+
+def test_chrome_trace_export(tmp_path):
+    """导出为 Chrome trace-event 格式（完整事件 + 线程名元数据）"""
+    tracer = Tracer()
+    with tracer.trace("tcp.catch"):
+        with tracer.span("camera.get_frame"):
+            pass
+    path = str(tmp_path / "traces" / "trace.json")
+    assert tracer.dump(path) == 2
+    with open(path, "r", encoding="utf-8") as f:
+        doc = json.load(f)
+    spans = [e for e in doc["traceEvents"] if e["ph"] == "X"]
+    meta = [e for e in doc["traceEvents"] if e["ph"] == "M"]
+    assert [e["name"] for e in sorted(spans, key=lambda e: e["ts"])] == ["tcp.catch", "camera.get_frame"]
+    root, child = sorted(spans, key=lambda e: e["ts"])
+    assert root["ts"] <= child["ts"] and child["ts"] + child["dur"] <= root["ts"] + root["dur"] + 1
+    assert child["args"]["parent_id"] == root["args"]["span_id"]
+    assert child["cat"] == "camera"
+    assert meta and meta[0]["args"]["name"] == threading.current_thread().name
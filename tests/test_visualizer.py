@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+可视化测试（无需硬件）
+验证单缓冲区渲染与逐步绘制的结果一致
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from services.detection.base import DetectionBox  # noqa: E402
+from services.detection.roi_processor import RoiProcessor  # noqa: E402
+from services.detection.visualizer import DetectionVisualizer  # noqa: E402
+
+
+def _blob(class_id, x, y, w, h):
+    mask = np.zeros((h, w), dtype=np.uint8)
+    mask[2:h - 2, 3:w - 3] = 1
+    return DetectionBox(class_id, 0.9, x, y, x + w, y + h, seg_mask=mask, mask_offset=(x, y))
+
+
+def test_render_matches_step_by_step_drawing():
+    """mask互不重叠时，单次渲染与 draw_detections + ROI + 十字准星 逐像素一致"""
+    img = np.random.default_rng(0).integers(0, 255, (120, 160), dtype=np.uint8)
+    dets = [_blob(0, 5, 5, 30, 20), _blob(1, 60, 40, 25, 30), _blob(0, 110, 80, 40, 35)]
+    regions = [{"name": "main", "width": 100, "height": 80, "offsetx": 10, "offsety": 10, "priority": 1}]
+    roi_set = RoiProcessor.compile_rois(RoiProcessor.build_roi_list(regions, 160, 120), 160, 120)
+
+    expected = DetectionVisualizer.draw_detections(img, dets, show_bbox=False)
+    expected = DetectionVisualizer.apply_roi_overlay(expected, roi_set.overlay())
+    expected = DetectionVisualizer.draw_crosshair(expected, 70, 55, size=20, color=(0, 255, 0), thickness=2)
+
+    result = DetectionVisualizer.render(img, dets, roi_overlay=roi_set.overlay(), crosshair=(70, 55))
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_render_blends_overlap_once_and_draws_in_place():
+    """重叠区域只按后一个目标颜色混合一次；inplace 时直接绘制在输入缓冲区上"""
+    img = np.full((40, 40, 3), 100, dtype=np.uint8)
+    a = DetectionBox(0, 0.9, 0, 0, 20, 20, seg_mask=np.ones((20, 20), np.uint8), mask_offset=(0, 0))
+    b = DetectionBox(2, 0.9, 10, 10, 30, 30, seg_mask=np.ones((20, 20), np.uint8), mask_offset=(10, 10))
+
+    result = DetectionVisualizer.render(img, [a, b], show_contour=False, inplace=True)
+    assert result is img
+    red = DetectionVisualizer.DEFAULT_COLORS[2]
+    expected = np.round(0.35 * np.array(red) + 0.65 * 100).astype(np.uint8)
+    np.testing.assert_array_equal(result[15, 15], expected)
+    assert (result[35, 35] == 100).all()
@@ -0,0 +1,645 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+catch 流水线性能基准
+- 端到端：handle_catch（单次抓取）与 _run_loop（连续检测，顺序/流水线两种模式）
+  相机为 ReplayCamera（录制文件或合成帧），检测器为回放检测结果的 StubDetector，无需设备与模型
+- 微基准：BLOB解析（BinaryParser）、RKNNDetector._postprocess_boxes、TargetSelector、DetectionVisualizer
+- 结果写入JSON（含提交号与环境信息），用 --compare 对比两次结果
+
+使用方法：
+    # 合成输入
+    python tools/benchmark.py --out bench.json
+
+    # 现场录制的帧 + 录制的检测结果（--record-detections 用真实模型生成一次）
+    python tools/benchmark.py --recording recordings/sick_xxx.vcrec --record-detections dets.json
+    python tools/benchmark.py --recording recordings/sick_xxx.vcrec --detections dets.json --out bench.json
+
+    # 对比两次结果（各项 p50/p95 与吞吐变化）
+    python tools/benchmark.py --compare base.json bench.json
+"""
+
+import argparse
+import copy
+import json
+import logging
+import os
+import platform
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+import yaml
+
+# 添加项目根目录与官方 SDK 顶层包 'common' 到路径
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "infrastructure", "sick"))
+
+from domain.enums.commands import MessageType, VisionCoreCommands  # noqa: E402
+from domain.models.mqtt import MQTTResponse  # noqa: E402
+from handlers import detection as h_detection  # noqa: E402
+from handlers import system as h_system  # noqa: E402
+from handlers.context import CommandContext  # noqa: E402
+from infrastructure.sick.common.Streaming.Data import Data  # noqa: E402
+from services.camera.recording import FrameRecorder, KIND_BLOB, RecordingReader  # noqa: E402
+from services.camera.replay_camera import ReplayCamera  # noqa: E402
+from services.camera.sick_camera import SickCamera  # noqa: E402
+from services.detection import DetectionBatch, DetectionVisualizer, RoiProcessor, TargetSelector  # noqa: E402
+from services.detection.base import DetectionBox  # noqa: E402
+from services.system.metrics import get_metrics  # noqa: E402
+
+
+# ============================================================
+# 统计
+# ============================================================
+
+def summarize(samples_ms: List[float]) -> Dict[str, Any]:
+    """耗时样本（毫秒）的精确分位数"""
+    if not samples_ms:
+        return {"count": 0}
+    arr = np.asarray(samples_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {
+        "count": int(arr.size),
+        "mean": round(float(arr.mean()), 4),
+        "min": round(float(arr.min()), 4),
+        "max": round(float(arr.max()), 4),
+        "p50": round(float(p50), 4),
+        "p95": round(float(p95), 4),
+        "p99": round(float(p99), 4),
+    }
+
+
+def time_calls(fn: Callable[[Any], Any], iterations: int, warmup: int = 3,
+               prepare: Optional[Callable[[int], Any]] = None) -> Dict[str, Any]:
+    """
+    重复调用 fn 并统计耗时（预热调用不计入）
+    prepare 不为None时每次调用前先执行 prepare(i)（不计时），其返回值作为 fn 的参数；否则 fn(i)
+    """
+    for i in range(warmup):
+        fn(prepare(i) if prepare else i)
+    samples = []
+    for i in range(iterations):
+        arg = prepare(i) if prepare else i
+        t0 = time.perf_counter()
+        fn(arg)
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    result = summarize(samples)
+    total_s = sum(samples) / 1000.0
+    result["per_second"] = round(iterations / total_s, 2) if total_s > 0 else None
+    return result
+
+
+# ============================================================
+# 合成输入
+# ============================================================
+
+_BLOB_XML = (
+    "<SickRecord><DataSets><DataSetDepthMap datacount=\"1\">"
+    "<DataLink><FileName>data.bin</FileName></DataLink>"
+    "<DeviceDescription><Ident>Visionary-T Mini CX (benchmark)</Ident></DeviceDescription>"
+    "<FormatDescriptionDepthMap>"
+    "<TimestampUTC/><Version>uint16</Version>"
+    "<DataStream>"
+    "<Width>{w}</Width><Height>{h}</Height>"
+    "<CameraToWorldTransform>{c2w}</CameraToWorldTransform>"
+    "<CameraMatrix><FX>{f}</FX><FY>{f}</FY><CX>{cx}</CX><CY>{cy}</CY></CameraMatrix>"
+    "<CameraDistortionParams><K1>0.05</K1><K2>0.01</K2></CameraDistortionParams>"
+    "<FrameNumber>uint32</FrameNumber><Quality>uint8</Quality><Status>uint8</Status>"
+    "<Distance decimalexponent=\"-1\">uint16</Distance>"
+    "<Intensity>uint16</Intensity><Confidence>uint16</Confidence>"
+    "</DataStream></FormatDescriptionDepthMap>"
+    "</DataSetDepthMap></DataSets></SickRecord>"
+)
+
+
+def synthetic_blob(width: int, height: int, frame_number: int, seed: int = 0) -> bytes:
+    """按 Visionary BLOB 协议合成一帧：约 660mm 的平面上若干凸起物体"""
+    rng = np.random.default_rng(seed + frame_number)
+    distance = np.full((height, width), 6600.0)  # 0.1mm
+    intensity = rng.normal(9000, 1500, (height, width))
+    for _ in range(8):
+        cx, cy = rng.integers(0, width), rng.integers(0, height)
+        r = int(rng.integers(15, 45))
+        cv2.circle(distance, (int(cx), int(cy)), r, float(rng.integers(6000, 6500)), -1)
+        cv2.circle(intensity, (int(cx), int(cy)), r, float(rng.integers(20000, 40000)), -1)
+    confidence = np.full((height, width), 60000)
+    planes = b"".join(
+        np.clip(p, 0, 65535).astype("<u2").tobytes() for p in (distance, intensity, confidence)
+    )
+
+    c2w = "".join(f"<value>{v}</value>" for v in [1, 0, 0, 0, 0, -1, 0, 0, 0, 0, -1, 1000, 0, 0, 0, 1])
+    xml = _BLOB_XML.format(w=width, h=height, c2w=c2w, f=width * 0.6, cx=width / 2.0, cy=height / 2.0).encode("utf-8")
+    body = struct.pack("<IBB", frame_number, 0, 0) + planes
+    length_at_start = struct.calcsize("<IQH") + len(body)
+    binary = struct.pack("<IQH", length_at_start, 0, 2) + body + struct.pack("<II", 0, length_at_start)
+    overlay = b"<overlay/>"
+
+    table_len = 4 + 3 * 8
+    segments = struct.pack(">HH", 1, 3)
+    for off in (table_len, table_len + len(xml), table_len + len(xml) + len(binary)):
+        segments += struct.pack(">II", off, 1)
+    payload = segments + xml + binary + overlay
+    header = struct.pack(">IIHB", 0x02020202, len(payload) + 3, 1, 0x62)
+    return header + payload + b"E"
+
+
+def synthetic_recording(path: str, frames: int, width: int, height: int, interval_s: float = 0.033) -> str:
+    """写入合成的原始BLOB录制文件"""
+    recorder = FrameRecorder(path)
+    t0 = time.time()
+    for i in range(frames):
+        recorder.write_blob(synthetic_blob(width, height, i + 1), timestamp_s=t0 + i * interval_s)
+    recorder.close()
+    return path
+
+
+# ============================================================
+# 回放检测结果的检测器
+# ============================================================
+
+class StubDetector:
+    """
+    按顺序循环返回预先录制的检测结果（每帧一个列表），接口同 DetectionService
+    每次 detect 都构建新的 DetectionBox（与实际后端一致），轮廓等派生属性不会跨帧命中缓存
+
+    JSON格式：{"frames": [[{"class_id", "score", "box": [x1, y1, x2, y2], "polygon": [[x, y], ...]}, ...], ...]}
+    polygon 为整幅图坐标的mask轮廓；缺省时以检测框内切椭圆作为mask
+    """
+
+    def __init__(self, frames: List[List[DetectionBox]]):
+        self._frames = frames or [[]]
+        self._index = 0
+        self._lock = threading.Lock()
+
+    def load(self):
+        pass
+
+    def release(self):
+        pass
+
+    def detect(self, image) -> List[DetectionBox]:
+        with self._lock:
+            dets = self._frames[self._index % len(self._frames)]
+            self._index += 1
+        return fresh_boxes(dets)
+
+    @classmethod
+    def from_file(cls, path: str) -> "StubDetector":
+        with open(path, "r", encoding="utf-8") as f:
+            doc = json.load(f)
+        return cls([[_box_from_dict(d) for d in frame] for frame in doc.get("frames", [])])
+
+    @classmethod
+    def synthetic(cls, width: int, height: int, frames: int = 16, per_frame: int = 12, seed: int = 0) -> "StubDetector":
+        """随机检测结果（类别0为主，mask面积覆盖 minArea 上下）"""
+        rng = np.random.default_rng(seed)
+        out = []
+        for _ in range(frames):
+            dets = []
+            for _ in range(per_frame):
+                w, h = int(rng.integers(40, 110)), int(rng.integers(40, 110))
+                x1, y1 = int(rng.integers(0, max(1, width - w))), int(rng.integers(0, max(1, height - h)))
+                dets.append(_box_from_dict({
+                    "class_id": int(rng.random() < 0.15),
+                    "score": round(float(rng.uniform(0.5, 0.99)), 3),
+                    "box": [x1, y1, x1 + w, y1 + h],
+                }))
+            out.append(dets)
+        return cls(out)
+
+    @staticmethod
+    def save(path: str, frames: List[List[DetectionBox]]):
+        """保存检测结果（mask保存为最大外轮廓）"""
+        doc = {"frames": [[_box_to_dict(d) for d in dets] for dets in frames]}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(doc, f, ensure_ascii=False)
+
+
+def fresh_boxes(detections: List[DetectionBox]) -> List[DetectionBox]:
+    """以相同mask数组构建新的 DetectionBox 并 compact（同后端解码），缓存为空"""
+    return [
+        DetectionBox(d.class_id, d.score, d.xmin, d.ymin, d.xmax, d.ymax,
+                     seg_mask=d.seg_mask, mask_offset=d.mask_offset).compact()
+        for d in detections
+    ]
+
+
+def _box_from_dict(d: Dict[str, Any]) -> DetectionBox:
+    x1, y1, x2, y2 = (int(round(v)) for v in d["box"])
+    w, h = max(1, x2 - x1), max(1, y2 - y1)
+    mask = np.zeros((h, w), dtype=np.uint8)
+    polygon = d.get("polygon")
+    if polygon:
+        pts = np.asarray(polygon, dtype=np.int32).reshape(-1, 1, 2) - np.array([x1, y1], dtype=np.int32)
+        cv2.fillPoly(mask, [pts], 1)
+    else:
+        cv2.ellipse(mask, (w // 2, h // 2), (max(1, w // 2), max(1, h // 2)), 0, 0, 360, 1, -1)
+    box = DetectionBox(int(d.get("class_id", 0)), float(d.get("score", 1.0)), x1, y1, x2, y2,
+                       seg_mask=mask, mask_offset=(x1, y1))
+    return box.compact()
+
+
+def _box_to_dict(box: DetectionBox) -> Dict[str, Any]:
+    out = {
+        "class_id": int(box.class_id),
+        "score": round(float(box.score), 4),
+        "box": [int(box.xmin), int(box.ymin), int(box.xmax), int(box.ymax)],
+    }
+    contour = box.contour
+    if contour is not None and len(contour) >= 3:
+        out["polygon"] = contour.reshape(-1, 2).tolist()
+    return out
+
+
+def record_detections(recording: str, config: dict, path: str, logger: logging.Logger) -> int:
+    """用真实检测器处理录制文件中的每一帧，保存检测结果供 StubDetector 回放"""
+    from services.detection.factory import create_detector
+
+    detector = create_detector(config, logger=logger)
+    detector.load()
+    camera = ReplayCamera(recording, speed=0, loop=False, logger=logger)
+    if not camera.connect():
+        raise RuntimeError(f"无法打开录制文件: {recording}")
+    frames = []
+    try:
+        while True:
+            frame = camera.get_frame(depth=False, intensity=True, camera_params=False)
+            if frame is None:
+                break
+            frames.append(detector.detect(frame["intensity_image"]))
+    finally:
+        detector.release()
+    StubDetector.save(path, frames)
+    return len(frames)
+
+
+# ============================================================
+# 端到端
+# ============================================================
+
+def make_context(config: dict, camera, detector, logger: logging.Logger) -> CommandContext:
+    return CommandContext(
+        config=config, camera=camera, detector=detector, sftp=None, monitor=None, logger=logger,
+        project_root=PROJECT_ROOT, initializer=None, gpio=None, uploader=None,
+    )
+
+
+def bench_catch(ctx: CommandContext, iterations: int, warmup: int = 3) -> Dict[str, Any]:
+    """
+    连续调用 handle_catch：总耗时（精确分位数）+ 各阶段耗时（指标直方图）
+    可视化后台执行时，stages 中的 visualize_detections/jpg_encode/sftp_upload 来自后台线程，不计入总耗时
+    """
+    metrics = get_metrics()
+    req = MQTTResponse(command=VisionCoreCommands.CATCH.value, component="benchmark",
+                       messageType=MessageType.INFO, message="", data={})
+    failures = []
+
+    def _call(_i):
+        result = h_detection.handle_catch(req, ctx)
+        if result.messageType != MessageType.SUCCESS:
+            failures.append(result.message)
+
+    for i in range(warmup):
+        _call(i)
+    metrics.reset()
+    failures.clear()
+    result = time_calls(_call, iterations, warmup=0)
+    worker = h_detection._render_worker
+    if worker is not None:
+        _wait_idle(worker)
+        result["render_worker"] = worker.stats()
+    result["stages"] = {
+        name.split(".", 1)[1]: stats
+        for name, stats in metrics.snapshot()["histograms"].items()
+        if name.startswith("catch.") and stats.get("count")
+    }
+    result["failures"] = len(failures)
+    if failures:
+        result["first_failure"] = failures[0]
+    return result
+
+
+def bench_loop(ctx: CommandContext, frames: int, pipeline: bool, timeout_s: float = 120.0) -> Dict[str, Any]:
+    """运行 _run_loop 直到处理完 frames 帧：吞吐 + 各阶段耗时"""
+    metrics = get_metrics()
+    ctx.config = copy.deepcopy(ctx.config)
+    ctx.config.setdefault("pipeline", {})["enable"] = bool(pipeline)
+    metrics.reset()
+    h_system._stop_event.clear()
+    thread = threading.Thread(target=h_system._run_loop, args=(ctx, []), name="BenchLoop", daemon=True)
+    t0 = time.perf_counter()
+    thread.start()
+    deadline = t0 + timeout_s
+    while time.perf_counter() < deadline:
+        if metrics.histogram("loop.total").snapshot().get("count", 0) >= frames:
+            break
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - t0
+    snap = metrics.snapshot()  # 停止前取快照（流水线统计随停止注销）
+    h_system._stop_event.set()
+    thread.join(timeout=5.0)
+    stages = {
+        name.split(".", 1)[1]: stats
+        for name, stats in snap["histograms"].items()
+        if name.startswith("loop.") and stats.get("count")
+    }
+    processed = stages.get("total", {}).get("count", 0)
+    result = {
+        "mode": "pipeline" if pipeline else "sequential",
+        "frames": processed,
+        "elapsed_s": round(elapsed, 3),
+        "fps": round(processed / elapsed, 2) if elapsed > 0 else None,
+        "stages": stages,
+    }
+    if pipeline and "pipeline" in snap["gauges"]:
+        result["pipeline_stats"] = snap["gauges"]["pipeline"]
+    return result
+
+
+def _wait_idle(worker, timeout_s: float = 10.0):
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        if not worker.stats().get("pending"):
+            time.sleep(0.05)  # 等待正在执行的任务结束
+            return
+        time.sleep(0.01)
+
+
+# ============================================================
+# 微基准
+# ============================================================
+
+def bench_parser(blob: bytes, iterations: int) -> Dict[str, Any]:
+    """BLOB解析：numpy视图 / struct元组两种模式，以及帧字典构建（强度图对比度调整）"""
+    parser = Data()
+    out = {}
+    for name, use_numpy in (("numpy", True), ("struct", False)):
+        out[f"read_{name}"] = time_calls(
+            lambda _i, n=use_numpy: parser.read(blob, convertToMM=True, useNumpy=n),
+            max(1, iterations if use_numpy else iterations // 10),
+        )
+    parser.read(blob, convertToMM=True, useNumpy=True)
+    out["frame_from_parser"] = time_calls(
+        lambda _i: SickCamera.frame_from_parser(parser, True, True, True), iterations,
+    )
+    return out
+
+
+def rknn_postprocess_inputs(candidates: int = 40, seed: int = 0, proto_size=(64, 64)):
+    """
+    构建仅用于后处理的 RKNNDetector 与合成的模型输出（不加载 RKNN 运行时）
+
+    Returns:
+        (detector, outputs)：outputs 为 3 个检测头的 reg/cls、3 组mask系数与 proto，共10项，
+        约 candidates 个 (网格, 类别) 候选超过置信度阈值
+    """
+    from services.detection import rknn_backend
+
+    # 未安装 RKNN 时构造函数会拒绝创建，这里只需要后处理参数
+    saved = rknn_backend.RKNN
+    rknn_backend.RKNN = rknn_backend.RKNN or object
+    try:
+        det = rknn_backend.RKNNDetector("benchmark.rknn", conf_threshold=0.5)
+    finally:
+        rknn_backend.RKNN = saved
+
+    rng = np.random.default_rng(seed)
+    outputs = [None] * 10
+    total_cells = sum(h * w for h, w in det._map_sizes)
+    for head, (h, w) in enumerate(det._map_sizes):
+        cls = np.full((1, det._class_num, h, w), -8.0, dtype=np.float32)
+        hits = max(1, candidates * h * w // total_cells)
+        flat = cls.reshape(det._class_num, -1)
+        flat[rng.integers(0, det._class_num, hits), rng.choice(h * w, hits, replace=False)] = rng.uniform(0.5, 4.0, hits)
+        outputs[head * 2] = rng.uniform(0.5, 4.0, (1, 4, h, w)).astype(np.float32)
+        outputs[head * 2 + 1] = cls
+        outputs[6 + head] = rng.normal(0, 1, (1, det._mask_num, h, w)).astype(np.float32)
+    outputs[9] = rng.normal(0, 1, (1, det._mask_num) + tuple(proto_size)).astype(np.float32)
+    return det, outputs
+
+
+def bench_postprocess_boxes(iterations: int, candidates: int = 40, seed: int = 0) -> Dict[str, Any]:
+    """RKNNDetector._postprocess_boxes：合成三个检测头输出，约 candidates 个候选超过阈值"""
+    det, outputs = rknn_postprocess_inputs(candidates, seed)
+    img_w, img_h = det._input_size
+    result = time_calls(lambda _i: det._postprocess_boxes(outputs, img_h, img_w), iterations)
+    result["candidates"] = int(len(det._postprocess_boxes(outputs, img_h, img_w)[0]))
+    return result
+
+
+def bench_target_selector(detections: List[DetectionBox], roi_cfg: dict, width: int, height: int,
+                          iterations: int) -> Dict[str, Any]:
+    """handle_catch 中的筛选步骤：构建检测批、ROI归属、按优先级/面积选择"""
+    roi_set = RoiProcessor.get_compiled_rois(roi_cfg, width, height)
+    min_area = float(roi_cfg.get("minArea", 0))
+
+    def _select(dets):
+        batch = DetectionBatch.from_detections(dets).select_class(0)
+        assignment = RoiProcessor.assign_rois(batch.centers(), roi_set)
+        return TargetSelector.select_from_assignment(batch, roi_set, assignment, min_area=min_area)
+
+    result = time_calls(_select, iterations, prepare=lambda _i: fresh_boxes(detections))
+    result["detections"] = len(detections)
+    return result
+
+
+def bench_visualizer(image: np.ndarray, detections: List[DetectionBox], roi_cfg: dict,
+                     iterations: int) -> Dict[str, Any]:
+    """DetectionVisualizer.render：检测结果mask/轮廓 + ROI叠加层 + 十字准星"""
+    height, width = image.shape[:2]
+    roi_set = RoiProcessor.get_compiled_rois(roi_cfg, width, height)
+    overlay = roi_set.overlay()
+    crosshair = (width // 2, height // 2)
+    result = time_calls(
+        lambda dets: DetectionVisualizer.render(image, dets, roi_overlay=overlay, crosshair=crosshair),
+        iterations,
+        prepare=lambda _i: fresh_boxes(detections),
+    )
+    result["detections"] = len(detections)
+    return result
+
+
+# ============================================================
+# 运行与对比
+# ============================================================
+
+def run_benchmarks(
+    config: dict,
+    recording: str,
+    detector: StubDetector,
+    iterations: int = 200,
+    loop_frames: int = 200,
+    micro_iterations: int = 500,
+    logger: Optional[logging.Logger] = None,
+) -> Dict[str, Any]:
+    """
+    运行全部基准
+
+    Returns:
+        {"meta": {...}, "catch": {...}, "loop": {...}, "micro": {...}}
+    """
+    logger = logger or logging.getLogger("benchmark")
+    reader = RecordingReader(recording)
+    camera = ReplayCamera(recording, speed=0, loop=True, logger=logger)
+    if not camera.connect():
+        raise RuntimeError(f"无法打开录制文件: {recording}")
+    first = camera.get_frame(depth=False, intensity=True, camera_params=False)
+    image = first["intensity_image"]
+    height, width = image.shape[:2]
+    roi_cfg = config.get("roi") or {}
+    ctx = make_context(config, camera, detector, logger)
+
+    results: Dict[str, Any] = {
+        "meta": _environment(),
+        "inputs": {
+            "recording": os.path.abspath(recording),
+            "frames": len(reader),
+            "frame_shape": [int(height), int(width)],
+            "detections_per_frame": round(float(np.mean([len(detector.detect(None)) for _ in range(8)])), 2),
+        },
+        "catch": {},
+        "loop": {},
+        "micro": {},
+    }
+
+    # 端到端：catch（可视化同步/后台两种方式）
+    for mode, deferred in (("inline", False), ("deferred", True)):
+        ctx.config = copy.deepcopy(config)
+        ctx.config.setdefault("visualization", {})["deferred"] = deferred
+        results["catch"][mode] = bench_catch(ctx, iterations)
+        print(f"catch[{mode}] p50={results['catch'][mode]['p50']}ms p95={results['catch'][mode]['p95']}ms", file=sys.stderr)
+
+    # 端到端：连续检测循环
+    for pipeline in (False, True):
+        ctx.config = copy.deepcopy(config)
+        res = bench_loop(ctx, loop_frames, pipeline)
+        results["loop"][res["mode"]] = res
+        print(f"loop[{res['mode']}] {res['fps']} fps", file=sys.stderr)
+
+    # 微基准
+    blob = next((reader.read(i)[2] for i in range(len(reader)) if reader.index[i][0] == KIND_BLOB), None)
+    if blob is None:
+        blob = synthetic_blob(width, height, 1)
+    dets = detector.detect(None)
+    results["micro"]["parser"] = bench_parser(blob, micro_iterations)
+    results["micro"]["postprocess_boxes"] = bench_postprocess_boxes(micro_iterations)
+    results["micro"]["target_selector"] = bench_target_selector(dets, roi_cfg, width, height, micro_iterations)
+    results["micro"]["visualizer"] = bench_visualizer(image, dets, roi_cfg, max(1, micro_iterations // 5))
+    camera.disconnect()
+    return results
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    """对比两次结果中同名项的 p50/p95/fps，返回可打印的行"""
+    lines = [f"{'项目':<44}{'基准':>12}{'当前':>12}{'变化':>10}"]
+
+    def _walk(a, b, prefix):
+        for key in sorted(set(a) & set(b)):
+            va, vb = a[key], b[key]
+            name = f"{prefix}.{key}" if prefix else key
+            if isinstance(va, dict) and isinstance(vb, dict):
+                _walk(va, vb, name)
+            elif key in ("p50", "p95", "fps", "per_second") and isinstance(va, (int, float)) and isinstance(vb, (int, float)):
+                delta = (vb - va) / va * 100.0 if va else 0.0
+                lines.append(f"{name:<44}{va:>12.3f}{vb:>12.3f}{delta:>+9.1f}%")
+
+    _walk({k: v for k, v in base.items() if k != "meta"}, {k: v for k, v in new.items() if k != "meta"}, "")
+    return lines
+
+
+def _environment() -> Dict[str, Any]:
+    commit = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except Exception:
+        pass
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="catch 流水线性能基准")
+    ap.add_argument("--config", default=os.path.join(PROJECT_ROOT, "configs", "config.yaml"), help="配置文件")
+    ap.add_argument("--recording", help="相机录制文件（*.vcrec）；缺省时使用合成帧")
+    ap.add_argument("--detections", help="检测结果JSON（StubDetector格式）；缺省时使用合成检测结果")
+    ap.add_argument("--record-detections", metavar="PATH", help="用配置中的真实模型处理录制文件，保存检测结果后退出")
+    ap.add_argument("--width", type=int, default=512, help="合成帧宽度")
+    ap.add_argument("--height", type=int, default=424, help="合成帧高度")
+    ap.add_argument("--per-frame", type=int, default=12, help="合成检测结果每帧目标数")
+    ap.add_argument("--iterations", type=int, default=200, help="catch 调用次数")
+    ap.add_argument("--loop-frames", type=int, default=200, help="连续循环处理帧数")
+    ap.add_argument("--micro-iterations", type=int, default=500, help="微基准调用次数")
+    ap.add_argument("--out", help="结果JSON输出路径（缺省打印到标准输出）")
+    ap.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="对比两个结果文件")
+    ap.add_argument("--log-level", default="ERROR", help="处理器日志级别（默认 ERROR，避免日志IO影响计时）")
+    args = ap.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0], "r", encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.compare[1], "r", encoding="utf-8") as f:
+            new = json.load(f)
+        print(f"基准: {base.get('meta', {}).get('commit')}  当前: {new.get('meta', {}).get('commit')}")
+        print("\n".join(compare(base, new)))
+        return 0
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    logger = logging.getLogger("benchmark")
+    logger.setLevel(getattr(logging, str(args.log_level).upper(), logging.ERROR))
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+
+    with tempfile.TemporaryDirectory(prefix="vc_bench_") as tmp:
+        recording = args.recording or synthetic_recording(
+            os.path.join(tmp, "synthetic.vcrec"), 32, args.width, args.height
+        )
+        if args.record_detections:
+            count = record_detections(recording, config, args.record_detections, logger)
+            print(f"已保存 {count} 帧检测结果: {args.record_detections}")
+            return 0
+        if args.detections:
+            detector = StubDetector.from_file(args.detections)
+        else:
+            detector = StubDetector.synthetic(args.width, args.height, per_frame=args.per_frame)
+        results = run_benchmarks(
+            config, recording, detector,
+            iterations=args.iterations,
+            loop_frames=args.loop_frames,
+            micro_iterations=args.micro_iterations,
+            logger=logger,
+        )
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"结果已写入: {args.out}")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())